@@ -1,26 +1,67 @@
-from pathlib import Path
+import zlib
+from contextlib import contextmanager
 from typing import Annotated
 
 from fastapi import Depends
-from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlmodel import SQLModel, Session
 
-sqlite_file_name = "resa.db"
-sqlite_url = f"sqlite:///{sqlite_file_name}"
+from app.database import sharding
+from app.database.engines import DB_MODE, DB_PATH, EngineFactory, get_engine, set_factory
+from app.database.schema import ajouter_colonnes_manquantes
 
-connect_args = {"check_same_thread": False}
-engine = create_engine(sqlite_url, connect_args=connect_args)
+
+def schema_version() -> int:
+    # Empreinte des tables/colonnes/index déclarés, stockée dans PRAGMA user_version (entier signé 32 bits)
+    parts = [f"sharding={sharding.SHARDING_ENABLED}"]
+    for table in sorted(SQLModel.metadata.tables.values(), key=lambda t: t.name):
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type.__class__.__name__}" for c in table.columns)
+        parts.extend(sorted(i.name for i in table.indexes if i.name))
+    return zlib.crc32("|".join(parts).encode("utf-8")) & 0x7FFFFFFF
 
 
 def create_db_and_tables():
-        db_path_abs = Path(engine.url.database).resolve()
-        print("DB file (relative):", engine.url.database)
-        print("DB file (absolute):", db_path_abs)
-        ##SQLModel.metadata.drop_all(engine) ##sert a drop la base ne pas decommenter n'importe quand
-        SQLModel.metadata.create_all(engine)
+    engine = get_engine()
+    version = schema_version()
+    with engine.connect() as conn:
+        if conn.exec_driver_sql("PRAGMA user_version").scalar() == version:
+            return
+    ##SQLModel.metadata.drop_all(engine) ##sert a drop la base ne pas decommenter n'importe quand
+    # En mode shardé, la base principale ne contient que le catalogue (sites, users, departments)
+    tables = sharding.catalog_tables() if sharding.SHARDING_ENABLED else None
+    SQLModel.metadata.create_all(engine, tables=tables)
+    ajouter_colonnes_manquantes(engine, tables or list(SQLModel.metadata.tables.values()))
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"PRAGMA user_version = {version}")
+    print("Schéma de la base mis à jour:", engine.url.database, f"(version {version})")
+
+
+def configure_engine(mode: str = DB_MODE, path: str = DB_PATH) -> Engine:
+    """Bascule l'application sur une autre base (RESA_DB_MODE / RESA_DB_PATH par défaut) ; l'ancienne est libérée."""
+    set_factory(EngineFactory(mode, path)).dispose()
+    return get_engine()
+
+
+@contextmanager
+def base_isolee(mode: str = "temp"):
+    """Base vide (schéma créé) le temps du bloc, puis retour à la base précédente."""
+    precedente = set_factory(EngineFactory(mode))
+    try:
+        create_db_and_tables()
+        yield get_engine()
+    finally:
+        set_factory(precedente).dispose()
+
+
+def new_session() -> Session:
+    if sharding.SHARDING_ENABLED:
+        return sharding.SiteShardedSession(get_engine())
+    return Session(get_engine())
+
 
 def get_session():
-    with Session(engine) as session:
+    with new_session() as session:
         yield session
 
-SessionDep = Annotated[Session, Depends(get_session)]
\ No newline at end of file
+SessionDep = Annotated[Session, Depends(get_session)]
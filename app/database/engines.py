@@ -0,0 +1,107 @@
+import itertools
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import weakref
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+# file : fichiers SQLite sur disque (défaut)
+# memory : bases en mémoire (VFS memdb) partagées par les connexions du pool, aucune E/S disque
+# temp : fichiers dans un répertoire temporaire propre à la fabrique, supprimé à sa libération
+DB_MODES = ("file", "memory", "temp")
+DB_MODE = os.getenv("RESA_DB_MODE", "file")
+DB_PATH = os.getenv("RESA_DB_PATH", "resa.db")
+
+connect_args = {"check_same_thread": False}
+
+_numeros = itertools.count(1)
+
+
+class EngineFactory:
+    """Crée les moteurs SQLite de l'application (base principale, fichiers de site) selon un même mode."""
+
+    def __init__(self, mode: str = DB_MODE, path: str = DB_PATH):
+        if mode not in DB_MODES:
+            raise ValueError(f"Mode de base inconnu: {mode} (attendu: {', '.join(DB_MODES)})")
+        self.mode = mode
+        self.path = path
+        # Préfixe unique : deux fabriques en mémoire d'un même processus ne partagent pas leurs bases
+        self._prefixe = f"resa_{os.getpid()}_{next(_numeros)}"
+        self._tmpdir = tempfile.mkdtemp(prefix="resa_") if mode == "temp" else None
+        # Répertoire temporaire supprimé même sans dispose() (fin du processus)
+        self._nettoyage = weakref.finalize(self, shutil.rmtree, self._tmpdir, ignore_errors=True) if self._tmpdir else None
+        self._engines: list[Engine] = []
+        self._ancres: list[sqlite3.Connection] = []
+        self._principal: Optional[Engine] = None
+        self._lock = threading.RLock()
+
+    def principal(self) -> Engine:
+        if self._principal is None:
+            with self._lock:
+                if self._principal is None:
+                    self._principal = self.create()
+        return self._principal
+
+    def create(self, chemin: Optional[str] = None) -> Engine:
+        chemin = Path(chemin or self.path)
+        if self.mode == "memory":
+            nom = f"{self._prefixe}_{'_'.join(chemin.parts)}"
+            # VFS memdb : base en mémoire partagée par nom entre les connexions du processus, avec
+            # les verrous d'un fichier (attente busy_timeout) ; pool normal, une connexion par thread
+            uri = f"file:/{nom}?vfs=memdb"
+            engine = create_engine(f"sqlite:///{uri}&uri=true", connect_args=connect_args)
+            # La base disparaît à la fermeture de sa dernière connexion : une ancre reste ouverte
+            # jusqu'à dispose(), même quand le pool est vide
+            with self._lock:
+                self._ancres.append(sqlite3.connect(uri, uri=True, check_same_thread=False))
+        else:
+            if self._tmpdir is not None:
+                chemin = Path(self._tmpdir) / chemin.relative_to(chemin.anchor)
+            chemin.parent.mkdir(parents=True, exist_ok=True)
+            engine = create_engine(f"sqlite:///{chemin}", connect_args=connect_args)
+        with self._lock:
+            self._engines.append(engine)
+        return engine
+
+    def dispose(self):
+        with self._lock:
+            engines, self._engines, self._principal = self._engines, [], None
+            ancres, self._ancres = self._ancres, []
+        for engine in engines:
+            engine.dispose()
+        for ancre in ancres:
+            ancre.close()
+        if self._nettoyage is not None:
+            self._nettoyage()
+
+
+_factory = EngineFactory()
+_listeners: list[Callable[[], None]] = []
+
+
+def get_factory() -> EngineFactory:
+    return _factory
+
+
+def get_engine() -> Engine:
+    return _factory.principal()
+
+
+def on_engine_change(callback: Callable[[], None]):
+    # Caches mémoire (données de référence, index...) à vider quand la base change
+    _listeners.append(callback)
+
+
+def set_factory(factory: EngineFactory) -> EngineFactory:
+    """Remplace la fabrique courante et retourne l'ancienne (non libérée : elle peut être restaurée)."""
+    global _factory
+    ancienne, _factory = _factory, factory
+    for callback in _listeners:
+        callback()
+    return ancienne
@@ -0,0 +1,19 @@
+from sqlalchemy import inspect
+from sqlalchemy.engine import Engine
+
+
+def ajouter_colonnes_manquantes(engine: Engine, tables: list):
+    """create_all ne modifie pas une table existante : ajoute les colonnes (nullables) et index
+    déclarés depuis sa création."""
+    inspecteur = inspect(engine)
+    with engine.begin() as conn:
+        for table in tables:
+            if not inspecteur.has_table(table.name):
+                continue
+            presentes = {colonne["name"] for colonne in inspecteur.get_columns(table.name)}
+            for colonne in table.columns:
+                if colonne.name not in presentes:
+                    type_sql = colonne.type.compile(dialect=engine.dialect)
+                    conn.exec_driver_sql(f'ALTER TABLE "{table.name}" ADD COLUMN "{colonne.name}" {type_sql}')
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
@@ -0,0 +1,195 @@
+import os
+import threading
+from typing import Any, Iterable, Optional
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+from sqlmodel import SQLModel, Session
+
+from app.database import engines
+from app.database.schema import ajouter_colonnes_manquantes
+
+# Mode optionnel : Ressource / Reservation / ResourceAvailability sont stockées dans
+# un fichier SQLite par site, Site / User / Department restent dans la base catalogue.
+SHARDING_ENABLED = os.getenv("RESA_SHARDING", "0") == "1"
+SHARD_DIR = os.getenv("RESA_SHARD_DIR", "shards")
+
+CATALOG = "catalog"
+SHARDED_TABLES = {
+    "ressources",
+    "reservations",
+    "resource_availabilities",
+    "reservation_changes",
+    "reservations_archive",
+    "demandes_reservation",
+    "liste_attente",
+}
+
+# Les identifiants des tables shardées encodent le site : id = (site_id << 32) + n
+SITE_ID_SHIFT = 32
+
+_site_engines: dict[int, Engine] = {}
+_lock = threading.Lock()
+engines.on_engine_change(_site_engines.clear)
+
+
+def shard_id_for_site(site_id: int) -> str:
+    return f"site_{site_id}"
+
+
+def site_for_shard_id(shard_id: str) -> int:
+    return int(shard_id.removeprefix("site_"))
+
+
+def site_for_id(object_id: int) -> int:
+    return object_id >> SITE_ID_SHIFT
+
+
+def is_sharded_table(table) -> bool:
+    return table is not None and table.name in SHARDED_TABLES
+
+
+def catalog_tables() -> list:
+    return [t for t in SQLModel.metadata.tables.values() if t.name not in SHARDED_TABLES]
+
+
+def site_tables() -> list:
+    return [t for t in SQLModel.metadata.tables.values() if t.name in SHARDED_TABLES]
+
+
+def get_site_engine(site_id: int) -> Engine:
+    engine = _site_engines.get(site_id)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _site_engines.get(site_id)
+        if engine is None:
+            engine = engines.get_factory().create(f"{SHARD_DIR}/resa_site_{site_id}.db")
+            SQLModel.metadata.create_all(engine, tables=site_tables())
+            ajouter_colonnes_manquantes(engine, site_tables())
+            with engine.begin() as conn:
+                for table in site_tables():
+                    conn.exec_driver_sql(
+                        "INSERT INTO sqlite_sequence (name, seq) "
+                        "SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                        (table.name, site_id << SITE_ID_SHIFT, table.name),
+                    )
+            _site_engines[site_id] = engine
+    return engine
+
+
+def all_site_shard_ids(catalog_engine: Engine) -> list[str]:
+    with catalog_engine.connect() as conn:
+        site_ids = conn.exec_driver_sql("SELECT id FROM sites ORDER BY id").scalars().all()
+    return [shard_id_for_site(site_id) for site_id in site_ids]
+
+
+def _mapper_table(mapper):
+    return getattr(mapper, "local_table", None) if mapper is not None else None
+
+
+def _sites_from_criteria(statement) -> set[int]:
+    # Cherche site_id / ressource_id / id == valeur (ou IN) sur une table shardée
+    sites = set()
+    whereclause = getattr(statement, "whereclause", None)
+    if whereclause is None:
+        return sites
+
+    for element in visitors.iterate(whereclause):
+        if not isinstance(element, BinaryExpression):
+            continue
+        column, param = element.left, element.right
+        table = getattr(column, "table", None)
+        if not is_sharded_table(table) or not isinstance(param, BindParameter):
+            continue
+        if element.operator not in (operators.eq, operators.in_op):
+            continue
+
+        value = param.effective_value
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if column.name == "site_id":
+            sites.update(v for v in values if v is not None)
+        elif column.name in ("id", "ressource_id"):
+            sites.update(site_for_id(v) for v in values if v is not None)
+    return sites
+
+
+def shard_chooser(mapper, instance, clause=None) -> str:
+    if not is_sharded_table(_mapper_table(mapper)):
+        return CATALOG
+    if instance is not None:
+        if getattr(instance, "site_id", None) is not None:
+            return shard_id_for_site(instance.site_id)
+        if getattr(instance, "ressource_id", None) is not None:
+            return shard_id_for_site(site_for_id(instance.ressource_id))
+    if clause is not None:
+        sites = _sites_from_criteria(clause)
+        if len(sites) == 1:
+            return shard_id_for_site(sites.pop())
+    raise ValueError("Impossible de déterminer le site cible de l'écriture (mode shardé)")
+
+
+def identity_chooser(mapper, primary_key, **kw) -> list[str]:
+    if not is_sharded_table(_mapper_table(mapper)):
+        return [CATALOG]
+    return [shard_id_for_site(site_for_id(primary_key[0]))]
+
+
+class SiteShardedSession(ShardedSession, Session):
+    """Session SQLModel routant chaque requête vers la base catalogue ou le fichier du site concerné."""
+
+    def __init__(self, catalog_engine: Engine, **kwargs: Any):
+        self.catalog_engine = catalog_engine
+        self._bound_shards: set[str] = set()
+        super().__init__(
+            shard_chooser=shard_chooser,
+            identity_chooser=identity_chooser,
+            execute_chooser=self._execute_chooser,
+            shards={CATALOG: catalog_engine},
+            **kwargs,
+        )
+
+    def bind_shard(self, shard_id, bind) -> None:
+        self._bound_shards.add(shard_id)
+        super().bind_shard(shard_id, bind)
+
+    def get_bind(self, mapper=None, *, shard_id=None, instance=None, clause=None, **kw):
+        if shard_id is None:
+            shard_id = self._choose_shard_and_assign(mapper, instance=instance, clause=clause)
+        if shard_id not in self._bound_shards:
+            self.bind_shard(shard_id, get_site_engine(site_for_shard_id(shard_id)))
+        return super().get_bind(mapper, shard_id=shard_id, instance=instance, clause=clause, **kw)
+
+    def site_shard_ids(self) -> list[str]:
+        return all_site_shard_ids(self.catalog_engine)
+
+    def _execute_chooser(self, orm_context) -> Iterable[str]:
+        if not is_sharded_table(_mapper_table(orm_context.bind_mapper)):
+            return [CATALOG]
+
+        lazy_from = orm_context.lazy_loaded_from
+        if lazy_from is not None and is_sharded_table(_mapper_table(lazy_from.mapper)):
+            return [lazy_from.identity_token]
+
+        sites = _sites_from_criteria(orm_context.statement)
+        if sites:
+            return [shard_id_for_site(site_id) for site_id in sorted(sites)]
+        return self.site_shard_ids()
+
+
+def is_sharded_session(session) -> bool:
+    return isinstance(session, SiteShardedSession)
+
+
+def fan_out(session, statement, shard_ids: Optional[list[str]] = None) -> list:
+    """Exécute explicitement `statement` sur chaque site (count / tri / pagination inter-sites)."""
+    shard_ids = shard_ids if shard_ids is not None else session.site_shard_ids()
+    return [
+        session.exec(statement.execution_options(_sa_shard_id=shard_id))
+        for shard_id in shard_ids
+    ]
+
+
@@ -1,5 +1,11 @@
 import hashlib
+import logging
+import multiprocessing
+import os
 import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -8,6 +14,15 @@ from fastapi import HTTPException, status
 
 from app.models.User import User, UserCreate
 
+logger = logging.getLogger(__name__)
+
+# Processus dédiés au hachage des imports d'utilisateurs (1 = hachage dans le thread courant)
+HASH_WORKERS = int(os.getenv("RESA_HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_POOL_MIN_BATCH = int(os.getenv("RESA_HASH_POOL_MIN_BATCH", "8"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
 
 def hash_password(password: str) -> str:
     salt = secrets.token_hex(16)
@@ -15,6 +30,48 @@ def hash_password(password: str) -> str:
     return f"{salt}${pwd_hash.hex()}"
 
 
+def hash_passwords(passwords: list[str]) -> list[str]:
+    # Lots importants hachés en parallèle sur plusieurs processus (PBKDF2 est purement CPU)
+    if len(passwords) < HASH_POOL_MIN_BATCH or HASH_WORKERS <= 1:
+        return [hash_password(p) for p in passwords]
+    pool = _hash_pool()
+    if pool is None:
+        return [hash_password(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (HASH_WORKERS * 4))
+    try:
+        return list(pool.map(hash_password, passwords, chunksize=chunksize))
+    except (BrokenProcessPool, OSError):
+        logger.exception("Pool de hachage indisponible, hachage dans le thread courant")
+        shutdown_hash_pool()
+        return [hash_password(p) for p in passwords]
+
+
+def _hash_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver : les processus de hachage ne sont pas forkés depuis le serveur multi-thread
+            # (indisponible sous Windows : spawn)
+            methode = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            try:
+                _pool = ProcessPoolExecutor(
+                    max_workers=HASH_WORKERS,
+                    mp_context=multiprocessing.get_context(methode),
+                )
+            except (OSError, ValueError):
+                logger.exception("Démarrage du pool de hachage impossible, hachage dans le thread courant")
+                return None
+        return _pool
+
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
 def verify_password(password: str, hashed_password: str) -> bool:
     try:
         salt, pwd_hash = hashed_password.split('$')
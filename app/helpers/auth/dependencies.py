@@ -1,6 +1,11 @@
+from typing import TYPE_CHECKING
+
 from fastapi import Request, HTTPException, status
 from app.models.User import User
 
+if TYPE_CHECKING:
+    from app.helpers.auth.policy import Principal
+
 
 def get_current_user(request: Request) -> User:
     if not hasattr(request.state, "user"):
@@ -18,3 +23,12 @@ def get_current_user_id(request: Request) -> int:
             detail="Non authentifié"
         )
     return request.state.user_id
+
+
+def get_current_principal(request: Request) -> "Principal":
+    if not hasattr(request.state, "principal"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Non authentifié"
+        )
+    return request.state.principal
@@ -1,51 +1,80 @@
 from fastapi import Request, HTTPException, status
-from app.helpers.auth.dependencies import get_current_user
+from app.helpers.auth.dependencies import get_current_user, get_current_principal
 from app.models.User import User
 from app.models.Enum.TypeRole import TypeRole
 
 
 def require_admin(request: Request) -> User:
-    user = get_current_user(request)
-    if user.role != TypeRole.admin:
+    if not get_current_principal(request).is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Action réservée aux administrateurs"
         )
-    return user
+    return get_current_user(request)
 
 
 def require_manager_or_admin(request: Request) -> User:
-    user = get_current_user(request)
-    if user.role not in [TypeRole.manager, TypeRole.admin]:
+    if not get_current_principal(request).is_manager_or_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Action réservée aux managers et administrateurs"
         )
-    return user
+    return get_current_user(request)
+
+
+def require_site_manager(request: Request, site_id: int) -> User:
+    principal = get_current_principal(request)
+    if not principal.is_manager_or_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Action réservée aux managers et administrateurs"
+        )
+    if not principal.can_manage_site(site_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Action réservée aux managers du site {site_id}"
+        )
+    return get_current_user(request)
+
+
+def require_department_manager(request: Request, department_id: int, site_id: int) -> User:
+    # Manager du département (manager_id ou "manager:department:<id>") ou de son site
+    principal = get_current_principal(request)
+    if not principal.is_manager_or_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Action réservée aux managers et administrateurs"
+        )
+    if not (principal.can_manage_department(department_id) or principal.can_manage_site(site_id)):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Action réservée aux managers du département {department_id}"
+        )
+    return get_current_user(request)
 
 
 def require_roles(allowed_roles: list[TypeRole]):
+    allowed = frozenset(allowed_roles)
+    roles_str = ", ".join([r.value for r in allowed_roles])
+
     def checker(request: Request) -> User:
-        user = get_current_user(request)
-        if user.role not in allowed_roles:
-            roles_str = ", ".join([r.value for r in allowed_roles])
+        if not get_current_principal(request).has_role(allowed):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Rôles autorisés: {roles_str}"
             )
-        return user
+        return get_current_user(request)
     return checker
 
 
 def require_authorization(authorization: str):
     def checker(request: Request) -> User:
-        user = get_current_user(request)
-        if authorization not in user.autorisations:
+        if not get_current_principal(request).has_authorization(authorization):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Autorisation requise: {authorization}"
             )
-        return user
+        return get_current_user(request)
     return checker
 
 
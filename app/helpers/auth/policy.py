@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlmodel import Session, select
+
+from app.helpers.auth.auth import SESSIONS
+from app.models.Department import Department
+from app.models.Enum.TypeRole import TypeRole
+from app.models.User import User
+from app.services.reference_data import reference_cache
+
+# Autorisation à portée : "manager:site:3", "manager:department:5"
+SCOPE_PREFIX = "manager:"
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: int
+    role: TypeRole
+    autorisations: frozenset[str]
+    sites_geres: frozenset[int]
+    departements_geres: frozenset[int]
+    source: tuple
+    version: int
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == TypeRole.admin
+
+    @property
+    def is_manager_or_admin(self) -> bool:
+        return self.role in (TypeRole.manager, TypeRole.admin)
+
+    def has_role(self, roles: frozenset[TypeRole]) -> bool:
+        return self.role in roles
+
+    def has_authorization(self, authorization: str) -> bool:
+        return authorization in self.autorisations
+
+    def can_manage_site(self, site_id: int) -> bool:
+        if self.is_admin:
+            return True
+        return self.role == TypeRole.manager and site_id in self.sites_geres
+
+    def can_manage_department(self, department_id: int) -> bool:
+        if self.is_admin:
+            return True
+        return self.role == TypeRole.manager and department_id in self.departements_geres
+
+    def managed_site_ids(self) -> Optional[frozenset[int]]:
+        # None = aucune restriction (admin), sinon filtre à appliquer avec .in_()
+        if self.is_admin:
+            return None
+        if self.role != TypeRole.manager:
+            return frozenset()
+        return self.sites_geres
+
+
+def _source(user: User) -> tuple:
+    return user.role, tuple(user.autorisations or ()), user.site_principal_id
+
+
+def policy_version() -> int:
+    # Les portées dépendent des départements (manager_id) : leur version dans reference_versions,
+    # incrémentée à chaque écriture de Department, est partagée par tous les workers
+    return reference_cache.version("departments")
+
+
+def compile_principal(user: User, session: Session, version: Optional[int] = None) -> Principal:
+    autorisations = set()
+    sites = set()
+    departements = set()
+
+    for autorisation in user.autorisations or []:
+        if autorisation.startswith(SCOPE_PREFIX):
+            try:
+                scope, scope_id = autorisation[len(SCOPE_PREFIX):].split(":")
+                scope_id = int(scope_id)
+            except ValueError:
+                autorisations.add(autorisation)
+                continue
+            if scope == "site":
+                sites.add(scope_id)
+            elif scope == "department":
+                departements.add(scope_id)
+            continue
+        autorisations.add(autorisation)
+
+    if user.role == TypeRole.manager:
+        sites.add(user.site_principal_id)
+        managed = session.exec(
+            select(Department.id, Department.site_id).where(Department.manager_id == user.id)
+        ).all()
+        for department_id, site_id in managed:
+            departements.add(department_id)
+            sites.add(site_id)
+
+    return Principal(
+        user_id=user.id,
+        role=user.role,
+        autorisations=frozenset(autorisations),
+        sites_geres=frozenset(sites),
+        departements_geres=frozenset(departements),
+        source=_source(user),
+        version=policy_version() if version is None else version,
+    )
+
+
+def get_session_principal(token: str, user: User, session: Session) -> Principal:
+    session_data = SESSIONS.get(token)
+    principal = session_data.get("principal") if session_data else None
+
+    version = policy_version()
+    if principal is None or principal.version != version or principal.source != _source(user):
+        principal = compile_principal(user, session, version)
+        if session_data is not None:
+            session_data["principal"] = principal
+
+    return principal
@@ -0,0 +1,10 @@
+from datetime import datetime
+from typing import Optional
+
+
+def heure_locale(valeur: Optional[datetime]) -> Optional[datetime]:
+    # Les dates sont stockées en heure locale sans fuseau : une date avec fuseau (ex: "...Z")
+    # est convertie pour rester comparable aux colonnes et à datetime.now()
+    if valeur is None or valeur.tzinfo is None:
+        return valeur
+    return valeur.astimezone().replace(tzinfo=None)
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+
+def parse_expand(expand: Optional[str], allowed: set[str]) -> frozenset[str]:
+    if not expand:
+        return frozenset()
+    requested = frozenset(e.strip() for e in expand.split(",") if e.strip())
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Relation(s) inconnue(s): {', '.join(sorted(unknown))}. "
+                   f"Valeurs possibles: {', '.join(sorted(allowed))}"
+        )
+    return requested
+
+
+def parse_fields(fields: Optional[str], allowed: frozenset[str]) -> Optional[frozenset[str]]:
+    # None = tous les champs ; "id" est toujours renvoyé
+    if not fields:
+        return None
+    requested = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champ(s) inconnu(s): {', '.join(sorted(unknown))}. "
+                   f"Valeurs possibles: {', '.join(sorted(allowed))}"
+        )
+    return requested | {"id"}
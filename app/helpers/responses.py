@@ -0,0 +1,16 @@
+import os
+
+from fastapi import Response
+from pydantic import BaseModel
+
+# Mode opt-in : les routes compatibles valident une seule fois et sérialisent
+# directement en bytes (pydantic-core), sans repasser par response_model.
+FAST_RESPONSES = os.getenv("RESA_FAST_RESPONSES", "0") == "1"
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+
+def fast_json(model: BaseModel, exclude_unset: bool = False) -> FastJSONResponse:
+    return FastJSONResponse(content=model.model_dump_json(exclude_unset=exclude_unset))
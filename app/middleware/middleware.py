@@ -4,12 +4,37 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from sqlmodel import Session
 
 from app.helpers.auth.auth import get_session_user_id
-from app.database.database import engine
+from app.helpers.auth.policy import get_session_principal
+from app.database.engines import get_engine
 from app.models.User import User
+from app.middleware import rate_limit
+from app.services.audit import acteur_courant
+
+
+def too_many_requests(delay: float) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        content={"detail": "Trop de requêtes, réessayez plus tard"},
+        headers={"Retry-After": rate_limit.retry_after_header(delay)}
+    )
+
+
+def check_rate_limit(request: Request, key: str):
+    if not rate_limit.RATE_LIMIT_ENABLED:
+        return None
+    cost = rate_limit.route_cost(request.method, request.url.path)
+    delay = rate_limit.limiter.acquire(key, cost)
+    if delay is not None:
+        return too_many_requests(delay)
+    return None
 
 
 class AuthMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
+        # Sondes d'orchestrateur : ni authentification ni limitation de débit
+        if request.url.path.startswith("/health/"):
+            return await call_next(request)
+
         public_paths = [
             "/docs",
             "/openapi.json",
@@ -19,6 +44,10 @@ class AuthMiddleware(BaseHTTPMiddleware):
         ]
 
         if any(request.url.path.startswith(path) for path in public_paths):
+            client_ip = request.client.host if request.client else "inconnu"
+            limited = check_rate_limit(request, f"ip:{client_ip}")
+            if limited:
+                return limited
             return await call_next(request)
 
         token = request.cookies.get("session_token")
@@ -40,7 +69,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
                 content={"detail": "Session invalide ou expirée"}
             )
 
-        with Session(engine) as session:
+        limited = check_rate_limit(request, f"user:{user_id}")
+        if limited:
+            return limited
+
+        with Session(get_engine()) as session:
             user = session.get(User, user_id)
             if not user or not user.compte_actif:
                 return JSONResponse(
@@ -50,6 +83,11 @@ class AuthMiddleware(BaseHTTPMiddleware):
 
             request.state.user = user
             request.state.user_id = user_id
+            request.state.principal = get_session_principal(token, user, session)
 
-        response = await call_next(request)
-        return response
+        # Auteur des traces d'audit des écritures faites pendant la requête
+        jeton_acteur = acteur_courant.set(user_id)
+        try:
+            return await call_next(request)
+        finally:
+            acteur_courant.reset(jeton_acteur)
@@ -0,0 +1,79 @@
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+# Coût en jetons par route (méthode, regex sur le chemin) ; 1 par défaut
+ROUTE_COSTS = [
+    ("POST", re.compile(r"^/auth/login/?$"), 10),
+    ("POST", re.compile(r"^/auth/register/?$"), 10),
+    ("GET", re.compile(r"^/ressources/\d+/?$"), 5),
+    ("POST", re.compile(r"^/ressources/batch-detail/?$"), 10),
+    ("POST", re.compile(r"^/jobs/[^/]+/?$"), 10),
+]
+
+
+def route_cost(method: str, path: str) -> int:
+    for route_method, pattern, cost in ROUTE_COSTS:
+        if method == route_method and pattern.match(path):
+            return cost
+    return 1
+
+
+class TokenBucketLimiter:
+    def __init__(self, capacity: float, refill_rate: float, max_buckets: int = 10000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_buckets = max_buckets
+        # Au-delà de ce délai un seau est plein : l'évincer ne change rien
+        self.idle_ttl = capacity / refill_rate
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, cost: float = 1) -> Optional[float]:
+        """Consomme `cost` jetons ; retourne None si autorisé, sinon le délai d'attente en secondes."""
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = [self.capacity, now]
+                self._buckets[key] = bucket
+            else:
+                tokens, last = bucket
+                bucket[0] = min(self.capacity, tokens + (now - last) * self.refill_rate)
+                bucket[1] = now
+                self._buckets.move_to_end(key)
+
+            self._evict(now)
+
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return None
+            return (cost - bucket[0]) / self.refill_rate
+
+    def _evict(self, now: float):
+        while self._buckets:
+            oldest_key, (_, last) = next(iter(self._buckets.items()))
+            if len(self._buckets) > self.max_buckets or now - last > self.idle_ttl:
+                del self._buckets[oldest_key]
+            else:
+                break
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+def retry_after_header(delay: float) -> str:
+    return str(max(1, math.ceil(delay)))
+
+
+RATE_LIMIT_ENABLED = os.getenv("RESA_RATE_LIMIT", "1") == "1"
+
+limiter = TokenBucketLimiter(
+    capacity=float(os.getenv("RESA_RATE_LIMIT_CAPACITY", "60")),
+    refill_rate=float(os.getenv("RESA_RATE_LIMIT_REFILL", "1")),
+    max_buckets=int(os.getenv("RESA_RATE_LIMIT_MAX_BUCKETS", "10000")),
+)
@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime, Index, JSON
+
+
+class AuditLog(SQLModel, table=True):
+    """Trace des créations, modifications et suppressions (sites, départements, ressources, réservations)."""
+
+    __tablename__ = "audit_log"
+    __table_args__ = (
+        # Consultation par période, par auteur sur une période, et historique d'un objet
+        Index("ix_audit_log_date", "date_evenement"),
+        Index("ix_audit_log_acteur_date", "acteur_id", "date_evenement"),
+        Index("ix_audit_log_entite", "entite", "entite_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    date_evenement: datetime = Field(sa_column=Column(DateTime(timezone=True), nullable=False))
+    # None : modification hors requête authentifiée (tâche de fond, script)
+    acteur_id: Optional[int] = Field(default=None)
+    operation: str
+    entite: str
+    entite_id: int
+    # update : {champ: [ancienne valeur, nouvelle valeur]} ; delete : dernières valeurs ; create : None
+    changements: Optional[dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+
+
+class AuditLogPublic(SQLModel):
+    id: int
+    date_evenement: datetime
+    acteur_id: Optional[int] = None
+    operation: str
+    entite: str
+    entite_id: int
+    changements: Optional[dict[str, Any]] = None
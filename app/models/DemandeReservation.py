@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime
+
+from app.models.Enum.StatutDemande import StatutDemande
+from app.models.Enum.TypePriorite import TypePriorite
+
+
+class DemandeReservationBase(SQLModel):
+    ressource_id: int = Field(foreign_key="ressources.id", index=True)
+    user_id: int = Field(foreign_key="users.id")
+    debut: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    fin: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    description: str
+    nbr_participants: int = Field(gt=0, default=1)
+    note: Optional[str] = Field(default=None)
+
+
+class DemandeReservation(DemandeReservationBase, table=True):
+    """Demande collectée pendant la fenêtre d'allocation, attribuée ensuite en lot."""
+
+    __tablename__ = "demandes_reservation"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    createur_id: int = Field(foreign_key="users.id")
+    # Priorité du bénéficiaire au moment de la demande
+    priorite: TypePriorite
+    statut: StatutDemande = Field(default=StatutDemande.en_attente, index=True)
+    date_demande: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    reservation_id: Optional[int] = Field(default=None)
+    motif: Optional[str] = Field(default=None)
+
+
+class DemandeReservationCreate(DemandeReservationBase):
+    pass
+
+
+class DemandeReservationPublic(DemandeReservationBase):
+    id: int
+    createur_id: int
+    priorite: TypePriorite
+    statut: StatutDemande
+    date_demande: datetime
+    reservation_id: Optional[int] = None
+    motif: Optional[str] = None
@@ -2,6 +2,8 @@ from typing import Optional, List, TYPE_CHECKING
 
 from sqlmodel import SQLModel, Field, Relationship
 
+from app.models.User import UserPublicSimple
+
 if TYPE_CHECKING:
     from app.models.Site import Site
     from app.models.User import User
@@ -39,6 +41,11 @@ class DepartmentPublic(DepartmentBase):
     id: int
 
 
+class DepartmentPublicWithRelations(DepartmentPublic):
+    users: Optional[List[UserPublicSimple]] = None
+    manager: Optional[UserPublicSimple] = None
+
+
 class DepartmentCreate(DepartmentBase):
     pass
 
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class StatutDemande(Enum):
+    en_attente = "en attente"
+    allouee = "allouee"
+    rejetee = "rejetee"
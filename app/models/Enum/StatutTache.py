@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class StatutTache(Enum):
+    en_attente = "en attente"
+    en_cours = "en cours"
+    termine = "termine"
+    echec = "echec"
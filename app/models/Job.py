@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime, Index, JSON
+
+from app.models.Enum.StatutTache import StatutTache
+from app.models.Enum.TypeRessource import TypeRessource
+
+
+class Job(SQLModel, table=True):
+    """Tâche de fond (rapport, export, allocation) : statut et progression persistés, résultat sur disque."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_kind_statut", "kind", "statut"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str
+    statut: StatutTache = Field(default=StatutTache.en_attente)
+    # Fraction de 0 à 1
+    progression: float = Field(default=0.0)
+    parametres: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    demandeur_id: Optional[int] = Field(default=None)
+    # Processus qui exécute la tâche ("<pid>:<jeton>") : seul un processus arrêté voit ses tâches reprises
+    proprietaire: Optional[str] = Field(default=None)
+    date_creation: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    date_debut: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    date_fin: Optional[datetime] = Field(default=None, sa_column=Column(DateTime(timezone=True)))
+    fichier: Optional[str] = Field(default=None)
+    # Résumé court (compteurs), le résultat complet est dans `fichier`
+    resume: Optional[dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    erreur: Optional[str] = Field(default=None)
+
+
+class JobPublic(SQLModel):
+    id: int
+    kind: str
+    statut: StatutTache
+    progression: float
+    parametres: dict[str, Any]
+    demandeur_id: Optional[int] = None
+    date_creation: datetime
+    date_debut: Optional[datetime] = None
+    date_fin: Optional[datetime] = None
+    resume: Optional[dict[str, Any]] = None
+    erreur: Optional[str] = None
+
+
+class HeatmapJobParams(SQLModel):
+    debut: datetime
+    fin: datetime
+    resolution: int = 60
+    ressource_id: Optional[int] = None
+    site_id: Optional[int] = None
+    type_ressource: Optional[TypeRessource] = None
+
+
+class CapaciteJobParams(SQLModel):
+    debut: datetime
+    fin: datetime
+    site_id: Optional[int] = None
+    type_ressource: Optional[TypeRessource] = None
+    top: int = Field(default=5, ge=1, le=50)
+
+
+class AllocationJobParams(SQLModel):
+    jusqu_a: Optional[datetime] = None
+
+
+class ExportReservationsJobParams(SQLModel):
+    debut: Optional[datetime] = None
+    fin: Optional[datetime] = None
+    site_id: Optional[int] = None
+    ressource_id: Optional[int] = None
@@ -0,0 +1,57 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime, Index
+
+from app.models.Enum.StatutDemande import StatutDemande
+from app.models.Enum.TypePriorite import TypePriorite
+
+
+class ListeAttenteBase(SQLModel):
+    ressource_id: int = Field(foreign_key="ressources.id")
+    user_id: int = Field(foreign_key="users.id")
+    debut: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    fin: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    description: str
+    nbr_participants: int = Field(gt=0, default=1)
+    note: Optional[str] = Field(default=None)
+
+
+class ListeAttente(ListeAttenteBase, table=True):
+    """Inscription en liste d'attente sur un créneau occupé, promue automatiquement quand il se libère."""
+
+    __tablename__ = "liste_attente"
+    __table_args__ = (
+        # Recherche des inscrits d'une ressource par plage de début lors d'une annulation
+        Index("ix_liste_attente_ressource_statut_debut", "ressource_id", "statut", "debut"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    createur_id: int = Field(foreign_key="users.id")
+    priorite: TypePriorite
+    statut: StatutDemande = Field(default=StatutDemande.en_attente)
+    date_inscription: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    reservation_id: Optional[int] = Field(default=None)
+
+
+class ListeAttenteCreate(ListeAttenteBase):
+    pass
+
+
+class ListeAttentePublic(ListeAttenteBase):
+    id: int
+    createur_id: int
+    priorite: TypePriorite
+    statut: StatutDemande
+    date_inscription: datetime
+    reservation_id: Optional[int] = None
+
+
+class ProfondeurListeAttente(SQLModel):
+    ressource_id: int
+    profondeur: int
@@ -0,0 +1,51 @@
+from datetime import datetime
+from typing import List, Optional
+
+from sqlmodel import SQLModel
+
+from app.models.Enum.TypeRessource import TypeRessource
+
+
+class HeatmapOccupation(SQLModel):
+    debut: datetime
+    fin: datetime
+    ressource_id: Optional[int] = None
+    site_id: Optional[int] = None
+    type_ressource: Optional[TypeRessource] = None
+    resolution_minutes: int
+    nb_ressources: int
+    nb_reservations: int
+    jours: List[str]
+    creneaux: List[str]
+    # taux[jour][créneau] : % du temps réservé, toutes ressources du périmètre confondues
+    taux: List[List[float]]
+
+
+class FenetreContention(SQLModel):
+    debut: datetime
+    fin: datetime
+    pic: int
+    duree_minutes: float
+
+
+class CapaciteGroupe(SQLModel):
+    site_id: int
+    type_ressource: TypeRessource
+    inventaire: int
+    nb_reservations: int
+    pic_simultane: int
+    pic_debut: Optional[datetime] = None
+    taux_pic: float
+    heures_au_dessus_80: float
+    heures_a_100: float
+    part_au_dessus_80: float
+    part_a_100: float
+    fenetres_contention: List[FenetreContention]
+
+
+class RapportCapacite(SQLModel):
+    debut: datetime
+    fin: datetime
+    site_id: Optional[int] = None
+    type_ressource: Optional[TypeRessource] = None
+    groupes: List[CapaciteGroupe]
@@ -0,0 +1,8 @@
+from sqlmodel import SQLModel, Field
+
+
+class ReferenceVersion(SQLModel, table=True):
+    __tablename__ = "reference_versions"
+
+    nom: str = Field(primary_key=True)
+    version: int = Field(default=0)
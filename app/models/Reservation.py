@@ -1,5 +1,7 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Optional, TYPE_CHECKING, ClassVar
+from typing import Optional, TYPE_CHECKING, ClassVar, NamedTuple
 
 from sqlmodel import SQLModel, Field, Relationship, Column
 from sqlalchemy import DateTime
@@ -7,12 +9,29 @@ from sqlalchemy.orm import validates
 
 from app.models.Enum.StatutReservation import StatutReservation
 from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Enum.TypeRole import TypeRole
 
 if TYPE_CHECKING:
     from app.models.Ressource import Ressource
     from app.models.User import User
 
 
+class InfosRessource(NamedTuple):
+    type_ressource: TypeRessource
+    capacite_maximum: int
+
+
+@dataclass(frozen=True)
+class ContexteValidation:
+    """Ressources et rôles des créateurs préchargés pour valider un lot de réservations."""
+
+    ressources: dict[int, InfosRessource]
+    roles: dict[int, TypeRole]
+
+
+contexte_validation: ContextVar[Optional[ContexteValidation]] = ContextVar("contexte_validation", default=None)
+
+
 class ReservationBase(SQLModel):
     ressource_id: int = Field(foreign_key="ressources.id")
     user_id: int = Field(foreign_key="users.id")
@@ -27,6 +46,7 @@ class ReservationBase(SQLModel):
 
 class Reservation(ReservationBase, table=True):
     __tablename__ = "reservations"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -46,7 +66,7 @@ class Reservation(ReservationBase, table=True):
     )
     date_modification: datetime = Field(
         default_factory=datetime.now,
-        sa_column=Column(DateTime(timezone=True))
+        sa_column=Column(DateTime(timezone=True), index=True)
     )
 
     DUREE_MAX_PAR_TYPE: ClassVar[dict[TypeRessource, timedelta]] = {
@@ -55,7 +75,13 @@ class Reservation(ReservationBase, table=True):
         TypeRessource.equipement: timedelta(hours=8)
     }
 
-    def _check_duree(self, debut_value: Optional[datetime], fin_value: Optional[datetime]) -> None:
+    @classmethod
+    def regle_duree(
+        cls,
+        debut_value: Optional[datetime],
+        fin_value: Optional[datetime],
+        ressource: Optional[InfosRessource],
+    ) -> None:
         if not debut_value or not fin_value:
             return
 
@@ -67,19 +93,19 @@ class Reservation(ReservationBase, table=True):
         if duree < timedelta(minutes=30):
             raise ValueError("La durée minimale d'une réservation est de 30 minutes")
 
-        if hasattr(self, "ressource") and self.ressource:
-            duree_max = self.DUREE_MAX_PAR_TYPE.get(
-                self.ressource.type_ressource,
+        if ressource:
+            duree_max = cls.DUREE_MAX_PAR_TYPE.get(
+                ressource.type_ressource,
                 timedelta(hours=8)
             )
             if duree > duree_max:
                 raise ValueError(
-                    f"La durée maximale pour une {self.ressource.type_ressource.value} "
+                    f"La durée maximale pour une {ressource.type_ressource.value} "
                     f"est de {duree_max.total_seconds() / 3600:.0f} heures"
                 )
 
-    @validates("debut")
-    def validate_debut(self, key, debut):
+    @staticmethod
+    def regle_debut(debut: datetime, role_createur) -> None:
         if debut.minute not in [0, 15, 30, 45]:
             raise ValueError(
                 f"L'heure de début doit être arrondie à 15 minutes "
@@ -87,12 +113,53 @@ class Reservation(ReservationBase, table=True):
             )
 
         if debut < datetime.now():
-            if not hasattr(self, "createur") or not self.createur or self.createur.role != "admin":
+            if not role_createur or role_createur != "admin":
                 raise ValueError(
                     "Impossible de créer une réservation dans le passé. "
                     "Seuls les administrateurs peuvent le faire."
                 )
 
+    @staticmethod
+    def regle_fin(fin: datetime) -> None:
+        if fin.minute not in [0, 15, 30, 45]:
+            raise ValueError(
+                f"L'heure de fin doit être arrondie à 15 minutes "
+                f"(minutes actuelles: {fin.minute})"
+            )
+
+    @staticmethod
+    def regle_capacite(nbr_participants: int, ressource: Optional[InfosRessource]) -> None:
+        if ressource:
+            if nbr_participants > ressource.capacite_maximum:
+                raise ValueError(
+                    f"Le nombre de participants ({nbr_participants}) dépasse "
+                    f"la capacité maximale de la ressource ({ressource.capacite_maximum})"
+                )
+
+    def _infos_ressource(self) -> Optional[InfosRessource]:
+        # Contexte préchargé d'abord : évite le chargement paresseux de self.ressource
+        contexte = contexte_validation.get()
+        if contexte is not None and self.ressource_id in contexte.ressources:
+            return contexte.ressources[self.ressource_id]
+        if hasattr(self, "ressource") and self.ressource:
+            return InfosRessource(self.ressource.type_ressource, self.ressource.capacite_maximum)
+        return None
+
+    def _role_createur(self):
+        contexte = contexte_validation.get()
+        if contexte is not None and self.createur_id in contexte.roles:
+            return contexte.roles[self.createur_id]
+        if hasattr(self, "createur") and self.createur:
+            return self.createur.role
+        return None
+
+    def _check_duree(self, debut_value: Optional[datetime], fin_value: Optional[datetime]) -> None:
+        self.regle_duree(debut_value, fin_value, self._infos_ressource())
+
+    @validates("debut")
+    def validate_debut(self, key, debut):
+        self.regle_debut(debut, self._role_createur())
+
         # Vérifie la durée si fin est déjà renseignée
         fin_actuelle = getattr(self, "fin", None)
         self._check_duree(debut, fin_actuelle)
@@ -101,11 +168,7 @@ class Reservation(ReservationBase, table=True):
 
     @validates("fin")
     def validate_fin(self, key, fin):
-        if fin.minute not in [0, 15, 30, 45]:
-            raise ValueError(
-                f"L'heure de fin doit être arrondie à 15 minutes "
-                f"(minutes actuelles: {fin.minute})"
-            )
+        self.regle_fin(fin)
 
         debut_actuel = getattr(self, "debut", None)
         self._check_duree(debut_actuel, fin)
@@ -114,12 +177,7 @@ class Reservation(ReservationBase, table=True):
 
     @validates("nbr_participants")
     def validate_capacite(self, key, nbr_participants):
-        if hasattr(self, "ressource") and self.ressource:
-            if nbr_participants > self.ressource.capacite_maximum:
-                raise ValueError(
-                    f"Le nombre de participants ({nbr_participants}) dépasse "
-                    f"la capacité maximale de la ressource ({self.ressource.capacite_maximum})"
-                )
+        self.regle_capacite(nbr_participants, self._infos_ressource())
         return nbr_participants
 
     def peut_etre_annulee(self) -> bool:
@@ -0,0 +1,30 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime
+
+from app.models.Enum.StatutReservation import StatutReservation
+
+
+class ReservationArchive(SQLModel, table=True):
+    """Réservations terminées/annulées déplacées hors de la table chaude `reservations` (même id)."""
+
+    __tablename__ = "reservations_archive"
+
+    id: int = Field(primary_key=True)
+    ressource_id: int = Field(index=True)
+    user_id: int
+    createur_id: int
+    debut: datetime = Field(sa_column=Column(DateTime(timezone=True), index=True))
+    fin: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    statut: StatutReservation
+    description: str
+    nbr_participants: int = Field(default=1)
+    note: Optional[str] = Field(default=None)
+    date_creation: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    date_modification: datetime = Field(sa_column=Column(DateTime(timezone=True)))
+    date_archivage: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True))
+    )
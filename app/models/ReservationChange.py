@@ -0,0 +1,31 @@
+from datetime import datetime
+from typing import Optional, List
+
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import DateTime
+
+from app.models.Reservation import ReservationPublic
+
+
+class ReservationChange(SQLModel, table=True):
+    __tablename__ = "reservation_changes"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Séquence monotone : ordre de commit des modifications (une seule écriture à la fois sous SQLite)
+    sequence: Optional[int] = Field(default=None, primary_key=True)
+    reservation_id: int = Field(index=True)
+    ressource_id: int = Field(index=True)
+    # Bénéficiaire au moment du changement : filtre des changements visibles (suppressions comprises)
+    user_id: Optional[int] = Field(default=None)
+    operation: str
+    date_changement: datetime = Field(
+        default_factory=datetime.now,
+        sa_column=Column(DateTime(timezone=True))
+    )
+
+
+class ReservationChangesResponse(SQLModel):
+    modifiees: List[ReservationPublic]
+    supprimees: List[int]
+    token: str
+    has_more: bool
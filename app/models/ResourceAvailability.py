@@ -23,6 +23,7 @@ class ResourceAvailabilityBase(SQLModel):
 
 class ResourceAvailability(ResourceAvailabilityBase, table=True):
     __tablename__ = "resource_availabilities"
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -1,4 +1,4 @@
-from datetime import time
+from datetime import datetime, time
 from typing import Optional, List, TYPE_CHECKING
 from sqlalchemy import Column, JSON, Time, UniqueConstraint
 from sqlalchemy.orm import validates
@@ -6,6 +6,7 @@ from sqlmodel import SQLModel, Field, Relationship
 
 from app.models.Enum.EtatRessource import EtatRessource
 from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Reservation import ReservationPublicSimple
 
 if TYPE_CHECKING:
     from app.models.Site import Site
@@ -44,6 +45,7 @@ class Ressource(RessourceBase, table=True):
     __tablename__ = "ressources"
     __table_args__ = (
         UniqueConstraint("nom", "site_id", name="unique_nom_site"),
+        {"sqlite_autoincrement": True},
     )
 
     id: Optional[int] = Field(primary_key=True, default=None)
@@ -139,6 +141,52 @@ class RessourceListResponse(SQLModel):
     meta: RessourceListMeta
 
 
+# Sous-ensemble de RessourcePublic demandé via ?fields= : sérialisé avec exclude_unset
+class RessourcePartielle(SQLModel):
+    id: Optional[int] = None
+    nom: Optional[str] = None
+    type_ressource: Optional[TypeRessource] = None
+    capacite_maximum: Optional[int] = None
+    description: Optional[str] = None
+    caracteristiques: Optional[List[str]] = None
+    site_id: Optional[int] = None
+    localisation_batiment: Optional[str] = None
+    localisation_etage: Optional[str] = None
+    localisation_numero: Optional[str] = None
+    etat: Optional[EtatRessource] = None
+    horaires_ouverture: Optional[time] = None
+    horaires_fermeture: Optional[time] = None
+    images: Optional[List[str]] = None
+    tarifs_horaires: Optional[float] = None
+
+
+RESSOURCE_FIELDS = frozenset(RessourcePublic.model_fields)
+
+
+class RessourcePartielleListResponse(SQLModel):
+    items: List[RessourcePartielle]
+    meta: RessourceListMeta
+
+
+class AlternativeRessource(SQLModel):
+    id: int
+    nom: str
+    type_ressource: TypeRessource
+    capacite_maximum: int
+    site_id: int
+    localisation_batiment: str
+    localisation_etage: str
+    localisation_numero: str
+    proximite: str
+
+
+class AlternativesResponse(SQLModel):
+    ressource_id: int
+    debut: datetime
+    fin: datetime
+    items: List[AlternativeRessource]
+
+
 class RessourceStatistics(SQLModel):
     total_reservations: int
     reservations_actives: int
@@ -158,9 +206,20 @@ class DisponibiliteJour(SQLModel):
 class RessourceDetailResponse(SQLModel):
     ressource: RessourcePublic
     statistiques: RessourceStatistics
-    prochaines_reservations: List["ReservationPublicSimple"] = Field(default_factory=list)
+    prochaines_reservations: List[ReservationPublicSimple] = Field(default_factory=list)
     disponibilite_7_jours: List[DisponibiliteJour]
 
 
-from app.models.Reservation import ReservationPublicSimple
-RessourceDetailResponse.model_rebuild()
\ No newline at end of file
+class RessourceBatchDetailRequest(SQLModel):
+    ids: List[int] = Field(min_length=1, max_length=200)
+
+
+class RessourceBatchDetailResponse(SQLModel):
+    items: List[RessourceDetailResponse]
+
+
+class RessourcePartielleDetailResponse(SQLModel):
+    ressource: RessourcePartielle
+    statistiques: RessourceStatistics
+    prochaines_reservations: List[ReservationPublicSimple] = Field(default_factory=list)
+    disponibilite_7_jours: List[DisponibiliteJour]
@@ -5,6 +5,9 @@ from sqlalchemy import Column, Time
 from sqlalchemy.orm import validates
 from sqlmodel import Field, SQLModel, Relationship
 
+from app.models.Department import DepartmentPublic
+from app.models.Ressource import RessourcePublic
+
 if TYPE_CHECKING:
     from app.models.Ressource import Ressource
     from app.models.Department import Department
@@ -37,6 +40,11 @@ class SitePublic(SiteBase):
     id: int
 
 
+class SitePublicWithRelations(SitePublic):
+    ressources: Optional[List[RessourcePublic]] = None
+    departments: Optional[List[DepartmentPublic]] = None
+
+
 class SiteCreate(SiteBase):
     pass
 
@@ -64,6 +64,17 @@ class UserPublic(UserBase):
     date_creation: datetime
 
 
+class UserPublicSimple(SQLModel):
+    id: int
+    nom_utilisateur: str
+    email: str
+    nom_prenom: str
+    role: TypeRole
+    priorite: TypePriorite
+    site_principal_id: int
+    department_id: Optional[int] = None
+
+
 class UserCreate(UserBase):
     pass
 
@@ -80,4 +91,27 @@ class UserUpdate(SQLModel):
     priorite: Optional[TypePriorite] = None
     compte_actif: Optional[bool] = None
     site_principal_id: Optional[int] = None
-    department_id: Optional[int] = None
\ No newline at end of file
+    department_id: Optional[int] = None
+
+class UserImportRow(SQLModel):
+    nom_utilisateur: str = Field(min_length=3)
+    email: str
+    nom_prenom: str = Field(min_length=3)
+    password: str = Field(min_length=1)
+    role: TypeRole
+    priorite: TypePriorite
+    site_principal_id: int
+    department_id: Optional[int] = None
+
+
+class ErreurImport(SQLModel):
+    ligne: int
+    email: Optional[str] = None
+    erreurs: List[str]
+
+
+class ImportUtilisateursResponse(SQLModel):
+    total: int
+    crees: int
+    erreurs: List[ErreurImport]
+    utilisateurs: List[UserPublicSimple]
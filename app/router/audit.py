@@ -0,0 +1,36 @@
+from datetime import datetime
+from typing import Annotated, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.database.database import SessionDep
+from app.helpers.auth.permissions import require_admin
+from app.models.AuditLog import AuditLogPublic
+from app.services.audit import journal_audit, rechercher
+
+audit_router = APIRouter(prefix="/audit", tags=["audit"])
+
+
+@audit_router.get("/", response_model=List[AuditLogPublic])
+async def get_audit_log(
+    request: Request,
+    session: SessionDep,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    acteur_id: Optional[int] = None,
+    entite: Optional[str] = None,
+    entite_id: Optional[int] = None,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    limit: Annotated[int, Query(ge=1, le=500)] = 100,
+):
+    require_admin(request)
+    try:
+        return rechercher(session, debut, fin, acteur_id, entite, entite_id, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@audit_router.get("/metrics")
+async def audit_metrics(request: Request):
+    require_admin(request)
+    return journal_audit.metrics()
@@ -1,23 +1,56 @@
-from typing import Annotated
+from typing import Annotated, Optional
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from fastapi import HTTPException, APIRouter, Query, Request
-from app.models.Department import Department, DepartmentPublic, DepartmentCreate, DepartmentUpdate
-from app.models.User import User
-from app.models.Enum.TypeRole import TypeRole
+from app.models.Department import (
+    Department,
+    DepartmentPublic,
+    DepartmentCreate,
+    DepartmentUpdate,
+    DepartmentPublicWithRelations,
+)
+from app.models.User import User, UserPublicSimple
 from app.database.database import SessionDep
-from app.helpers.auth.permissions import require_manager_or_admin, require_admin
+from app.helpers.auth.dependencies import get_current_principal
+from app.helpers.auth.permissions import (
+    require_manager_or_admin,
+    require_admin,
+    require_site_manager,
+    require_department_manager,
+)
+from app.helpers.query import parse_expand
+from app.services import reference_data
 
 department_router = APIRouter(prefix="/departments", tags=["departments"])
 
+DEPARTMENT_RELATIONS = {
+    "users": Department.users,
+    "manager": Department.manager,
+}
+
+
+def check_manager(session, manager_id: int):
+    if reference_data.get_gestionnaire_role(manager_id) is not None:
+        return
+    if not session.get(User, manager_id):
+        raise HTTPException(status_code=404, detail="Manager Introuvable")
+    raise HTTPException(status_code=403, detail="L'utilisateur sélectionné doit être manager ou admin")
+
+
+def department_with_relations(department: Department, expand: frozenset[str]) -> DepartmentPublicWithRelations:
+    data = DepartmentPublic.model_validate(department).model_dump()
+    if "users" in expand:
+        data["users"] = [UserPublicSimple.model_validate(u) for u in department.users]
+    if "manager" in expand:
+        data["manager"] = UserPublicSimple.model_validate(department.manager) if department.manager else None
+    return DepartmentPublicWithRelations(**data)
+
 
 @department_router.post("/", response_model=DepartmentPublic)
 def create_department(department: DepartmentCreate, request: Request, session: SessionDep):
     require_manager_or_admin(request)
-    manager = session.get(User, department.manager_id)
-    if not manager:
-        raise HTTPException(status_code=404, detail="Manager Introuvable")
-    if manager.role not in [TypeRole.manager, TypeRole.admin]:
-        raise HTTPException(status_code=403, detail="L'utilisateur sélectionné doit être manager ou admin")
+    require_site_manager(request, department.site_id)
+    check_manager(session, department.manager_id)
     db_department = Department.model_validate(department)
     session.add(db_department)
     session.commit()
@@ -25,22 +58,47 @@ def create_department(department: DepartmentCreate, request: Request, session: S
     return db_department
 
 
-@department_router.get("/", response_model=list[DepartmentPublic])
+@department_router.get("/", response_model=list[DepartmentPublicWithRelations], response_model_exclude_unset=True)
 def get_departments(
+    request: Request,
     session: SessionDep,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    expand: Optional[str] = None,
+    geres: bool = False,
 ):
-    departments = session.exec(select(Department).offset(offset).limit(limit)).all()
-    return departments
+    relations = parse_expand(expand, set(DEPARTMENT_RELATIONS))
+    # geres : seulement les départements que l'appelant gère (tous pour un admin)
+    garder = get_current_principal(request).can_manage_department if geres else None
+    if not relations:
+        return reference_data.list_departments(offset, limit, garder)
+    stmt = select(Department).options(*[selectinload(DEPARTMENT_RELATIONS[r]) for r in relations])
+    if garder is None:
+        departments = session.exec(stmt.offset(offset).limit(limit)).all()
+    else:
+        # Table de référence : filtrée puis découpée en mémoire
+        departments = [d for d in session.exec(stmt.order_by(Department.id)).all() if garder(d.id)]
+        departments = departments[offset:offset + limit]
+    return [department_with_relations(d, relations) for d in departments]
 
 
-@department_router.get("/{department_id}", response_model=DepartmentPublic)
-def get_department(department_id: int, session: SessionDep):
-    department = session.get(Department, department_id)
+@department_router.get("/{department_id}", response_model=DepartmentPublicWithRelations, response_model_exclude_unset=True)
+def get_department(department_id: int, session: SessionDep, expand: Optional[str] = None):
+    relations = parse_expand(expand, set(DEPARTMENT_RELATIONS))
+    if not relations:
+        department = reference_data.get_department(department_id)
+        if not department:
+            raise HTTPException(status_code=404, detail="Department Introuvable")
+        return department
+    stmt = (
+        select(Department)
+        .where(Department.id == department_id)
+        .options(*[selectinload(DEPARTMENT_RELATIONS[r]) for r in relations])
+    )
+    department = session.exec(stmt).first()
     if not department:
         raise HTTPException(status_code=404, detail="Department Introuvable")
-    return department
+    return department_with_relations(department, relations)
 
 
 @department_router.put("/{department_id}", response_model=DepartmentPublic)
@@ -49,12 +107,11 @@ def update_department(department_id: int, department: DepartmentUpdate, request:
     department_db = session.get(Department, department_id)
     if not department_db:
         raise HTTPException(status_code=404, detail="Department Introuvable")
+    require_department_manager(request, department_id, department_db.site_id)
+    if department.site_id is not None:
+        require_site_manager(request, department.site_id)
     if department.manager_id is not None:
-        manager = session.get(User, department.manager_id)
-        if not manager:
-            raise HTTPException(status_code=404, detail="Manager Introuvable")
-        if manager.role not in [TypeRole.manager, TypeRole.admin]:
-            raise HTTPException(status_code=403, detail="L'utilisateur sélectionné doit être manager ou admin")
+        check_manager(session, department.manager_id)
     department_data = department.model_dump(exclude_unset=True)
     department_db.sqlmodel_update(department_data)
     session.add(department_db)
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.services.warmup import etat_demarrage
+
+health_router = APIRouter(prefix="/health", tags=["health"])
+
+
+@health_router.get("/live")
+async def health_live():
+    # Aucune dépendance : répond dès que la boucle d'événements tourne
+    return {"statut": "ok"}
+
+
+@health_router.get("/ready")
+async def health_ready():
+    etat = etat_demarrage.snapshot()
+    if not etat["pret"]:
+        return JSONResponse(status_code=503, content={"statut": "demarrage", **etat})
+    return {"statut": "pret", **etat}
@@ -0,0 +1,95 @@
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Request, status
+from fastapi.responses import FileResponse
+
+from app.database.database import SessionDep
+from app.helpers.auth.dependencies import get_current_user
+from app.helpers.auth.permissions import (
+    check_user_can_access_resource,
+    require_admin,
+    require_manager_or_admin,
+    require_site_manager,
+)
+from app.models.Enum.StatutTache import StatutTache
+from app.models.Job import ExportReservationsJobParams, Job, JobPublic
+from app.models.Ressource import Ressource
+from app.services.jobs import FileTachesPleine, gestionnaire_taches
+
+jobs_router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Rôle requis par type (défaut : manager ou admin, comme les rapports synchrones)
+PERMISSIONS = {
+    "allocation": require_admin,
+}
+
+
+def _perimetre_export(request: Request, session, parametres: dict):
+    # Données personnelles (user_id, note, description) : tous les sites pour un admin seulement,
+    # sinon le site ou la ressource demandés doivent être dans le périmètre du manager
+    params = ExportReservationsJobParams.model_validate(parametres)
+    if params.ressource_id is not None:
+        ressource = session.get(Ressource, params.ressource_id)
+        if not ressource:
+            raise HTTPException(status_code=404, detail="Ressource Introuvable")
+        require_site_manager(request, ressource.site_id)
+    if params.site_id is not None:
+        require_site_manager(request, params.site_id)
+    if params.ressource_id is None and params.site_id is None:
+        require_admin(request)
+
+
+# Vérifications dépendant des paramètres, après celle du rôle
+PERIMETRES = {
+    "export_reservations": _perimetre_export,
+}
+
+
+@jobs_router.get("/metrics")
+async def jobs_metrics(request: Request):
+    require_admin(request)
+    return gestionnaire_taches.metrics()
+
+
+@jobs_router.post("/{kind}", response_model=JobPublic, status_code=status.HTTP_202_ACCEPTED)
+def submit_job(
+    kind: str,
+    request: Request,
+    session: SessionDep,
+    parametres: Annotated[Optional[dict], Body()] = None,
+):
+    user = PERMISSIONS.get(kind, require_manager_or_admin)(request)
+    try:
+        if kind in PERIMETRES:
+            PERIMETRES[kind](request, session, parametres or {})
+        return gestionnaire_taches.soumettre(session, kind, parametres or {}, user.id)
+    except FileTachesPleine as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+def _job_visible(job_id: int, request: Request, session) -> Job:
+    job = session.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tâche Introuvable")
+    if not check_user_can_access_resource(get_current_user(request), job.demandeur_id):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    return job
+
+
+@jobs_router.get("/{job_id}", response_model=JobPublic)
+def read_job(job_id: int, request: Request, session: SessionDep):
+    return _job_visible(job_id, request, session)
+
+
+@jobs_router.get("/{job_id}/resultat")
+def read_job_result(job_id: int, request: Request, session: SessionDep):
+    job = _job_visible(job_id, request, session)
+    if job.statut != StatutTache.termine:
+        raise HTTPException(status_code=409, detail=f"Tâche non terminée (statut: {job.statut.value})")
+    chemin = gestionnaire_taches.chemin_resultat(job)
+    if chemin is None:
+        raise HTTPException(status_code=410, detail="Fichier de résultat supprimé")
+    media_type = "text/csv" if chemin.suffix == ".csv" else "application/json"
+    return FileResponse(chemin, media_type=media_type, filename=f"{job.kind}_{job.id}{chemin.suffix}")
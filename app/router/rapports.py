@@ -0,0 +1,56 @@
+from datetime import datetime
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.database.database import SessionDep
+from app.helpers.auth.permissions import require_manager_or_admin
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Rapport import HeatmapOccupation, RapportCapacite
+from app.services.capacite import rapport_capacite
+from app.services.occupation import calculer_heatmap
+
+rapports_router = APIRouter(prefix="/rapports", tags=["rapports"])
+
+
+@rapports_router.get("/heatmap", response_model=HeatmapOccupation)
+def occupation_heatmap(
+    request: Request,
+    session: SessionDep,
+    debut: datetime,
+    fin: datetime,
+    resolution: int = 60,
+    ressource_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    type_ressource: Optional[TypeRessource] = None,
+):
+    require_manager_or_admin(request)
+    try:
+        return calculer_heatmap(
+            session,
+            debut,
+            fin,
+            resolution=resolution,
+            ressource_id=ressource_id,
+            site_id=site_id,
+            type_ressource=type_ressource,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@rapports_router.get("/capacite", response_model=RapportCapacite)
+def capacity_report(
+    request: Request,
+    session: SessionDep,
+    debut: datetime,
+    fin: datetime,
+    site_id: Optional[int] = None,
+    type_ressource: Optional[TypeRessource] = None,
+    top: Annotated[int, Query(ge=1, le=50)] = 5,
+):
+    require_manager_or_admin(request)
+    try:
+        return rapport_capacite(session, debut, fin, site_id=site_id, type_ressource=type_ressource, top=top)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -0,0 +1,247 @@
+from datetime import datetime
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+
+from app.database.database import SessionDep
+from app.helpers.auth.dependencies import get_current_principal, get_current_user
+from app.helpers.auth.permissions import require_admin, check_user_can_access_resource
+from app.models.DemandeReservation import DemandeReservation, DemandeReservationCreate, DemandeReservationPublic
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.ListeAttente import ListeAttente, ListeAttenteCreate, ListeAttentePublic
+from app.models.Reservation import Reservation, ReservationCreate, ReservationPublic
+from app.models.ReservationChange import ReservationChangesResponse
+from app.models.Ressource import Ressource
+from app.models.User import User
+from app.services.reservations import (
+    preparer_reservation,
+    reserver,
+    chevauchement_existe,
+    get_booking_metrics,
+    ConflitReservation,
+    BaseOccupee,
+)
+from app.services.reservation_changes import TokenExpire, get_changes
+from app.services.archivage import archiver_reservations, historique_reservations
+from app.services.allocation import executer_allocation
+from app.services.liste_attente import liberer_reservation
+
+reservations_router = APIRouter(prefix="/reservations", tags=["reservations"])
+
+
+@reservations_router.get("/metrics")
+def booking_metrics(request: Request):
+    require_admin(request)
+    return get_booking_metrics()
+
+
+@reservations_router.get("/changes", response_model=ReservationChangesResponse)
+def reservation_changes(
+    request: Request,
+    session: SessionDep,
+    since: Optional[str] = None,
+    ressource_id: Optional[int] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 500,
+):
+    principal = get_current_principal(request)
+    try:
+        return get_changes(session, since, principal, ressource_id=ressource_id, limit=limit)
+    except TokenExpire as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@reservations_router.get("/historique", response_model=list[ReservationPublic])
+def reservation_history(
+    request: Request,
+    session: SessionDep,
+    ressource_id: int,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    limit: Annotated[int, Query(ge=1, le=1000)] = 500,
+):
+    principal = get_current_principal(request)
+    return historique_reservations(session, ressource_id, principal, debut, fin, limit)
+
+
+@reservations_router.post("/archivage")
+def archive_reservations(
+    request: Request,
+    batch_size: Annotated[Optional[int], Query(ge=1, le=10000)] = None,
+):
+    require_admin(request)
+    return archiver_reservations(batch_size)
+
+
+@reservations_router.post("/", response_model=ReservationPublic, status_code=status.HTTP_201_CREATED)
+def create_reservation(reservation: ReservationCreate, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    if not check_user_can_access_resource(user, reservation.user_id):
+        raise HTTPException(status_code=403, detail="Impossible de réserver pour un autre utilisateur")
+
+    ressource = session.get(Ressource, reservation.ressource_id)
+    if not ressource:
+        raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    if not ressource.est_disponible():
+        raise HTTPException(status_code=400, detail=f"Ressource {ressource.etat.value}")
+
+    createur = session.get(User, user.id)
+    try:
+        db_reservation = preparer_reservation(reservation, ressource, createur)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return reserver(session, db_reservation)
+    except ConflitReservation as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BaseOccupee as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+
+@reservations_router.post("/demandes", response_model=DemandeReservationPublic, status_code=status.HTTP_202_ACCEPTED)
+def create_demande(demande: DemandeReservationCreate, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    if not check_user_can_access_resource(user, demande.user_id):
+        raise HTTPException(status_code=403, detail="Impossible de réserver pour un autre utilisateur")
+
+    ressource = session.get(Ressource, demande.ressource_id)
+    if not ressource:
+        raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    if not ressource.est_disponible():
+        raise HTTPException(status_code=400, detail=f"Ressource {ressource.etat.value}")
+    beneficiaire = session.get(User, demande.user_id)
+    if not beneficiaire:
+        raise HTTPException(status_code=404, detail="Utilisateur Introuvable")
+
+    # Mêmes validations qu'une réservation directe (créneau, durée, capacité)
+    createur = session.get(User, user.id)
+    try:
+        preparer_reservation(
+            ReservationCreate(**demande.model_dump(), createur_id=user.id, statut=StatutReservation.confirme),
+            ressource,
+            createur,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    db_demande = DemandeReservation.model_validate(
+        demande, update={"createur_id": user.id, "priorite": beneficiaire.priorite}
+    )
+    session.add(db_demande)
+    session.commit()
+    session.refresh(db_demande)
+    return db_demande
+
+
+@reservations_router.post("/demandes/allouer")
+def allocate_demandes(request: Request, session: SessionDep, jusqu_a: Optional[datetime] = None):
+    require_admin(request)
+    try:
+        return executer_allocation(session, jusqu_a)
+    except BaseOccupee as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+@reservations_router.get("/demandes/{demande_id}", response_model=DemandeReservationPublic)
+def read_demande(demande_id: int, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    demande = session.get(DemandeReservation, demande_id)
+    if not demande:
+        raise HTTPException(status_code=404, detail="Demande Introuvable")
+    if not check_user_can_access_resource(user, demande.user_id):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    return demande
+
+
+@reservations_router.post("/liste-attente", response_model=ListeAttentePublic, status_code=status.HTTP_201_CREATED)
+def join_waitlist(inscription: ListeAttenteCreate, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    if not check_user_can_access_resource(user, inscription.user_id):
+        raise HTTPException(status_code=403, detail="Impossible d'inscrire un autre utilisateur")
+
+    ressource = session.get(Ressource, inscription.ressource_id)
+    if not ressource:
+        raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    beneficiaire = session.get(User, inscription.user_id)
+    if not beneficiaire:
+        raise HTTPException(status_code=404, detail="Utilisateur Introuvable")
+
+    createur = session.get(User, user.id)
+    try:
+        preparer_reservation(
+            ReservationCreate(**inscription.model_dump(), createur_id=user.id, statut=StatutReservation.confirme),
+            ressource,
+            createur,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not chevauchement_existe(session, inscription.ressource_id, inscription.debut, inscription.fin):
+        raise HTTPException(status_code=400, detail="Créneau disponible : réservez directement")
+
+    db_inscription = ListeAttente.model_validate(
+        inscription, update={"createur_id": user.id, "priorite": beneficiaire.priorite}
+    )
+    session.add(db_inscription)
+    session.commit()
+    session.refresh(db_inscription)
+    return db_inscription
+
+
+@reservations_router.get("/liste-attente/{inscription_id}", response_model=ListeAttentePublic)
+def read_waitlist_entry(inscription_id: int, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    inscription = session.get(ListeAttente, inscription_id)
+    if not inscription:
+        raise HTTPException(status_code=404, detail="Inscription Introuvable")
+    if not check_user_can_access_resource(user, inscription.user_id):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    return inscription
+
+
+@reservations_router.delete("/liste-attente/{inscription_id}")
+def leave_waitlist(inscription_id: int, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    inscription = session.get(ListeAttente, inscription_id)
+    if not inscription:
+        raise HTTPException(status_code=404, detail="Inscription Introuvable")
+    if not check_user_can_access_resource(user, inscription.user_id):
+        raise HTTPException(status_code=403, detail="Accès refusé")
+    session.delete(inscription)
+    session.commit()
+    return {"ok": True}
+
+
+@reservations_router.post("/{reservation_id}/annuler", response_model=ReservationPublic)
+def cancel_reservation(reservation_id: int, request: Request, session: SessionDep):
+    user = get_current_user(request)
+    reservation = session.get(Reservation, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Réservation Introuvable")
+    if not check_user_can_access_resource(user, reservation.user_id):
+        raise HTTPException(status_code=403, detail="Impossible d'annuler la réservation d'un autre utilisateur")
+    try:
+        liberer_reservation(session, reservation)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except BaseOccupee as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    session.refresh(reservation)
+    return reservation
+
+
+@reservations_router.delete("/{reservation_id}")
+def delete_reservation(reservation_id: int, request: Request, session: SessionDep):
+    require_admin(request)
+    reservation = session.get(Reservation, reservation_id)
+    if not reservation:
+        raise HTTPException(status_code=404, detail="Réservation Introuvable")
+    try:
+        liberer_reservation(session, reservation, supprimer=True)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except BaseOccupee as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return {"ok": True}
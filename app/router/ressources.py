@@ -1,10 +1,14 @@
-from typing import Annotated, Optional, Literal
+from datetime import datetime
+from typing import Annotated, Optional, Literal, Union
 
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.params import Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import load_only
 from sqlmodel import select
 
-from app.database.database import SessionDep
+from app.database import sharding
+from app.database.database import SessionDep, new_session
 from app.models.Enum.TypeRessource import TypeRessource
 from app.models.Ressource import (
     Ressource,
@@ -13,20 +17,38 @@ from app.models.Ressource import (
     RessourceUpdate,
     RessourceListResponse,
     RessourceDetailResponse,
+    RessourceBatchDetailRequest,
+    RessourceBatchDetailResponse,
+    AlternativesResponse,
+    RessourcePartielle,
+    RessourcePartielleListResponse,
+    RessourcePartielleDetailResponse,
+    RESSOURCE_FIELDS,
 )
-from app.helpers.auth.permissions import require_admin, require_manager_or_admin
+from app.helpers.auth.dependencies import get_current_principal
+from app.helpers.auth.permissions import require_admin, require_manager_or_admin, require_site_manager
+from app.helpers import responses
+from app.helpers.query import parse_fields
 from app.services.ressources import (
     ressource_list,
+    ressource_list_cache,
     get_ressource_statistics,
     get_prochaines_reservations,
     get_disponibilite_7_jours,
+    get_ressources_details,
 )
+from app.services.events import broker, event_stream, ressource_topic
+from app.services.liste_attente import profondeur
+from app.services.localisation import alternatives_libres
+from app.models.ListeAttente import ProfondeurListeAttente
 
 ressources_router = APIRouter(prefix="/ressources", tags=["ressources"])
 
 
-@ressources_router.get("/", response_model=RessourceListResponse)
+# Avec `fields`, la réponse partielle (champs demandés seulement) est décrite par le second modèle
+@ressources_router.get("/", response_model=Union[RessourceListResponse, RessourcePartielleListResponse])
 async def get_ressources(
+        request: Request,
         session: SessionDep,
         offset: Annotated[int, Query(ge=0)] = 0,
         limit: Annotated[int, Query(ge=1, le=200)] = 100,
@@ -42,8 +64,13 @@ async def get_ressources(
 
         sort_by: Annotated[Literal["nom", "capacite", "type"], Query()] = "nom",
         sort_order: Annotated[Literal["asc", "desc"], Query()] = "asc",
+        fields: Optional[str] = None,
+        geres: bool = False,
 ):
-    return ressource_list(
+    champs = parse_fields(fields, RESSOURCE_FIELDS)
+    # geres : seulement les ressources des sites que l'appelant gère (toutes pour un admin)
+    site_ids = get_current_principal(request).managed_site_ids() if geres else None
+    result = ressource_list(
         session,
         offset=offset,
         limit=limit,
@@ -55,12 +82,54 @@ async def get_ressources(
         minimum_capacity=minimum_capacity,
         sort_by=sort_by,
         sort_order=sort_order,
+        fields=champs,
+        site_ids=site_ids,
     )
+    if champs:
+        # Seuls les champs demandés sont sérialisés, quel que soit RESA_FAST_RESPONSES
+        return responses.fast_json(RessourcePartielleListResponse.model_validate(result), exclude_unset=True)
+    if responses.FAST_RESPONSES:
+        return responses.fast_json(RessourceListResponse.model_validate(result))
+    return result
 
 
-@ressources_router.get("/{ressource_id}", response_model=RessourceDetailResponse)
-async def get_ressource(ressource_id: int, session: SessionDep):
-    ressource = session.get(Ressource, ressource_id)
+@ressources_router.get("/cache/metrics")
+async def ressource_cache_metrics(request: Request):
+    require_admin(request)
+    return ressource_list_cache.metrics()
+
+
+@ressources_router.post("/batch-detail", response_model=RessourceBatchDetailResponse)
+async def get_ressources_batch_detail(demande: RessourceBatchDetailRequest, session: SessionDep):
+    # Ordre de la demande conservé, doublons ignorés
+    ids = list(dict.fromkeys(demande.ids))
+    trouvees = {r.id: r for r in session.exec(select(Ressource).where(Ressource.id.in_(ids))).all()}
+    manquantes = [i for i in ids if i not in trouvees]
+    if manquantes:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Ressource(s) introuvable(s): {', '.join(map(str, manquantes))}"
+        )
+
+    detail = RessourceBatchDetailResponse(items=get_ressources_details(session, [trouvees[i] for i in ids]))
+    if responses.FAST_RESPONSES:
+        return responses.fast_json(detail)
+    return detail
+
+
+@ressources_router.get(
+    "/{ressource_id}", response_model=Union[RessourceDetailResponse, RessourcePartielleDetailResponse]
+)
+async def get_ressource(ressource_id: int, session: SessionDep, fields: Optional[str] = None):
+    champs = parse_fields(fields, RESSOURCE_FIELDS)
+    if champs:
+        # "etat" est toujours chargé : la disponibilité sur 7 jours en dépend
+        colonnes = [getattr(Ressource, c) for c in sorted(champs | {"etat"})]
+        ressource = session.exec(
+            select(Ressource).options(load_only(*colonnes)).where(Ressource.id == ressource_id)
+        ).first()
+    else:
+        ressource = session.get(Ressource, ressource_id)
     if not ressource:
         raise HTTPException(status_code=404, detail="Ressource Introuvable")
 
@@ -68,12 +137,63 @@ async def get_ressource(ressource_id: int, session: SessionDep):
     prochaines_reservations = get_prochaines_reservations(session, ressource_id, limit=5)
     disponibilite_7_jours = get_disponibilite_7_jours(session, ressource_id, ressource)
 
-    return RessourceDetailResponse(
+    if champs:
+        detail = RessourcePartielleDetailResponse(
+            ressource=RessourcePartielle(**{c: getattr(ressource, c) for c in champs}),
+            statistiques=statistiques,
+            prochaines_reservations=prochaines_reservations,
+            disponibilite_7_jours=disponibilite_7_jours
+        )
+        return responses.fast_json(detail, exclude_unset=True)
+
+    detail = RessourceDetailResponse(
         ressource=RessourcePublic.model_validate(ressource),
         statistiques=statistiques,
         prochaines_reservations=prochaines_reservations,
         disponibilite_7_jours=disponibilite_7_jours
     )
+    if responses.FAST_RESPONSES:
+        return responses.fast_json(detail)
+    return detail
+
+
+@ressources_router.get("/{ressource_id}/events")
+async def ressource_events(ressource_id: int, request: Request):
+    # Session fermée avant le flux : un abonné ne garde aucune connexion à la base
+    with new_session() as session:
+        if not session.get(Ressource, ressource_id):
+            raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    subscriber = broker.subscribe([ressource_topic(ressource_id)])
+    return StreamingResponse(
+        event_stream(request, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@ressources_router.get("/{ressource_id}/liste-attente", response_model=ProfondeurListeAttente)
+async def ressource_waitlist_depth(ressource_id: int, session: SessionDep):
+    if not session.get(Ressource, ressource_id):
+        raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    return ProfondeurListeAttente(ressource_id=ressource_id, profondeur=profondeur(session, ressource_id))
+
+
+@ressources_router.get("/{ressource_id}/alternatives", response_model=AlternativesResponse)
+async def ressource_alternatives(
+        ressource_id: int,
+        session: SessionDep,
+        debut: datetime,
+        fin: datetime,
+        nbr_participants: Annotated[Optional[int], Query(ge=1)] = None,
+        limit: Annotated[int, Query(ge=1, le=50)] = 5,
+):
+    try:
+        items = alternatives_libres(session, ressource_id, debut, fin, nbr_participants, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if items is None:
+        raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    return AlternativesResponse(ressource_id=ressource_id, debut=debut, fin=fin, items=items)
 
 
 @ressources_router.post("/", response_model=RessourcePublic)
@@ -94,6 +214,11 @@ async def update_ressource(ressource_id: int, ressource: RessourceUpdate, reques
     ressource_db = session.get(Ressource, ressource_id)
     if not ressource_db:
         raise HTTPException(status_code=404, detail="Ressource Introuvable")
+    require_site_manager(request, ressource_db.site_id)
+    if ressource.site_id is not None:
+        require_site_manager(request, ressource.site_id)
+        if sharding.SHARDING_ENABLED and ressource.site_id != ressource_db.site_id:
+            raise HTTPException(status_code=400, detail="Changement de site impossible en mode shardé")
     ressource_data = ressource.model_dump(exclude_unset=True)
     ressource_db.sqlmodel_update(ressource_data)
     session.add(ressource_db)
@@ -1,14 +1,27 @@
-from typing import Annotated
+from typing import Annotated, Optional
+from sqlalchemy.orm import selectinload
 from sqlmodel import select
 from fastapi import HTTPException, APIRouter, Query, Request
-from app.models.Site import Site, SitePublic, SiteCreate, SiteUpdate
+from fastapi.responses import StreamingResponse
+from app.models.Site import Site, SitePublic, SiteCreate, SiteUpdate, SitePublicWithRelations
+from app.models.Ressource import RessourcePublic
+from app.models.Department import DepartmentPublic
 from app.database.database import SessionDep
+from app.helpers.query import parse_expand
+from app.services import reference_data
+from app.services.events import broker, event_stream, site_topic
 from datetime import time as time_type
 
-from app.helpers.auth.permissions import require_manager_or_admin, require_admin
+from app.helpers.auth.dependencies import get_current_principal
+from app.helpers.auth.permissions import require_manager_or_admin, require_admin, require_site_manager
 
 site_router = APIRouter(prefix="/sites", tags=["sites"])
 
+SITE_RELATIONS = {
+    "ressources": Site.ressources,
+    "departments": Site.departments,
+}
+
 def traduction_str_heure(heure: str) -> time_type:
     h, m, s = map(int, heure.split(':'))
     return time_type(h, m, s)
@@ -24,22 +37,61 @@ def create_site(site: SiteCreate, request: Request,session: SessionDep):
     return db_site
 
 
-@site_router.get("/", response_model=list[SitePublic])
+def site_with_relations(site: Site, expand: frozenset[str]) -> SitePublicWithRelations:
+    data = SitePublic.model_validate(site).model_dump()
+    if "ressources" in expand:
+        data["ressources"] = [RessourcePublic.model_validate(r) for r in site.ressources]
+    if "departments" in expand:
+        data["departments"] = [DepartmentPublic.model_validate(d) for d in site.departments]
+    return SitePublicWithRelations(**data)
+
+
+@site_router.get("/", response_model=list[SitePublicWithRelations], response_model_exclude_unset=True)
 def get_sites(
+    request: Request,
     session: SessionDep,
     offset: int = 0,
     limit: Annotated[int, Query(le=100)] = 100,
+    expand: Optional[str] = None,
+    geres: bool = False,
 ):
-    sites = session.exec(select(Site).offset(offset).limit(limit)).all()
-    return sites
+    relations = parse_expand(expand, set(SITE_RELATIONS))
+    # geres : seulement les sites que l'appelant gère (tous pour un admin)
+    site_ids = get_current_principal(request).managed_site_ids() if geres else None
+    if not relations:
+        return reference_data.list_sites(offset, limit, site_ids)
+    stmt = select(Site).options(*[selectinload(SITE_RELATIONS[r]) for r in relations])
+    if site_ids is not None:
+        stmt = stmt.where(Site.id.in_(site_ids))
+    sites = session.exec(stmt.offset(offset).limit(limit)).all()
+    return [site_with_relations(site, relations) for site in sites]
 
 
-@site_router.get("/{site_id}", response_model=SitePublic)
-def get_site(site_id: int, session: SessionDep):
-    site = session.get(Site, site_id)
+@site_router.get("/{site_id}", response_model=SitePublicWithRelations, response_model_exclude_unset=True)
+def get_site(site_id: int, session: SessionDep, expand: Optional[str] = None):
+    relations = parse_expand(expand, set(SITE_RELATIONS))
+    if not relations:
+        site = reference_data.get_site(site_id)
+        if not site:
+            raise HTTPException(status_code=404, detail="Site Introuvable")
+        return site
+    stmt = select(Site).where(Site.id == site_id).options(*[selectinload(SITE_RELATIONS[r]) for r in relations])
+    site = session.exec(stmt).first()
     if not site:
         raise HTTPException(status_code=404, detail="Site Introuvable")
-    return site
+    return site_with_relations(site, relations)
+
+
+@site_router.get("/{site_id}/events")
+async def site_events(site_id: int, request: Request):
+    if not reference_data.get_site(site_id):
+        raise HTTPException(status_code=404, detail="Site Introuvable")
+    subscriber = broker.subscribe([site_topic(site_id)])
+    return StreamingResponse(
+        event_stream(request, subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @site_router.put("/{site_id}", response_model=SitePublic)
@@ -48,6 +100,7 @@ def update_site(site_id: int, site: SiteUpdate, request: Request,session: Sessio
     site_db = session.get(Site, site_id)
     if not site_db:
         raise HTTPException(status_code=404, detail="Site Introuvable")
+    require_site_manager(request, site_id)
     site_data = site.model_dump(exclude_unset=True)
     site_db.sqlmodel_update(site_data)
     session.add(site_db)
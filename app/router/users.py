@@ -0,0 +1,41 @@
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Body, HTTPException, Request, status
+from sqlalchemy.exc import IntegrityError
+
+from app.database.database import SessionDep
+from app.helpers.auth.permissions import require_admin
+from app.models.User import ImportUtilisateursResponse
+from app.services.import_utilisateurs import (
+    ImportInvalide,
+    format_depuis_content_type,
+    importer_utilisateurs,
+    lire_lignes,
+)
+
+users_router = APIRouter(prefix="/users", tags=["users"])
+
+
+@users_router.post("/import", response_model=ImportUtilisateursResponse)
+def import_users(
+    request: Request,
+    session: SessionDep,
+    contenu: Annotated[bytes, Body(media_type="text/csv")],
+    format: Optional[Literal["csv", "ndjson"]] = None,
+):
+    require_admin(request)
+    try:
+        format_import = format or format_depuis_content_type(request.headers.get("content-type", ""))
+        lignes = lire_lignes(contenu, format_import)
+    except ImportInvalide as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        return importer_utilisateurs(session, lignes)
+    except IntegrityError:
+        # Inscription concurrente d'un même email entre la vérification et le commit
+        session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Conflit d'unicité pendant l'import, aucun utilisateur créé : relancez l'import"
+        )
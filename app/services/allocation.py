@@ -0,0 +1,189 @@
+import bisect
+from collections import defaultdict
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+
+from app.database import sharding
+from app.models.DemandeReservation import DemandeReservation
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutDemande import StatutDemande
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.services.reservations import (
+    STATUTS_ACTIFS,
+    BaseOccupee,
+    _is_busy,
+    precharger_validation,
+    valider_lot,
+    validation_groupee,
+)
+
+RANG_PRIORITE = {TypePriorite.prioritaire: 0, TypePriorite.standard: 1}
+
+
+class Planning:
+    """Créneaux occupés d'une ressource : intervalles disjoints triés par début."""
+
+    __slots__ = ("debuts", "fins")
+
+    def __init__(self, intervalles: Iterable[tuple] = ()):
+        self.debuts = []
+        self.fins = []
+        for debut, fin in sorted(intervalles):
+            # Les occupations existantes qui se chevauchent sont fusionnées
+            if self.fins and debut < self.fins[-1]:
+                self.fins[-1] = max(self.fins[-1], fin)
+            else:
+                self.debuts.append(debut)
+                self.fins.append(fin)
+
+    def est_libre(self, debut, fin) -> bool:
+        # Intervalles disjoints : seuls le précédent et le suivant peuvent chevaucher
+        i = bisect.bisect_right(self.debuts, debut)
+        if i and self.fins[i - 1] > debut:
+            return False
+        return i == len(self.debuts) or self.debuts[i] >= fin
+
+    def occuper(self, debut, fin):
+        i = bisect.bisect_right(self.debuts, debut)
+        self.debuts.insert(i, debut)
+        self.fins.insert(i, fin)
+
+
+def cle_priorite(demande) -> tuple:
+    return RANG_PRIORITE[demande.priorite], demande.date_demande, demande.id
+
+
+def allouer(demandes: Iterable, occupations: dict[int, list[tuple]]) -> tuple[list, list]:
+    """Attribue les demandes par priorité puis ancienneté ; renvoie (acceptées, rejetées)."""
+    plannings: dict[int, Planning] = {}
+    acceptees, rejetees = [], []
+    for demande in sorted(demandes, key=cle_priorite):
+        planning = plannings.get(demande.ressource_id)
+        if planning is None:
+            planning = plannings[demande.ressource_id] = Planning(occupations.get(demande.ressource_id, ()))
+        if planning.est_libre(demande.debut, demande.fin):
+            planning.occuper(demande.debut, demande.fin)
+            acceptees.append(demande)
+        else:
+            rejetees.append(demande)
+    return acceptees, rejetees
+
+
+def _sur_shard(statement, shard_id: Optional[str]):
+    return statement if shard_id is None else statement.execution_options(_sa_shard_id=shard_id)
+
+
+def _rejeter(demande: DemandeReservation, motif: str):
+    demande.statut = StatutDemande.rejetee
+    demande.motif = motif
+
+
+def _allouer_shard(session, shard_id: Optional[str], jusqu_a: datetime) -> dict:
+    # Verrou d'écriture pris d'entrée : occupations lues et réservations créées dans la même transaction
+    conn = session.connection(bind_arguments={"shard_id": shard_id} if shard_id else None)
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+    demandes = session.exec(_sur_shard(
+        select(DemandeReservation).where(
+            DemandeReservation.statut == StatutDemande.en_attente,
+            DemandeReservation.date_demande <= jusqu_a,
+        ),
+        shard_id,
+    )).all()
+    if not demandes:
+        session.rollback()
+        return {"allouees": 0, "rejetees": 0}
+
+    debut_min = min(d.debut for d in demandes)
+    fin_max = max(d.fin for d in demandes)
+    occupations = defaultdict(list)
+    for ressource_id, debut, fin in session.exec(_sur_shard(
+        select(Reservation.ressource_id, Reservation.debut, Reservation.fin).where(
+            Reservation.statut.in_(STATUTS_ACTIFS),
+            Reservation.debut < fin_max,
+            Reservation.fin > debut_min,
+        ),
+        shard_id,
+    )):
+        occupations[ressource_id].append((debut, fin))
+
+    indisponibles = set(session.exec(_sur_shard(
+        select(Ressource.id).where(Ressource.etat != EtatRessource.active),
+        shard_id,
+    )).all())
+
+    now = datetime.now()
+    candidates = []
+    for demande in demandes:
+        if demande.ressource_id in indisponibles:
+            _rejeter(demande, "Ressource indisponible")
+        elif demande.debut < now:
+            _rejeter(demande, "Le créneau a déjà commencé")
+        else:
+            candidates.append(demande)
+
+    # Règles de Reservation sur tout le lot : une requête pour les ressources, une pour les créateurs
+    contexte = precharger_validation(session, candidates)
+    valides = []
+    for demande, erreur in zip(candidates, valider_lot(candidates, contexte)):
+        if erreur:
+            _rejeter(demande, erreur)
+        else:
+            valides.append(demande)
+
+    acceptees, en_conflit = allouer(valides, occupations)
+    for demande in en_conflit:
+        _rejeter(demande, "Créneau attribué à une demande prioritaire ou antérieure")
+
+    # Horodatages passés explicitement : évite les default_factory pydantic sur des milliers d'instances
+    with validation_groupee(contexte):
+        reservations = [
+            (demande, Reservation(
+                ressource_id=demande.ressource_id,
+                user_id=demande.user_id,
+                createur_id=demande.createur_id,
+                debut=demande.debut,
+                fin=demande.fin,
+                statut=StatutReservation.confirme,
+                description=demande.description,
+                nbr_participants=demande.nbr_participants,
+                note=demande.note,
+                date_creation=now,
+                date_modification=now,
+            ))
+            for demande in acceptees
+        ]
+    session.add_all([reservation for _, reservation in reservations])
+    session.flush()
+    for demande, reservation in reservations:
+        demande.statut = StatutDemande.allouee
+        demande.reservation_id = reservation.id
+    session.commit()
+
+    return {"allouees": len(acceptees), "rejetees": len(demandes) - len(acceptees)}
+
+
+def executer_allocation(session, jusqu_a: Optional[datetime] = None) -> dict:
+    """Attribue en un lot les demandes en attente reçues jusqu'à `jusqu_a` (une transaction par base)."""
+    jusqu_a = jusqu_a or datetime.now()
+    shard_ids = session.site_shard_ids() if sharding.is_sharded_session(session) else [None]
+
+    total = {"allouees": 0, "rejetees": 0}
+    for shard_id in shard_ids:
+        try:
+            resultat = _allouer_shard(session, shard_id, jusqu_a)
+        except OperationalError as e:
+            session.rollback()
+            if not _is_busy(e):
+                raise
+            raise BaseOccupee("Base de données occupée, réessayez plus tard") from e
+        total["allouees"] += resultat["allouees"]
+        total["rejetees"] += resultat["rejetees"]
+    return total
@@ -0,0 +1,127 @@
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal
+from sqlalchemy.engine import Engine
+from sqlmodel import select
+
+from app.database import sharding
+from app.database.engines import get_engine
+from app.helpers.dates import heure_locale
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Reservation import Reservation
+from app.models.ReservationArchive import ReservationArchive
+from app.helpers.auth.policy import Principal
+from app.services.reservation_changes import CHANGES_RETENTION_DAYS, conditions_visibles, purger_changements
+
+# Réservations terminées depuis plus de ARCHIVE_AGE_DAYS jours -> reservations_archive
+ARCHIVE_AGE_DAYS = int(os.getenv("RESA_ARCHIVE_AGE_DAYS", "180"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("RESA_ARCHIVE_BATCH_SIZE", "500"))
+
+STATUTS_ARCHIVABLES = (StatutReservation.fini, StatutReservation.annule, StatutReservation.non_present)
+
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    # Toujours ARCHIVE_AGE_DAYS : range_needs_archive repose sur ce seuil unique
+    return (now or datetime.now()) - timedelta(days=ARCHIVE_AGE_DAYS)
+
+
+def range_needs_archive(debut: Optional[datetime], now: Optional[datetime] = None) -> bool:
+    # Les lignes archivées ont toutes fin < cutoff : inutile de lire l'archive pour une plage plus récente
+    return debut is None or heure_locale(debut) < archive_cutoff(now)
+
+
+def _archiver_lot(conn, cutoff: datetime, batch_size: int) -> int:
+    ids = conn.execute(
+        select(Reservation.id)
+        .where(Reservation.fin < cutoff, Reservation.statut.in_(STATUTS_ARCHIVABLES))
+        .order_by(Reservation.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return 0
+
+    source = Reservation.__table__
+    archive = ReservationArchive.__table__
+    colonnes = [c.name for c in archive.columns if c.name != "date_archivage"]
+    conn.execute(
+        insert(archive).from_select(
+            colonnes + ["date_archivage"],
+            select(*[source.c[nom] for nom in colonnes], literal(datetime.now(), archive.c.date_archivage.type))
+            .where(source.c.id.in_(ids)),
+        )
+    )
+    conn.execute(delete(source).where(source.c.id.in_(ids)))
+    return len(ids)
+
+
+def _archiver_engine(db_engine: Engine, cutoff: datetime, batch_size: int) -> int:
+    total = 0
+    while True:
+        # Une transaction courte par lot pour ne pas bloquer les écritures de réservations
+        with db_engine.begin() as conn:
+            archivees = _archiver_lot(conn, cutoff, batch_size)
+        total += archivees
+        if archivees < batch_size:
+            return total
+
+
+def _reservation_engines() -> list[Engine]:
+    if not sharding.SHARDING_ENABLED:
+        return [get_engine()]
+    return [
+        sharding.get_site_engine(sharding.site_for_shard_id(shard_id))
+        for shard_id in sharding.all_site_shard_ids(get_engine())
+    ]
+
+
+def archiver_reservations(batch_size: Optional[int] = None) -> dict:
+    cutoff = archive_cutoff()
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    changements_avant = datetime.now() - timedelta(days=CHANGES_RETENTION_DAYS)
+    total = purges = 0
+    for db_engine in _reservation_engines():
+        total += _archiver_engine(db_engine, cutoff, batch_size)
+        with db_engine.begin() as conn:
+            purges += purger_changements(conn, changements_avant)
+    return {"archivees": total, "avant": cutoff, "changements_purges": purges}
+
+
+def duree_agregats(session, model, ressource_id: int, *conditions) -> tuple[int, float]:
+    """(nombre, somme des durées en minutes) des réservations de `model` pour une ressource."""
+    count, minutes = session.exec(
+        select(
+            func.count(),
+            func.coalesce(func.sum((func.julianday(model.fin) - func.julianday(model.debut)) * 1440), 0),
+        )
+        .select_from(model)
+        .where(model.ressource_id == ressource_id, *conditions)
+    ).one()
+    return count, float(minutes)
+
+
+def historique_reservations(
+    session,
+    ressource_id: int,
+    principal: Principal,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    limit: int = 500,
+) -> list:
+    debut, fin = heure_locale(debut), heure_locale(fin)
+
+    def lire(model):
+        # Mêmes règles de visibilité que le flux /changes, archives comprises
+        conditions = [model.ressource_id == ressource_id, *conditions_visibles(model, principal)]
+        if debut is not None:
+            conditions.append(model.fin > debut)
+        if fin is not None:
+            conditions.append(model.debut < fin)
+        return session.exec(select(model).where(*conditions).order_by(model.debut).limit(limit)).all()
+
+    reservations = list(lire(Reservation))
+    if range_needs_archive(debut):
+        reservations.extend(lire(ReservationArchive))
+        reservations.sort(key=lambda r: r.debut)
+    return reservations[:limit]
@@ -0,0 +1,251 @@
+import logging
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from pydantic_core import to_jsonable_python
+from sqlalchemy import event, insert, inspect
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import select
+
+from app.helpers.dates import heure_locale
+from app.models.AuditLog import AuditLog
+from app.models.Department import Department
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+
+logger = logging.getLogger(__name__)
+
+# Événements en attente d'écriture ; file pleine : le producteur écrit lui-même son lot
+AUDIT_QUEUE_SIZE = int(os.getenv("RESA_AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("RESA_AUDIT_BATCH_SIZE", "500"))
+# Délai maximal entre un commit et l'écriture de sa trace (secondes)
+AUDIT_FLUSH_INTERVAL = float(os.getenv("RESA_AUDIT_FLUSH_INTERVAL", "0.5"))
+
+# Modèle audité -> nom d'entité
+AUDITED_MODELS = {
+    Site: "sites",
+    Department: "departments",
+    Ressource: "ressources",
+    Reservation: "reservations",
+}
+
+# Réveille le thread d'écriture à l'arrêt
+_ARRET = object()
+
+# Utilisateur authentifié de la requête en cours, posé par AuthMiddleware
+acteur_courant: ContextVar[Optional[int]] = ContextVar("acteur_courant", default=None)
+
+
+class JournalAudit:
+    """File bornée d'événements d'audit, écrite dans `audit_log` par lots depuis un thread dédié."""
+
+    def __init__(self, taille: int, lot: int, intervalle: float):
+        self.lot = lot
+        self.intervalle = intervalle
+        self._file: queue.Queue = queue.Queue(maxsize=taille)
+        self._thread: Optional[threading.Thread] = None
+        self._arret = threading.Event()
+        self._lock = threading.Lock()
+        self._metrics = {"enregistres": 0, "ecrits": 0, "lots": 0, "ecritures_directes": 0, "echecs": 0}
+
+    def demarrer(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._arret.clear()
+            self._thread = threading.Thread(target=self._boucle, name="audit-writer", daemon=True)
+            self._thread.start()
+
+    def arreter(self):
+        """Arrête le thread puis écrit ce qui reste dans la file (appelé à l'arrêt de l'application)."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._arret.set()
+            try:
+                self._file.put_nowait(_ARRET)
+            except queue.Full:
+                pass
+            thread.join()
+        self._vider()
+
+    def enregistrer(self, evenements: list[tuple]):
+        if self._thread is None:
+            self.demarrer()
+        for i, evenement in enumerate(evenements):
+            try:
+                self._file.put_nowait(evenement)
+            except queue.Full:
+                # Pression arrière plutôt que perte : le reste du lot est écrit dans le thread appelant
+                self._ecrire(evenements[i:])
+                with self._lock:
+                    self._metrics["ecritures_directes"] += 1
+                break
+        with self._lock:
+            self._metrics["enregistres"] += len(evenements)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {**self._metrics, "en_attente": self._file.qsize(), "capacite": self._file.maxsize}
+
+    def _boucle(self):
+        while not self._arret.is_set():
+            lot = self._attendre_lot()
+            if lot:
+                self._ecrire(lot)
+
+    def _attendre_lot(self) -> list[tuple]:
+        # Un lot part quand il est plein ou `intervalle` secondes après son premier événement
+        lot, echeance = [], None
+        while len(lot) < self.lot and not self._arret.is_set():
+            delai = self.intervalle if echeance is None else echeance - time.monotonic()
+            if delai <= 0:
+                break
+            try:
+                evenement = self._file.get(timeout=delai)
+            except queue.Empty:
+                if lot:
+                    break
+                continue
+            if evenement is _ARRET:
+                break
+            lot.append(evenement)
+            if echeance is None:
+                echeance = time.monotonic() + self.intervalle
+        return lot
+
+    def _vider(self):
+        while lot := self._prendre(self.lot):
+            self._ecrire(lot)
+
+    def _prendre(self, nombre: int) -> list[tuple]:
+        lot = []
+        while len(lot) < nombre:
+            try:
+                evenement = self._file.get_nowait()
+            except queue.Empty:
+                break
+            if evenement is not _ARRET:
+                lot.append(evenement)
+        return lot
+
+    def _ecrire(self, lot: list[tuple]):
+        # Chaque trace va dans la base de la session qui l'a produite
+        par_engine: dict = {}
+        for engine, evenement in lot:
+            par_engine.setdefault(engine, []).append(evenement)
+        for engine, evenements in par_engine.items():
+            try:
+                with engine.begin() as conn:
+                    conn.execute(insert(AuditLog), evenements)
+            except Exception:
+                logger.exception("Écriture de %d événement(s) d'audit impossible", len(evenements))
+                with self._lock:
+                    self._metrics["echecs"] += len(evenements)
+                continue
+            with self._lock:
+                self._metrics["ecrits"] += len(evenements)
+                self._metrics["lots"] += 1
+
+
+journal_audit = JournalAudit(AUDIT_QUEUE_SIZE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_INTERVAL)
+
+
+def rechercher(
+    session,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    acteur_id: Optional[int] = None,
+    entite: Optional[str] = None,
+    entite_id: Optional[int] = None,
+    offset: int = 0,
+    limit: int = 100,
+) -> list[AuditLog]:
+    if entite is not None and entite not in AUDITED_MODELS.values():
+        raise ValueError(f"Entité inconnue: {entite} (attendu: {', '.join(AUDITED_MODELS.values())})")
+    debut, fin = heure_locale(debut), heure_locale(fin)
+    if debut and fin and debut >= fin:
+        raise ValueError("La date de début doit être avant la date de fin")
+
+    statement = select(AuditLog)
+    if debut is not None:
+        statement = statement.where(AuditLog.date_evenement >= debut)
+    if fin is not None:
+        statement = statement.where(AuditLog.date_evenement < fin)
+    if acteur_id is not None:
+        statement = statement.where(AuditLog.acteur_id == acteur_id)
+    if entite is not None:
+        statement = statement.where(AuditLog.entite == entite)
+    if entite_id is not None:
+        statement = statement.where(AuditLog.entite_id == entite_id)
+    statement = statement.order_by(AuditLog.date_evenement.desc(), AuditLog.id.desc())
+    return session.exec(statement.offset(offset).limit(limit)).all()
+
+
+def _valeurs(state) -> dict:
+    return {
+        attr.key: to_jsonable_python(state.dict.get(attr.key), fallback=str)
+        for attr in state.mapper.column_attrs
+    }
+
+
+def _differences(state) -> dict:
+    changements = {}
+    for attr in state.mapper.column_attrs:
+        history = state.attrs[attr.key].history
+        if not history.has_changes():
+            continue
+        ancien = history.deleted[0] if history.deleted else None
+        nouveau = history.added[0] if history.added else None
+        changements[attr.key] = to_jsonable_python([ancien, nouveau], fallback=str)
+    return changements
+
+
+@event.listens_for(SASession, "after_flush")
+def _noter_evenements(session, flush_context):
+    maintenant = datetime.now()
+    acteur_id = acteur_courant.get()
+    # Base de la session (catalogue en mode shardé), résolue au premier événement
+    engine = None
+    evenements = []
+    for operation, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            entite = AUDITED_MODELS.get(type(obj))
+            if entite is None:
+                continue
+            state = inspect(obj)
+            if operation == "update":
+                changements = _differences(state)
+                if not changements:
+                    continue
+            else:
+                changements = _valeurs(state) if operation == "delete" else None
+            engine = engine or session.get_bind(mapper=inspect(AuditLog))
+            evenements.append((engine, {
+                "date_evenement": maintenant,
+                "acteur_id": acteur_id,
+                "operation": operation,
+                "entite": entite,
+                "entite_id": obj.id,
+                "changements": changements,
+            }))
+    if evenements:
+        session.info.setdefault("audit", []).extend(evenements)
+
+
+@event.listens_for(SASession, "after_commit")
+def _publier_evenements(session):
+    evenements = session.info.pop("audit", None)
+    if evenements:
+        journal_audit.enregistrer(evenements)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _abandonner_evenements(session):
+    session.info.pop("audit", None)
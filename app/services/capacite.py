@@ -0,0 +1,183 @@
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import func, select
+
+from app.database import sharding
+from app.helpers.dates import heure_locale
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Rapport import CapaciteGroupe, FenetreContention, RapportCapacite
+from app.models.Reservation import Reservation
+from app.models.ReservationArchive import ReservationArchive
+from app.models.Ressource import Ressource
+from app.services.archivage import range_needs_archive
+from app.services.occupation import STATUTS_OCCUPATION
+
+# Une fenêtre de contention commence quand l'usage simultané atteint SEUIL_CONTENTION de l'inventaire
+SEUIL_CONTENTION = 0.8
+CAPACITE_PARTITION = 10_000
+
+
+@dataclass
+class Balayage:
+    """Balayage des événements début/fin d'un groupe (site, type), dans l'ordre chronologique.
+
+    La mémoire est bornée par l'usage simultané maximal (tas des fins en cours) et par
+    `top` fenêtres, quelle que soit la longueur de l'historique.
+    """
+
+    inventaire: int
+    top: int
+    en_cours: list = field(default_factory=list)
+    simultane: int = 0
+    instant: Optional[datetime] = None
+    nb_reservations: int = 0
+    pic: int = 0
+    pic_debut: Optional[datetime] = None
+    secondes_80: float = 0.0
+    secondes_100: float = 0.0
+    fenetre_debut: Optional[datetime] = None
+    fenetre_pic: int = 0
+    fenetres: list = field(default_factory=list)
+    _sequence: int = 0
+
+    @property
+    def seuil(self) -> float:
+        return self.inventaire * SEUIL_CONTENTION
+
+    def _avancer(self, t: datetime):
+        if self.instant is not None and t > self.instant:
+            duree = (t - self.instant).total_seconds()
+            if self.simultane >= self.seuil:
+                self.secondes_80 += duree
+            if self.simultane >= self.inventaire:
+                self.secondes_100 += duree
+            # Fermeture différée : une réservation qui reprend au même instant prolonge la fenêtre
+            if self.fenetre_debut is not None and self.simultane < self.seuil:
+                self._fermer_fenetre(self.instant)
+        self.instant = t
+
+    def _fermer_fenetre(self, t: datetime):
+        # Tas min borné à `top` : on garde les fenêtres au pic le plus haut, puis les plus longues
+        duree = (t - self.fenetre_debut).total_seconds()
+        self._sequence += 1
+        entree = (self.fenetre_pic, duree, -self._sequence, self.fenetre_debut, t)
+        if len(self.fenetres) < self.top:
+            heapq.heappush(self.fenetres, entree)
+        elif entree[:3] > self.fenetres[0][:3]:
+            heapq.heapreplace(self.fenetres, entree)
+        self.fenetre_debut = None
+
+    def _terminer_jusqua(self, t: datetime):
+        # Une réservation qui finit à t ne chevauche pas celle qui commence à t
+        while self.en_cours and self.en_cours[0] <= t:
+            fin = heapq.heappop(self.en_cours)
+            self._avancer(fin)
+            self.simultane -= 1
+
+    def debut(self, debut: datetime, fin: datetime):
+        self._terminer_jusqua(debut)
+        self._avancer(debut)
+        self.simultane += 1
+        self.nb_reservations += 1
+        heapq.heappush(self.en_cours, fin)
+        if self.simultane > self.pic:
+            self.pic, self.pic_debut = self.simultane, debut
+        if self.simultane >= self.seuil:
+            if self.fenetre_debut is None:
+                self.fenetre_debut, self.fenetre_pic = debut, self.simultane
+            else:
+                self.fenetre_pic = max(self.fenetre_pic, self.simultane)
+
+    def terminer(self):
+        self._terminer_jusqua(datetime.max)
+        if self.fenetre_debut is not None:
+            self._fermer_fenetre(self.instant)
+
+    def resultat(self, site_id: int, type_ressource: TypeRessource, periode_secondes: float) -> CapaciteGroupe:
+        fenetres = sorted(self.fenetres, reverse=True)
+        return CapaciteGroupe(
+            site_id=site_id,
+            type_ressource=type_ressource,
+            inventaire=self.inventaire,
+            nb_reservations=self.nb_reservations,
+            pic_simultane=self.pic,
+            pic_debut=self.pic_debut,
+            taux_pic=round(self.pic / self.inventaire * 100, 2),
+            heures_au_dessus_80=round(self.secondes_80 / 3600, 2),
+            heures_a_100=round(self.secondes_100 / 3600, 2),
+            part_au_dessus_80=round(self.secondes_80 / periode_secondes * 100, 2),
+            part_a_100=round(self.secondes_100 / periode_secondes * 100, 2),
+            fenetres_contention=[
+                FenetreContention(debut=debut, fin=fin, pic=pic, duree_minutes=round(duree / 60, 2))
+                for pic, duree, _, debut, fin in fenetres
+            ],
+        )
+
+
+def _connexions(session, site_id: Optional[int]) -> list:
+    if not sharding.is_sharded_session(session):
+        return [session.connection()]
+    shard_ids = [sharding.shard_id_for_site(site_id)] if site_id is not None else session.site_shard_ids()
+    return [session.connection(bind_arguments={"shard_id": shard_id}) for shard_id in shard_ids]
+
+
+def _evenements(conn, model, debut: datetime, fin: datetime, conditions: list) -> Iterator:
+    stmt = (
+        select(Ressource.site_id, Ressource.type_ressource, model.debut, model.fin)
+        .join(Ressource, Ressource.id == model.ressource_id)
+        .where(model.debut < fin, model.fin > debut, model.statut.in_(STATUTS_OCCUPATION), *conditions)
+        .order_by(model.debut)
+        .execution_options(yield_per=CAPACITE_PARTITION)
+    )
+    for row in conn.execute(stmt):
+        yield row
+
+
+def _flux(conn, debut: datetime, fin: datetime, conditions: list) -> Iterable:
+    flux = [_evenements(conn, Reservation, debut, fin, conditions)]
+    if range_needs_archive(debut):
+        flux.append(_evenements(conn, ReservationArchive, debut, fin, conditions))
+    # Fusion de flux déjà triés par début : aucun tri en mémoire
+    return heapq.merge(*flux, key=lambda row: row.debut)
+
+
+def rapport_capacite(
+    session,
+    debut: datetime,
+    fin: datetime,
+    site_id: Optional[int] = None,
+    type_ressource: Optional[TypeRessource] = None,
+    top: int = 5,
+) -> RapportCapacite:
+    debut, fin = heure_locale(debut), heure_locale(fin)
+    if fin <= debut:
+        raise ValueError("La fin de la période doit être après son début")
+
+    conditions = []
+    if site_id is not None:
+        conditions.append(Ressource.site_id == site_id)
+    if type_ressource is not None:
+        conditions.append(Ressource.type_ressource == type_ressource)
+
+    periode = (fin - debut).total_seconds()
+    groupes = []
+    for conn in _connexions(session, site_id):
+        inventaires = conn.execute(
+            select(Ressource.site_id, Ressource.type_ressource, func.count())
+            .where(*conditions)
+            .group_by(Ressource.site_id, Ressource.type_ressource)
+        ).all()
+        balayages = {(s, t): Balayage(inventaire=n, top=top) for s, t, n in inventaires}
+
+        for row in _flux(conn, debut, fin, conditions):
+            balayages[(row.site_id, row.type_ressource)].debut(max(row.debut, debut), min(row.fin, fin))
+
+        for (s, t), balayage in balayages.items():
+            balayage.terminer()
+            groupes.append(balayage.resultat(s, t, periode))
+
+    groupes.sort(key=lambda g: (g.site_id, g.type_ressource.name))
+    return RapportCapacite(debut=debut, fin=fin, site_id=site_id, type_ressource=type_ressource, groupes=groupes)
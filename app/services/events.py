@@ -0,0 +1,164 @@
+import asyncio
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session as SASession
+
+from app.models.Reservation import Reservation
+from app.models.ResourceAvailability import ResourceAvailability
+from app.models.Ressource import Ressource
+
+HEARTBEAT_SECONDS = float(os.getenv("RESA_SSE_HEARTBEAT", "15"))
+QUEUE_SIZE = int(os.getenv("RESA_SSE_QUEUE_SIZE", "100"))
+
+
+def ressource_topic(ressource_id: int) -> str:
+    return f"ressource:{ressource_id}"
+
+
+def site_topic(site_id: int) -> str:
+    return f"site:{site_id}"
+
+
+class Subscriber:
+    def __init__(self, topics: list[str], loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.topics = topics
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def push(self, payload: dict):
+        # Client trop lent : on vide sa file et on lui demande de resynchroniser plutôt que de grossir
+        if self.queue.full():
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+            return
+        self.queue.put_nowait(payload)
+
+
+class EventBroker:
+    """Pub/sub en mémoire : publication depuis n'importe quel thread, consommation dans la boucle asyncio."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[str, set[Subscriber]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, topics: list[str]) -> Subscriber:
+        subscriber = Subscriber(topics, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            for topic in topics:
+                self._subscribers[topic].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        with self._lock:
+            for topic in subscriber.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def publish(self, topic: str, payload: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, payload)
+            except RuntimeError:
+                # Boucle fermée (arrêt du serveur)
+                self.unsubscribe(subscriber)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len({s for subs in self._subscribers.values() for s in subs})
+
+
+broker = EventBroker(QUEUE_SIZE)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def format_sse(payload: dict) -> str:
+    return f"event: {payload['type']}\ndata: {json.dumps(payload, default=_json_default)}\n\n"
+
+
+async def event_stream(request, subscriber: Subscriber):
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if await request.is_disconnected():
+                break
+            try:
+                payload = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield format_sse(payload)
+    finally:
+        broker.unsubscribe(subscriber)
+
+
+def _site_id_for(session, ressource_id: int):
+    ressource = session.get(Ressource, ressource_id)
+    return ressource.site_id if ressource else None
+
+
+@event.listens_for(SASession, "after_flush")
+def _collect_events(session, flush_context):
+    if not broker.has_subscribers():
+        return
+
+    for operation, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if isinstance(obj, Reservation):
+                payload = {
+                    "type": "reservation",
+                    "statut": obj.statut.value if obj.statut else None,
+                }
+            elif isinstance(obj, ResourceAvailability):
+                payload = {
+                    "type": "disponibilite",
+                    "type_disponibilite": obj.type_disponibilite.value if obj.type_disponibilite else None,
+                }
+            else:
+                continue
+            if operation == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            payload.update({
+                "operation": operation,
+                "id": obj.id,
+                "ressource_id": obj.ressource_id,
+                "debut": obj.debut,
+                "fin": obj.fin,
+                "date": datetime.now(),
+            })
+            site_id = _site_id_for(session, obj.ressource_id)
+            session.info.setdefault("pending_events", []).append((obj.ressource_id, site_id, payload))
+
+
+@event.listens_for(SASession, "after_commit")
+def _publish_events(session):
+    for ressource_id, site_id, payload in session.info.pop("pending_events", ()):
+        broker.publish(ressource_topic(ressource_id), payload)
+        if site_id is not None:
+            broker.publish(site_topic(site_id), payload)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_events(session):
+    session.info.pop("pending_events", None)
@@ -0,0 +1,106 @@
+import csv
+import heapq
+from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from sqlalchemy import func, literal, select
+
+from app.database import sharding
+from app.helpers.dates import heure_locale
+from app.models.Reservation import Reservation
+from app.models.ReservationArchive import ReservationArchive
+from app.models.Ressource import Ressource
+from app.services.archivage import range_needs_archive
+
+# Lignes lues par lot depuis le curseur
+EXPORT_PARTITION = 10_000
+
+COLONNES = [
+    "id", "ressource_id", "site_id", "user_id", "createur_id", "debut", "fin",
+    "statut", "nbr_participants", "description", "note", "archivee",
+]
+
+
+def _connexions(session, ressource_id: Optional[int], site_id: Optional[int]) -> list:
+    if not sharding.is_sharded_session(session):
+        return [session.connection()]
+    if ressource_id is not None:
+        shard_ids = [sharding.shard_id_for_site(sharding.site_for_id(ressource_id))]
+    elif site_id is not None:
+        shard_ids = [sharding.shard_id_for_site(site_id)]
+    else:
+        shard_ids = session.site_shard_ids()
+    return [session.connection(bind_arguments={"shard_id": s}) for s in shard_ids]
+
+
+def _conditions(model, debut, fin, ressource_id, site_id) -> list:
+    conditions = []
+    if debut is not None:
+        conditions.append(model.fin > debut)
+    if fin is not None:
+        conditions.append(model.debut < fin)
+    if ressource_id is not None:
+        conditions.append(model.ressource_id == ressource_id)
+    if site_id is not None:
+        conditions.append(Ressource.site_id == site_id)
+    return conditions
+
+
+def _lignes(conn, model, archivee: bool, conditions: list) -> Iterator:
+    stmt = (
+        select(
+            model.id, model.ressource_id, Ressource.site_id, model.user_id, model.createur_id,
+            model.debut, model.fin, model.statut, model.nbr_participants, model.description,
+            model.note, literal(archivee).label("archivee"),
+        )
+        .join(Ressource, Ressource.id == model.ressource_id)
+        .where(*conditions)
+        .order_by(model.debut)
+        .execution_options(yield_per=EXPORT_PARTITION)
+    )
+    yield from conn.execute(stmt)
+
+
+def exporter_reservations(
+    session,
+    fichier,
+    debut: Optional[datetime] = None,
+    fin: Optional[datetime] = None,
+    site_id: Optional[int] = None,
+    ressource_id: Optional[int] = None,
+    progression: Optional[Callable[[float], None]] = None,
+) -> int:
+    """Écrit en CSV les réservations (et l'archive si besoin) qui chevauchent la période, triées par début."""
+    debut, fin = heure_locale(debut), heure_locale(fin)
+    if debut and fin and debut >= fin:
+        raise ValueError("La date de début doit être avant la date de fin")
+
+    sources = [(Reservation, False)]
+    if range_needs_archive(debut):
+        sources.append((ReservationArchive, True))
+
+    connexions = _connexions(session, ressource_id, site_id)
+    total, flux = 0, []
+    for conn in connexions:
+        for model, archivee in sources:
+            conditions = _conditions(model, debut, fin, ressource_id, site_id)
+            total += conn.execute(
+                select(func.count()).select_from(model)
+                .join(Ressource, Ressource.id == model.ressource_id).where(*conditions)
+            ).scalar_one()
+            flux.append(_lignes(conn, model, archivee, conditions))
+
+    ecrites = 0
+    writer = csv.writer(fichier)
+    writer.writerow(COLONNES)
+    # Flux déjà triés par début (un par site et par table) : fusion sans tri en mémoire
+    for row in heapq.merge(*flux, key=lambda row: row.debut):
+        writer.writerow([
+            row.id, row.ressource_id, row.site_id, row.user_id, row.createur_id,
+            row.debut.isoformat(), row.fin.isoformat(), row.statut.value, row.nbr_participants,
+            row.description, row.note or "", int(row.archivee),
+        ])
+        ecrites += 1
+        if progression and ecrites % EXPORT_PARTITION == 0:
+            progression(ecrites / max(total, 1))
+    return ecrites
@@ -0,0 +1,141 @@
+import csv
+import io
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+
+from pydantic import ValidationError
+from sqlmodel import select
+
+from app.helpers.auth.auth import hash_passwords
+from app.models.User import ErreurImport, ImportUtilisateursResponse, User, UserImportRow, UserPublicSimple
+from app.services.reference_data import get_department, get_site
+
+USER_IMPORT_MAX_ROWS = int(os.getenv("RESA_USER_IMPORT_MAX_ROWS", "5000"))
+
+FORMATS = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+
+class ImportInvalide(ValueError):
+    pass
+
+
+def format_depuis_content_type(content_type: str) -> str:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in FORMATS:
+        raise ImportInvalide(f"Format non supporté: {media_type or 'inconnu'} (text/csv ou application/x-ndjson)")
+    return FORMATS[media_type]
+
+
+def lire_lignes(contenu: bytes, format_import: str) -> list[tuple[int, Optional[dict], Optional[str]]]:
+    """(numéro de ligne dans le fichier, champs lus, erreur de lecture éventuelle)."""
+    try:
+        texte = contenu.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ImportInvalide("Le fichier doit être encodé en UTF-8")
+
+    lignes = []
+    if format_import == "csv":
+        lecteur = csv.DictReader(io.StringIO(texte))
+        for ligne in lecteur:
+            # Cellules vides -> champ absent (ex: department_id)
+            lignes.append((lecteur.line_num, {k: v for k, v in ligne.items() if k and v not in ("", None)}, None))
+    else:
+        for numero, brut in enumerate(texte.splitlines(), start=1):
+            if not brut.strip():
+                continue
+            try:
+                objet = json.loads(brut)
+            except json.JSONDecodeError as e:
+                lignes.append((numero, None, f"JSON invalide: {e.msg}"))
+                continue
+            if not isinstance(objet, dict):
+                lignes.append((numero, None, "Chaque ligne doit être un objet JSON"))
+                continue
+            lignes.append((numero, objet, None))
+
+    if len(lignes) > USER_IMPORT_MAX_ROWS:
+        raise ImportInvalide(f"Import limité à {USER_IMPORT_MAX_ROWS} lignes ({len(lignes)} reçues)")
+    return lignes
+
+
+def _message(erreur: dict) -> str:
+    champ = ".".join(str(p) for p in erreur["loc"])
+    return f"{champ}: {erreur['msg']}" if champ else erreur["msg"]
+
+
+def importer_utilisateurs(session, lignes: list[tuple[int, Optional[dict], Optional[str]]]) -> ImportUtilisateursResponse:
+    erreurs: dict[int, list[str]] = {}
+    valides: list[tuple[int, UserImportRow]] = []
+    emails_lignes: dict[int, str] = {}
+
+    for numero, brut, erreur_lecture in lignes:
+        if erreur_lecture:
+            erreurs[numero] = [erreur_lecture]
+            continue
+        if isinstance(brut.get("email"), str):
+            emails_lignes[numero] = brut["email"]
+        try:
+            valides.append((numero, UserImportRow.model_validate(brut)))
+        except ValidationError as e:
+            erreurs[numero] = [_message(err) for err in e.errors()]
+
+    # Unicité : doublons dans le fichier puis une requête IN par colonne pour tout le lot
+    emails = Counter(row.email for _, row in valides)
+    noms = Counter(row.nom_utilisateur for _, row in valides)
+    emails_pris = set(session.exec(
+        select(User.email).where(User.email.in_(list(emails)))
+    ).all()) if emails else set()
+    noms_pris = set(session.exec(
+        select(User.nom_utilisateur).where(User.nom_utilisateur.in_(list(noms)))
+    ).all()) if noms else set()
+
+    a_creer = []
+    for numero, row in valides:
+        problemes = []
+        if row.email in emails_pris:
+            problemes.append("Email déjà utilisé")
+        elif emails[row.email] > 1:
+            problemes.append("Email en double dans le fichier")
+        if row.nom_utilisateur in noms_pris:
+            problemes.append("Nom d'utilisateur déjà utilisé")
+        elif noms[row.nom_utilisateur] > 1:
+            problemes.append("Nom d'utilisateur en double dans le fichier")
+        if get_site(row.site_principal_id) is None:
+            problemes.append(f"Site {row.site_principal_id} introuvable")
+        if row.department_id is not None and get_department(row.department_id) is None:
+            problemes.append(f"Département {row.department_id} introuvable")
+        if problemes:
+            erreurs[numero] = problemes
+        else:
+            a_creer.append(row)
+
+    hashes = hash_passwords([row.password for row in a_creer])
+    now = datetime.now()
+    users = [
+        User(**row.model_dump(exclude={"password"}), hashed_password=hashed, date_creation=now)
+        for row, hashed in zip(a_creer, hashes)
+    ]
+    # Une seule transaction pour toutes les lignes valides
+    session.add_all(users)
+    session.flush()
+    crees = [UserPublicSimple.model_validate(user) for user in users]
+    session.commit()
+
+    return ImportUtilisateursResponse(
+        total=len(lignes),
+        crees=len(crees),
+        erreurs=[
+            ErreurImport(ligne=numero, email=emails_lignes.get(numero), erreurs=messages)
+            for numero, messages in sorted(erreurs.items())
+        ],
+        utilisateurs=crees,
+    )
@@ -0,0 +1,282 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import select, update
+from sqlmodel import SQLModel
+
+from app.database.database import new_session
+from app.database.engines import get_engine
+from app.models.Enum.StatutTache import StatutTache
+from app.models.Job import (
+    Job,
+    AllocationJobParams,
+    CapaciteJobParams,
+    ExportReservationsJobParams,
+    HeatmapJobParams,
+)
+from app.services.allocation import executer_allocation
+from app.services.audit import acteur_courant
+from app.services.capacite import rapport_capacite
+from app.services.export_reservations import exporter_reservations
+from app.services.occupation import calculer_heatmap
+
+logger = logging.getLogger(__name__)
+
+# Répertoire des fichiers de résultat (<id>.json / <id>.csv)
+JOBS_DIR = os.getenv("RESA_JOBS_DIR", "job_results")
+# Tâches exécutées en même temps par type, ex: "export_reservations=2,heatmap=1" (défaut : 1 par type)
+JOBS_LIMITS = dict(
+    (kind.strip(), int(limite))
+    for kind, limite in (item.split("=") for item in os.getenv("RESA_JOBS_LIMITS", "").split(",") if item.strip())
+)
+# Tâches en attente ou en cours par type au-delà desquelles une soumission est refusée
+JOBS_MAX_PENDING = int(os.getenv("RESA_JOBS_MAX_PENDING", "20"))
+# Écart minimal entre deux écritures de la progression en base (secondes)
+PROGRESSION_INTERVALLE = 0.5
+
+
+class FileTachesPleine(Exception):
+    pass
+
+
+_identite = (0, "")
+
+
+def _debut_processus(pid: int) -> Optional[str]:
+    # Date de démarrage du processus (champ 22 de /proc/<pid>/stat, Linux) : distingue deux
+    # processus successifs de même pid. None si le processus n'existe pas ou sans /proc
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as stat:
+            return stat.read().rsplit(b")", 1)[1].split()[19].decode()
+    except (OSError, IndexError):
+        return None
+
+
+def identite_processus() -> str:
+    # "<pid>:<démarrage>:<jeton>", recalculée après un fork : chaque worker a la sienne
+    global _identite
+    pid = os.getpid()
+    if _identite[0] != pid:
+        _identite = (pid, f"{pid}:{_debut_processus(pid) or ''}:{uuid.uuid4().hex[:12]}")
+    return _identite[1]
+
+
+def _processus_actif(proprietaire: Optional[str]) -> bool:
+    if proprietaire is None:
+        return False
+    if proprietaire == identite_processus():
+        return True
+    try:
+        pid = int(proprietaire.split(":")[0])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        # Même pid qu'une exécution précédente (redémarrage, pid 1 en conteneur) : elle est arrêtée
+        return False
+    parties = proprietaire.split(":")
+    if len(parties) == 3 and parties[1] and os.path.isdir("/proc"):
+        # pid réutilisé par un autre processus : date de démarrage différente
+        return _debut_processus(pid) == parties[1]
+    if os.name == "nt":
+        # os.kill(pid, 0) n'est pas un simple test sous Windows : tâche conservée
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@dataclass(frozen=True)
+class TypeTache:
+    parametres: type[SQLModel]
+    # (session, paramètres, fichier ouvert, progression) -> résumé stocké sur la tâche
+    executer: Callable[..., Optional[dict[str, Any]]]
+    extension: str
+
+
+def _ecrire_json(fichier, resultat):
+    fichier.write(resultat.model_dump_json() if isinstance(resultat, SQLModel) else json.dumps(resultat))
+
+
+def _heatmap(session, params: HeatmapJobParams, fichier, progression):
+    heatmap = calculer_heatmap(session, **params.model_dump())
+    _ecrire_json(fichier, heatmap)
+    return {"nb_reservations": heatmap.nb_reservations, "nb_ressources": heatmap.nb_ressources}
+
+
+def _capacite(session, params: CapaciteJobParams, fichier, progression):
+    rapport = rapport_capacite(session, **params.model_dump())
+    _ecrire_json(fichier, rapport)
+    return {"groupes": len(rapport.groupes)}
+
+
+def _allocation(session, params: AllocationJobParams, fichier, progression):
+    resultat = executer_allocation(session, params.jusqu_a)
+    _ecrire_json(fichier, resultat)
+    return resultat
+
+
+def _export_reservations(session, params: ExportReservationsJobParams, fichier, progression):
+    return {"lignes": exporter_reservations(session, fichier, progression=progression, **params.model_dump())}
+
+
+TYPES_TACHES = {
+    "heatmap": TypeTache(HeatmapJobParams, _heatmap, "json"),
+    "capacite": TypeTache(CapaciteJobParams, _capacite, "json"),
+    "allocation": TypeTache(AllocationJobParams, _allocation, "json"),
+    "export_reservations": TypeTache(ExportReservationsJobParams, _export_reservations, "csv"),
+}
+
+
+def _mettre_a_jour(job_id: int, **valeurs):
+    # Connexion courte hors de la session de la tâche : le statut est visible pendant l'exécution
+    with get_engine().begin() as conn:
+        conn.execute(update(Job).where(Job.id == job_id).values(**valeurs))
+
+
+class Progression:
+    def __init__(self, job_id: int):
+        self.job_id = job_id
+        self._derniere = 0.0
+
+    def __call__(self, fraction: float):
+        now = time.monotonic()
+        if now - self._derniere < PROGRESSION_INTERVALLE:
+            return
+        self._derniere = now
+        _mettre_a_jour(self.job_id, progression=round(min(max(fraction, 0.0), 0.99), 4))
+
+
+class GestionnaireTaches:
+    """Exécute les tâches de fond dans un pool de threads par type (limite de concurrence propre à chaque type)."""
+
+    def __init__(self, limites: dict[str, int], max_en_attente: int, repertoire: str):
+        self.limites = limites
+        self.max_en_attente = max_en_attente
+        self.repertoire = Path(repertoire)
+        self._pools: dict[str, ThreadPoolExecutor] = {}
+        self._actives: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def soumettre(self, session, kind: str, parametres: dict, demandeur_id: Optional[int]) -> Job:
+        type_tache = TYPES_TACHES.get(kind)
+        if type_tache is None:
+            raise ValueError(f"Type de tâche inconnu: {kind} (attendu: {', '.join(TYPES_TACHES)})")
+        try:
+            params = type_tache.parametres.model_validate(parametres)
+        except ValidationError as e:
+            details = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            raise ValueError(f"Paramètres invalides: {details}")
+
+        with self._lock:
+            if self._actives.get(kind, 0) >= self.max_en_attente:
+                raise FileTachesPleine(f"Trop de tâches {kind} en attente, réessayez plus tard")
+            self._actives[kind] = self._actives.get(kind, 0) + 1
+        try:
+            job = Job(
+                kind=kind, parametres=params.model_dump(mode="json"), demandeur_id=demandeur_id,
+                proprietaire=identite_processus(),
+            )
+            session.add(job)
+            session.commit()
+            session.refresh(job)
+            self._pool(kind).submit(self._executer, job.id, kind, type_tache, params, demandeur_id)
+        except Exception:
+            self._liberer(kind)
+            raise
+        return job
+
+    def chemin_resultat(self, job: Job) -> Optional[Path]:
+        if job.statut != StatutTache.termine or not job.fichier:
+            return None
+        chemin = Path(job.fichier)
+        return chemin if chemin.is_file() else None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                kind: {"actives": self._actives.get(kind, 0), "limite": self.limites.get(kind, 1)}
+                for kind in TYPES_TACHES
+            }
+
+    def reprendre_interrompues(self):
+        """Au démarrage : les tâches d'un processus arrêté ne reprendront pas, elles sont marquées en échec.
+        Celles des autres workers encore en vie ne sont pas touchées."""
+        actives = [StatutTache.en_attente, StatutTache.en_cours]
+        with get_engine().begin() as conn:
+            proprietaires = conn.execute(
+                select(Job.proprietaire).where(Job.statut.in_(actives)).distinct()
+            ).scalars().all()
+            arretes = [p for p in proprietaires if not _processus_actif(p)]
+            if not arretes:
+                return
+            conn.execute(
+                update(Job)
+                .where(Job.statut.in_(actives), Job.proprietaire.in_(arretes) | Job.proprietaire.is_(None))
+                .values(statut=StatutTache.echec, erreur="Interrompue par un arrêt de l'application", date_fin=datetime.now())
+            )
+
+    def arreter(self):
+        # Les tâches en attente sont abandonnées, celles en cours finissent dans leur thread
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        with get_engine().begin() as conn:
+            conn.execute(
+                update(Job)
+                .where(Job.statut == StatutTache.en_attente, Job.proprietaire == identite_processus())
+                .values(statut=StatutTache.echec, erreur="Interrompue par un arrêt de l'application", date_fin=datetime.now())
+            )
+
+    def _pool(self, kind: str) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=self.limites.get(kind, 1), thread_name_prefix=f"job-{kind}")
+                self._pools[kind] = pool
+            return pool
+
+    def _liberer(self, kind: str):
+        with self._lock:
+            self._actives[kind] -= 1
+
+    def _executer(self, job_id: int, kind: str, type_tache: TypeTache, params: SQLModel, demandeur_id: Optional[int]):
+        chemin = self.repertoire / f"{job_id}.{type_tache.extension}"
+        partiel = chemin.with_name(chemin.name + ".part")
+        # Les écritures de la tâche sont auditées au nom de son demandeur
+        jeton_acteur = acteur_courant.set(demandeur_id)
+        try:
+            _mettre_a_jour(job_id, statut=StatutTache.en_cours, date_debut=datetime.now())
+            self.repertoire.mkdir(parents=True, exist_ok=True)
+            with new_session() as session, partiel.open("w", encoding="utf-8", newline="") as fichier:
+                resume = type_tache.executer(session, params, fichier, Progression(job_id))
+            # Renommage atomique : un fichier de résultat présent est toujours complet
+            partiel.replace(chemin)
+            _mettre_a_jour(
+                job_id, statut=StatutTache.termine, progression=1.0, fichier=str(chemin),
+                resume=resume, date_fin=datetime.now(),
+            )
+        except Exception as e:
+            logger.exception("Tâche %s (%s) en échec", job_id, kind)
+            partiel.unlink(missing_ok=True)
+            _mettre_a_jour(job_id, statut=StatutTache.echec, erreur=str(e), date_fin=datetime.now())
+        finally:
+            acteur_courant.reset(jeton_acteur)
+            self._liberer(kind)
+
+
+gestionnaire_taches = GestionnaireTaches(JOBS_LIMITS, JOBS_MAX_PENDING, JOBS_DIR)
@@ -0,0 +1,108 @@
+from datetime import datetime
+
+from sqlalchemy import case, func
+from sqlalchemy.exc import InvalidRequestError
+from sqlmodel import select
+
+from app.models.Enum.StatutDemande import StatutDemande
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.ListeAttente import ListeAttente
+from app.models.Reservation import Reservation
+from app.services.reservations import (
+    STATUTS_ACTIFS,
+    chevauchement_existe,
+    ecrire_sous_verrou,
+    precharger_validation,
+    valider_lot,
+    validation_groupee,
+)
+
+# Borne basse de la recherche par début : aucune réservation ne dépasse cette durée
+DUREE_MAX = max(Reservation.DUREE_MAX_PAR_TYPE.values())
+
+RANG_PRIORITE = case((ListeAttente.priorite == TypePriorite.prioritaire, 0), else_=1)
+
+
+def profondeur(session, ressource_id: int) -> int:
+    return session.exec(
+        select(func.count())
+        .select_from(ListeAttente)
+        .where(
+            ListeAttente.ressource_id == ressource_id,
+            ListeAttente.statut == StatutDemande.en_attente,
+            ListeAttente.debut >= datetime.now(),
+        )
+    ).one()
+
+
+def _promouvoir(session, ressource_id: int, debut: datetime, fin: datetime) -> list[Reservation]:
+    # Appelé dans la transaction verrouillée de l'annulation : le créneau libéré est déjà écrit
+    now = datetime.now()
+    # Plage de l'index (ressource_id, statut, debut) : seuls les inscrits qui chevauchent le créneau libéré
+    candidats = session.exec(
+        select(ListeAttente)
+        .where(
+            ListeAttente.ressource_id == ressource_id,
+            ListeAttente.statut == StatutDemande.en_attente,
+            ListeAttente.debut < fin,
+            ListeAttente.debut > debut - DUREE_MAX,
+            ListeAttente.debut >= now,
+        )
+        .order_by(RANG_PRIORITE, ListeAttente.date_inscription, ListeAttente.id)
+    ).all()
+
+    candidats = [entree for entree in candidats if entree.fin > debut]
+    if not candidats:
+        return []
+    contexte = precharger_validation(session, candidats)
+    erreurs = valider_lot(candidats, contexte)
+
+    promues = []
+    for entree, erreur in zip(candidats, erreurs):
+        # Chaque promotion est écrite avant de tester la suivante
+        if erreur or chevauchement_existe(session, ressource_id, entree.debut, entree.fin):
+            continue
+        with validation_groupee(contexte):
+            reservation = Reservation(
+                ressource_id=entree.ressource_id,
+                user_id=entree.user_id,
+                createur_id=entree.createur_id,
+                debut=entree.debut,
+                fin=entree.fin,
+                statut=StatutReservation.confirme,
+                description=entree.description,
+                nbr_participants=entree.nbr_participants,
+                note=entree.note,
+            )
+        session.add(reservation)
+        session.flush()
+        entree.statut = StatutDemande.allouee
+        entree.reservation_id = reservation.id
+        session.add(entree)
+        promues.append(reservation)
+    return promues
+
+
+def liberer_reservation(session, reservation: Reservation, supprimer: bool = False) -> list[Reservation]:
+    """Annule (ou supprime) la réservation et propose le créneau libéré à la liste d'attente, dans la même
+    transaction verrouillée que `reserver` : une promotion ne peut pas chevaucher une réservation concurrente."""
+    ressource_id = reservation.ressource_id
+
+    def liberer():
+        # Relue sous le verrou : l'objet a pu être chargé (puis annulé ailleurs) avant BEGIN IMMEDIATE
+        try:
+            session.refresh(reservation)
+        except InvalidRequestError:
+            raise ValueError("Réservation Introuvable")
+        actif = reservation.statut in STATUTS_ACTIFS
+        debut, fin = reservation.debut, reservation.fin
+        if supprimer:
+            session.delete(reservation)
+        else:
+            reservation.annuler()
+            session.add(reservation)
+        session.flush()
+        return _promouvoir(session, ressource_id, debut, fin) if actif else []
+
+    return ecrire_sous_verrou(session, ressource_id, liberer)
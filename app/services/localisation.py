@@ -0,0 +1,264 @@
+import threading
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from sqlalchemy import and_, event, select
+from sqlalchemy.orm import Session as SASession
+
+from app.database import sharding
+from app.database.database import new_session
+from app.database.engines import get_engine, on_engine_change
+from app.helpers.dates import heure_locale
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.TypeDisponibilite import TypeDisponibilite
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.ReferenceVersion import ReferenceVersion
+from app.models.Reservation import Reservation
+from app.models.ResourceAvailability import ResourceAvailability
+from app.models.Ressource import AlternativeRessource, Ressource
+from app.services.reference_data import reference_cache
+from app.services.reservations import STATUTS_ACTIFS
+
+# Rang de proximité par rapport à la ressource demandée
+PROXIMITES = ("meme_etage", "meme_batiment", "meme_site")
+
+
+class EntreeLocalisation(NamedTuple):
+    id: int
+    nom: str
+    site_id: int
+    batiment: str
+    etage: str
+    numero: str
+    type_ressource: TypeRessource
+    capacite_maximum: int
+    etat: EtatRessource
+
+
+COLONNES = (
+    Ressource.id, Ressource.nom, Ressource.site_id, Ressource.localisation_batiment,
+    Ressource.localisation_etage, Ressource.localisation_numero, Ressource.type_ressource,
+    Ressource.capacite_maximum, Ressource.etat,
+)
+
+
+def _entree(ressource: Ressource) -> EntreeLocalisation:
+    return EntreeLocalisation(
+        ressource.id, ressource.nom, ressource.site_id, ressource.localisation_batiment,
+        ressource.localisation_etage, ressource.localisation_numero, ressource.type_ressource,
+        ressource.capacite_maximum, ressource.etat,
+    )
+
+
+class IndexLocalisation:
+    """Index mémoire site -> bâtiment -> étage -> ressources.
+
+    Construit au premier accès, puis mis à jour ressource par ressource au commit local.
+    Une modification faite par un autre worker (version `ressources` de reference_versions
+    inattendue) provoque une reconstruction complète au prochain accès.
+    """
+
+    def __init__(self):
+        self._sites: Optional[dict[int, dict[str, dict[str, dict[int, EntreeLocalisation]]]]] = None
+        self._par_id: dict[int, EntreeLocalisation] = {}
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _construire(self):
+        version = _version_courante()
+        self._sites, self._par_id = {}, {}
+        with new_session() as session:
+            if sharding.is_sharded_session(session):
+                connexions = [session.connection(bind_arguments={"shard_id": s}) for s in session.site_shard_ids()]
+            else:
+                connexions = [session.connection()]
+            for conn in connexions:
+                for row in conn.execute(select(*COLONNES)):
+                    self._ajouter(EntreeLocalisation(*row))
+        self._version = version
+
+    def _ajouter(self, entree: EntreeLocalisation):
+        self._par_id[entree.id] = entree
+        self._sites.setdefault(entree.site_id, {}).setdefault(entree.batiment, {}) \
+            .setdefault(entree.etage, {})[entree.id] = entree
+
+    def _retirer(self, ressource_id: int):
+        entree = self._par_id.pop(ressource_id, None)
+        if entree is None:
+            return
+        batiments = self._sites[entree.site_id]
+        etages = batiments[entree.batiment]
+        etage = etages[entree.etage]
+        del etage[ressource_id]
+        # Branches vides supprimées : l'index ne garde que des emplacements occupés
+        if not etage:
+            del etages[entree.etage]
+            if not etages:
+                del batiments[entree.batiment]
+                if not batiments:
+                    del self._sites[entree.site_id]
+
+    def _a_jour(self):
+        if self._sites is None or reference_cache.version("ressources") > self._version:
+            self._construire()
+
+    def appliquer(self, changements: list, versions: int):
+        with self._lock:
+            if self._sites is None:
+                return
+            for ressource_id, entree in changements:
+                self._retirer(ressource_id)
+                if entree is not None:
+                    self._ajouter(entree)
+            # Chaque flush local a incrémenté la version une fois ; un autre écart vient d'un autre worker
+            version = _version_courante()
+            if version == self._version + versions:
+                self._version = version
+            else:
+                self._sites = None
+
+    def reinitialiser(self):
+        with self._lock:
+            self._sites, self._par_id, self._version = None, {}, 0
+
+    def get(self, ressource_id: int) -> Optional[EntreeLocalisation]:
+        with self._lock:
+            self._a_jour()
+            return self._par_id.get(ressource_id)
+
+    def voisines(self, entree: EntreeLocalisation) -> list[tuple[int, EntreeLocalisation]]:
+        """Ressources du même site, avec leur rang de proximité (0 étage, 1 bâtiment, 2 site)."""
+        with self._lock:
+            self._a_jour()
+            resultat = []
+            for batiment, etages in self._sites.get(entree.site_id, {}).items():
+                for etage, ressources in etages.items():
+                    if batiment != entree.batiment:
+                        rang = 2
+                    else:
+                        rang = 0 if etage == entree.etage else 1
+                    resultat.extend((rang, r) for r in ressources.values() if r.id != entree.id)
+            return resultat
+
+
+def _version_courante() -> int:
+    with get_engine().connect() as conn:
+        version = conn.execute(
+            select(ReferenceVersion.version).where(ReferenceVersion.nom == "ressources")
+        ).scalar_one_or_none()
+    return version or 0
+
+
+index_localisation = IndexLocalisation()
+on_engine_change(index_localisation.reinitialiser)
+
+
+def _ecart_numero(a: str, b: str) -> float:
+    # Numéros de porte numériques : plus proches si l'écart est faible ; sinon aucun ordre
+    if a.isdigit() and b.isdigit():
+        return abs(int(a) - int(b))
+    return float("inf")
+
+
+def _ressources_occupees(session, site_id: int, ids: list[int], debut: datetime, fin: datetime) -> set[int]:
+    # Une seule requête : réservations actives et indisponibilités qui chevauchent le créneau
+    stmt = select(Reservation.ressource_id).where(
+        Reservation.ressource_id.in_(ids),
+        Reservation.debut < fin,
+        Reservation.fin > debut,
+        Reservation.statut.in_(STATUTS_ACTIFS),
+    ).union(
+        select(ResourceAvailability.ressource_id).where(and_(
+            ResourceAvailability.ressource_id.in_(ids),
+            ResourceAvailability.debut < fin,
+            ResourceAvailability.fin > debut,
+            ResourceAvailability.type_disponibilite != TypeDisponibilite.disponibilite_normale,
+        ))
+    )
+    if sharding.is_sharded_session(session):
+        conn = session.connection(bind_arguments={"shard_id": sharding.shard_id_for_site(site_id)})
+    else:
+        conn = session.connection()
+    return set(conn.execute(stmt).scalars())
+
+
+def alternatives_libres(
+    session,
+    ressource_id: int,
+    debut: datetime,
+    fin: datetime,
+    nbr_participants: Optional[int] = None,
+    limit: int = 5,
+) -> Optional[list[AlternativeRessource]]:
+    entree = index_localisation.get(ressource_id)
+    if entree is None:
+        return None
+    debut, fin = heure_locale(debut), heure_locale(fin)
+    if fin <= debut:
+        raise ValueError("La fin du créneau doit être après son début")
+    # Sans nombre de participants, la capacité de la ressource demandée sert de référence
+    besoin = nbr_participants or 1
+    reference = nbr_participants or entree.capacite_maximum
+
+    candidates = [
+        (rang, r) for rang, r in index_localisation.voisines(entree)
+        if r.type_ressource == entree.type_ressource
+        and r.etat == EtatRessource.active
+        and r.capacite_maximum >= besoin
+    ]
+    if not candidates:
+        return []
+    occupees = _ressources_occupees(session, entree.site_id, [r.id for _, r in candidates], debut, fin)
+
+    # Proximité d'abord, puis la capacité la plus proche du besoin, puis le numéro de porte
+    libres = sorted(
+        ((rang, r) for rang, r in candidates if r.id not in occupees),
+        key=lambda c: (
+            c[0],
+            abs(c[1].capacite_maximum - reference),
+            _ecart_numero(c[1].numero, entree.numero),
+            c[1].id,
+        ),
+    )
+    return [
+        AlternativeRessource(
+            id=r.id,
+            nom=r.nom,
+            type_ressource=r.type_ressource,
+            capacite_maximum=r.capacite_maximum,
+            site_id=r.site_id,
+            localisation_batiment=r.batiment,
+            localisation_etage=r.etage,
+            localisation_numero=r.numero,
+            proximite=PROXIMITES[rang],
+        )
+        for rang, r in libres[:limit]
+    ]
+
+
+@event.listens_for(SASession, "after_flush")
+def _noter_changements(session, flush_context):
+    # Même filtre que reference_data._bump_versions : un flush = une version de plus
+    modifies = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    changements = [
+        (obj.id, _entree(obj)) for obj in (*session.new, *modifies) if isinstance(obj, Ressource)
+    ]
+    changements.extend((obj.id, None) for obj in session.deleted if isinstance(obj, Ressource))
+    if not changements:
+        return
+    session.info.setdefault("localisation_changes", []).extend(changements)
+    session.info["localisation_versions"] = session.info.get("localisation_versions", 0) + 1
+
+
+@event.listens_for(SASession, "after_commit")
+def _appliquer_changements(session):
+    changements = session.info.pop("localisation_changes", None)
+    versions = session.info.pop("localisation_versions", 0)
+    if changements:
+        index_localisation.appliquer(changements, versions)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _abandonner_changements(session):
+    session.info.pop("localisation_changes", None)
+    session.info.pop("localisation_versions", None)
@@ -0,0 +1,144 @@
+import math
+import os
+from datetime import datetime, timedelta
+from itertools import chain
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import DateTime, func, literal, select
+
+from app.database import sharding
+from app.helpers.dates import heure_locale
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Rapport import HeatmapOccupation
+from app.models.Reservation import Reservation
+from app.models.ReservationArchive import ReservationArchive
+from app.models.Ressource import Ressource
+from app.services.archivage import range_needs_archive
+
+# Plage maximale d'une heatmap : le calcul travaille à la minute (≈ 0,5 M cases par an)
+HEATMAP_MAX_DAYS = int(os.getenv("RESA_HEATMAP_MAX_DAYS", "732"))
+# Lignes lues par lot depuis le curseur
+HEATMAP_PARTITION = 50_000
+
+RESOLUTIONS = (15, 60)
+STATUTS_OCCUPATION = [StatutReservation.en_cours, StatutReservation.confirme, StatutReservation.fini]
+JOURS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+MINUTES_SEMAINE = 7 * 24 * 60
+
+
+def _shard_ids(session, ressource_id: Optional[int], site_id: Optional[int]) -> Optional[list[str]]:
+    if not sharding.is_sharded_session(session):
+        return None
+    if ressource_id is not None:
+        return [sharding.shard_id_for_site(sharding.site_for_id(ressource_id))]
+    if site_id is not None:
+        return [sharding.shard_id_for_site(site_id)]
+    return session.site_shard_ids()
+
+
+def _executer(session, statement, shard_ids: Optional[list[str]]):
+    # Exécution Core sur la connexion de la session : pas de chargement ORM ligne par ligne
+    if shard_ids is None:
+        yield session.connection().execute(statement)
+        return
+    for shard_id in shard_ids:
+        yield session.connection(bind_arguments={"shard_id": shard_id}).execute(statement)
+
+
+def _filtres_ressource(ressource_id, site_id, type_ressource) -> list:
+    conditions = []
+    if ressource_id is not None:
+        conditions.append(Ressource.id == ressource_id)
+    if site_id is not None:
+        conditions.append(Ressource.site_id == site_id)
+    if type_ressource is not None:
+        conditions.append(Ressource.type_ressource == type_ressource)
+    return conditions
+
+
+def calculer_heatmap(
+    session,
+    debut: datetime,
+    fin: datetime,
+    resolution: int = 60,
+    ressource_id: Optional[int] = None,
+    site_id: Optional[int] = None,
+    type_ressource: Optional[TypeRessource] = None,
+) -> HeatmapOccupation:
+    debut, fin = heure_locale(debut), heure_locale(fin)
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Résolution invalide: {resolution} (valeurs possibles: 15, 60)")
+    if fin <= debut:
+        raise ValueError("La fin de la période doit être après son début")
+    if fin - debut > timedelta(days=HEATMAP_MAX_DAYS):
+        raise ValueError(f"Période limitée à {HEATMAP_MAX_DAYS} jours")
+
+    # Axe des temps en minutes depuis le lundi 00:00 précédant `debut`, découpé en semaines entières
+    origine = (debut - timedelta(days=debut.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    borne_debut = int((debut - origine).total_seconds() // 60)
+    borne_fin = math.ceil((fin - origine).total_seconds() / 60)
+    semaines = math.ceil(borne_fin / MINUTES_SEMAINE)
+    taille = semaines * MINUTES_SEMAINE
+
+    shard_ids = _shard_ids(session, ressource_id, site_id)
+    conditions = _filtres_ressource(ressource_id, site_id, type_ressource)
+
+    nb_ressources = 0
+    for result in _executer(session, select(func.count()).select_from(Ressource).where(*conditions), shard_ids):
+        nb_ressources += result.scalar_one()
+
+    # Tableau de différences : +1 à chaque début, -1 à chaque fin ; la somme cumulée donne
+    # le nombre de ressources occupées minute par minute
+    variations = np.zeros(taille + 1, dtype=np.int64)
+    nb_reservations = 0
+    ref = literal(origine, DateTime)
+    modeles = [Reservation, ReservationArchive] if range_needs_archive(debut) else [Reservation]
+    for model in modeles:
+        stmt = (
+            select(
+                (func.julianday(model.debut) - func.julianday(ref)) * 1440,
+                (func.julianday(model.fin) - func.julianday(ref)) * 1440,
+            )
+            .where(
+                model.debut < fin,
+                model.fin > debut,
+                model.statut.in_(STATUTS_OCCUPATION),
+            )
+            .execution_options(yield_per=HEATMAP_PARTITION)
+        )
+        if conditions:
+            stmt = stmt.join(Ressource, Ressource.id == model.ressource_id).where(*conditions)
+
+        for result in _executer(session, stmt, shard_ids):
+            for lot in result.partitions():
+                valeurs = np.fromiter(chain.from_iterable(lot), dtype=np.float64, count=2 * len(lot))
+                paires = np.clip(np.rint(valeurs), borne_debut, borne_fin).astype(np.int64).reshape(-1, 2)
+                variations += np.bincount(paires[:, 0], minlength=taille + 1)
+                variations -= np.bincount(paires[:, 1], minlength=taille + 1)
+                nb_reservations += len(paires)
+
+    occupees = np.cumsum(variations[:-1]).reshape(semaines, -1, resolution).sum(axis=(0, 2))
+
+    # Minutes de chaque case effectivement couvertes par la période (semaines partielles aux bords)
+    dans_periode = np.zeros(taille, dtype=np.int64)
+    dans_periode[borne_debut:borne_fin] = 1
+    capacite = dans_periode.reshape(semaines, -1, resolution).sum(axis=(0, 2)) * nb_ressources
+
+    taux = np.divide(occupees * 100.0, capacite, out=np.zeros(len(capacite)), where=capacite > 0)
+
+    creneaux_par_jour = 24 * 60 // resolution
+    return HeatmapOccupation(
+        debut=debut,
+        fin=fin,
+        ressource_id=ressource_id,
+        site_id=site_id,
+        type_ressource=type_ressource,
+        resolution_minutes=resolution,
+        nb_ressources=nb_ressources,
+        nb_reservations=nb_reservations,
+        jours=JOURS,
+        creneaux=[f"{m // 60:02d}:{m % 60:02d}" for m in range(0, 24 * 60, resolution)],
+        taux=np.round(taux, 2).reshape(7, creneaux_par_jour).tolist(),
+    )
@@ -0,0 +1,190 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import Session, select
+
+from app.database.engines import get_engine, on_engine_change
+from app.models.Department import Department, DepartmentPublicWithRelations
+from app.models.Enum.TypeRole import TypeRole
+from app.models.ReferenceVersion import ReferenceVersion
+from app.models.Ressource import Ressource
+from app.models.Site import Site, SitePublicWithRelations
+from app.models.User import User
+
+# Délai maximal avant qu'un worker voie une modification faite par un autre worker
+REFERENCE_CACHE_TTL = float(os.getenv("RESA_REFERENCE_CACHE_TTL", "1"))
+
+# Modèle modifié -> entrée de cache à invalider
+WATCHED_MODELS = {
+    Site: "sites",
+    Department: "departments",
+    User: "gestionnaires",
+    Ressource: "ressources",
+}
+
+
+class _Entry:
+    def __init__(self, loader: Callable[[Session], Any]):
+        self.loader = loader
+        self.data: Any = None
+        self.version: Optional[int] = None
+
+
+class ReferenceCache:
+    """Cache en lecture seule des tables de référence, invalidé par la table reference_versions."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, _Entry] = {}
+        self._listeners: dict[str, list[Callable[[], None]]] = {}
+        self._versions: dict[str, int] = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def register(self, nom: str, loader: Callable[[Session], Any]):
+        self._entries[nom] = _Entry(loader)
+
+    def on_invalidate(self, nom: str, callback: Callable[[], None]):
+        # Caches externes (ex: listes de ressources) vidés au commit local d'une modification
+        self._listeners.setdefault(nom, []).append(callback)
+
+    def version(self, nom: str) -> int:
+        with self._lock:
+            self._refresh_versions()
+            return self._versions.get(nom, 0)
+
+    def get(self, nom: str) -> Any:
+        with self._lock:
+            self._refresh_versions()
+            entry = self._entries[nom]
+            version = self._versions.get(nom, 0)
+            if entry.data is None or entry.version != version:
+                with Session(get_engine()) as session:
+                    entry.data = entry.loader(session)
+                entry.version = version
+            return entry.data
+
+    def invalidate(self, noms):
+        with self._lock:
+            for nom in noms:
+                if nom in self._entries:
+                    self._entries[nom].data = None
+            self._checked_at = 0.0
+        for nom in noms:
+            for callback in self._listeners.get(nom, ()):
+                callback()
+
+    def reinitialiser(self):
+        # Changement de base : versions et données du cache ne correspondent plus à rien
+        with self._lock:
+            for entry in self._entries.values():
+                entry.data, entry.version = None, None
+            self._versions, self._checked_at = {}, 0.0
+        for callbacks in self._listeners.values():
+            for callback in callbacks:
+                callback()
+
+    def _refresh_versions(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.ttl:
+            return
+        with get_engine().connect() as conn:
+            rows = conn.execute(select(ReferenceVersion.nom, ReferenceVersion.version)).all()
+        self._versions = {nom: version for nom, version in rows}
+        self._checked_at = now
+
+
+def _load_sites(session: Session) -> dict:
+    sites = session.exec(select(Site).order_by(Site.id)).all()
+    items = [SitePublicWithRelations(**s.model_dump()) for s in sites]
+    return {"items": items, "by_id": {s.id: s for s in items}}
+
+
+def _load_departments(session: Session) -> dict:
+    departments = session.exec(select(Department).order_by(Department.id)).all()
+    items = [DepartmentPublicWithRelations(**d.model_dump()) for d in departments]
+    return {"items": items, "by_id": {d.id: d for d in items}}
+
+
+def _load_gestionnaires(session: Session) -> dict[int, TypeRole]:
+    rows = session.exec(
+        select(User.id, User.role).where(User.role.in_([TypeRole.manager, TypeRole.admin]))
+    ).all()
+    return {user_id: role for user_id, role in rows}
+
+
+reference_cache = ReferenceCache(REFERENCE_CACHE_TTL)
+reference_cache.register("sites", _load_sites)
+reference_cache.register("departments", _load_departments)
+reference_cache.register("gestionnaires", _load_gestionnaires)
+on_engine_change(reference_cache.reinitialiser)
+
+
+def list_sites(offset: int, limit: int, site_ids: Optional[frozenset[int]] = None) -> list[SitePublicWithRelations]:
+    # site_ids : None = tous les sites
+    items = reference_cache.get("sites")["items"]
+    if site_ids is not None:
+        items = [s for s in items if s.id in site_ids]
+    return items[offset:offset + limit]
+
+
+def get_site(site_id: int) -> Optional[SitePublicWithRelations]:
+    return reference_cache.get("sites")["by_id"].get(site_id)
+
+
+def list_departments(
+    offset: int, limit: int, garder: Optional[Callable[[int], bool]] = None
+) -> list[DepartmentPublicWithRelations]:
+    # garder(department_id) : filtre optionnel, ex: Principal.can_manage_department
+    items = reference_cache.get("departments")["items"]
+    if garder is not None:
+        items = [d for d in items if garder(d.id)]
+    return items[offset:offset + limit]
+
+
+def get_department(department_id: int) -> Optional[DepartmentPublicWithRelations]:
+    return reference_cache.get("departments")["by_id"].get(department_id)
+
+
+def get_gestionnaire_role(user_id: int) -> Optional[TypeRole]:
+    return reference_cache.get("gestionnaires").get(user_id)
+
+
+@event.listens_for(SASession, "after_flush")
+def _bump_versions(session, flush_context):
+    # Objets "dirty" sans changement de colonne (ex: collection modifiée) ignorés
+    modifies = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    noms = {
+        WATCHED_MODELS[type(obj)]
+        for obj in (*session.new, *modifies, *session.deleted)
+        if type(obj) in WATCHED_MODELS
+    }
+    if not noms:
+        return
+
+    # Même transaction que la modification : les autres workers ne voient la nouvelle version qu'après commit
+    conn = session.connection(bind_arguments={"mapper": inspect(ReferenceVersion)})
+    for nom in noms:
+        stmt = sqlite_insert(ReferenceVersion).values(nom=nom, version=1)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=["nom"],
+            set_={"version": ReferenceVersion.version + 1},
+        ))
+    session.info.setdefault("reference_changes", set()).update(noms)
+
+
+@event.listens_for(SASession, "after_commit")
+def _invalidate_local(session):
+    noms = session.info.pop("reference_changes", None)
+    if noms:
+        reference_cache.invalidate(noms)
+
+
+@event.listens_for(SASession, "after_rollback")
+def _discard_changes(session):
+    session.info.pop("reference_changes", None)
@@ -0,0 +1,202 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, event, func, inspect, insert, or_
+from sqlalchemy.orm import Session as SASession
+from sqlmodel import select
+
+from app.database import sharding
+from app.helpers.auth.policy import Principal
+from app.models.Reservation import Reservation, ReservationPublic
+from app.models.ReservationChange import ReservationChange, ReservationChangesResponse
+from app.models.Ressource import Ressource
+
+DEFAULT_SHARD = "default"
+# Clé du token pour une synchronisation initiale en cours : "<shard>#id" -> dernier id envoyé
+INSTANTANE = "#id"
+# Changements conservés (jours) ; purgés par l'archivage
+CHANGES_RETENTION_DAYS = int(os.getenv("RESA_CHANGES_RETENTION_DAYS", "30"))
+
+
+class TokenExpire(Exception):
+    pass
+
+
+def encode_token(positions: dict[str, int]) -> str:
+    raw = json.dumps(positions, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_token(token: Optional[str]) -> dict[str, int]:
+    if not token:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        positions = json.loads(raw)
+        return {str(k): int(v) for k, v in positions.items()}
+    except (ValueError, AttributeError):
+        raise ValueError("Token de synchronisation invalide")
+
+
+@event.listens_for(SASession, "before_flush")
+def _touch_modified(session, flush_context, instances):
+    now = datetime.now()
+    for obj in session.dirty:
+        if isinstance(obj, Reservation) and session.is_modified(obj, include_collections=False):
+            if not inspect(obj).attrs.date_modification.history.has_changes():
+                obj.date_modification = now
+
+
+@event.listens_for(SASession, "after_flush")
+def _log_changes(session, flush_context):
+    rows = []
+    for operation, objects in (("create", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if not isinstance(obj, Reservation):
+                continue
+            if operation == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            rows.append({
+                "reservation_id": obj.id,
+                "ressource_id": obj.ressource_id,
+                "user_id": obj.user_id,
+                "operation": operation,
+                "date_changement": datetime.now(),
+            })
+
+    # Regroupé par ressource : en mode shardé chaque ligne va dans le fichier du site concerné
+    by_ressource: dict[int, list[dict]] = {}
+    for row in rows:
+        by_ressource.setdefault(row["ressource_id"], []).append(row)
+    for ressource_id, ressource_rows in by_ressource.items():
+        conn = session.connection(bind_arguments={
+            "mapper": inspect(ReservationChange),
+            "clause": select(ReservationChange).where(ReservationChange.ressource_id == ressource_id),
+        })
+        conn.execute(insert(ReservationChange), ressource_rows)
+
+
+def purger_changements(conn, avant: datetime) -> int:
+    # La dernière ligne reste : elle porte la position courante du journal
+    derniere = select(func.max(ReservationChange.sequence)).scalar_subquery()
+    return conn.execute(
+        delete(ReservationChange)
+        .where(ReservationChange.date_changement < avant, ReservationChange.sequence < derniere)
+    ).rowcount
+
+
+def _shard_ids(session, ressource_id: Optional[int]) -> list[str]:
+    if not sharding.is_sharded_session(session):
+        return [DEFAULT_SHARD]
+    if ressource_id is not None:
+        return [sharding.shard_id_for_site(sharding.site_for_id(ressource_id))]
+    return session.site_shard_ids()
+
+
+def _exec(session, statement, shard_id: str):
+    if shard_id != DEFAULT_SHARD:
+        statement = statement.execution_options(_sa_shard_id=shard_id)
+    return session.exec(statement)
+
+
+def _origine(shard_id: str) -> int:
+    # Position d'un journal vide (séquences d'un site à partir de site_id << 32)
+    if shard_id == DEFAULT_SHARD:
+        return 0
+    return sharding.site_for_shard_id(shard_id) << sharding.SITE_ID_SHIFT
+
+
+def conditions_visibles(model, principal: Principal) -> list:
+    # Mêmes règles que l'accès à une réservation : les siennes, celles des sites gérés, tout pour un admin
+    sites = principal.managed_site_ids()
+    if sites is None:
+        return []
+    conditions = [model.user_id == principal.user_id]
+    if sites:
+        conditions.append(model.ressource_id.in_(select(Ressource.id).where(Ressource.site_id.in_(sites))))
+    return [or_(*conditions)]
+
+
+def _instantane(session, shard_id, principal, ressource_id, apres_id: int, limit: int) -> list[Reservation]:
+    stmt = select(Reservation).where(Reservation.id > apres_id, *conditions_visibles(Reservation, principal))
+    if ressource_id is not None:
+        stmt = stmt.where(Reservation.ressource_id == ressource_id)
+    return _exec(session, stmt.order_by(Reservation.id).limit(limit + 1), shard_id).all()
+
+
+def get_changes(
+    session,
+    since: Optional[str],
+    principal: Principal,
+    *,
+    ressource_id: Optional[int] = None,
+    limit: int = 500,
+) -> ReservationChangesResponse:
+    positions = decode_token(since)
+    modifiees: list[ReservationPublic] = []
+    supprimees: list[int] = []
+    has_more = False
+
+    shard_ids = _shard_ids(session, ressource_id)
+    if not since:
+        # Synchronisation initiale : état courant, puis changements à partir de la fin actuelle du journal
+        for shard_id in shard_ids:
+            derniere = _exec(session, select(func.max(ReservationChange.sequence)), shard_id).one()
+            positions[shard_id] = derniere or _origine(shard_id)
+            positions[shard_id + INSTANTANE] = 0
+
+    for shard_id in shard_ids:
+        if shard_id + INSTANTANE in positions:
+            reservations = _instantane(
+                session, shard_id, principal, ressource_id, positions[shard_id + INSTANTANE], limit
+            )
+            if len(reservations) > limit:
+                has_more = True
+                reservations = reservations[:limit]
+                positions[shard_id + INSTANTANE] = reservations[-1].id
+            else:
+                del positions[shard_id + INSTANTANE]
+            modifiees.extend(ReservationPublic.model_validate(r) for r in reservations)
+            continue
+
+        position = max(positions.get(shard_id, 0), _origine(shard_id))
+        premiere = _exec(session, select(func.min(ReservationChange.sequence)), shard_id).one()
+        if premiere is not None and position < premiere - 1:
+            raise TokenExpire("Token de synchronisation expiré : resynchronisez sans `since`")
+
+        stmt = select(ReservationChange).where(
+            ReservationChange.sequence > position, *conditions_visibles(ReservationChange, principal)
+        )
+        if ressource_id is not None:
+            stmt = stmt.where(ReservationChange.ressource_id == ressource_id)
+        changes = _exec(session, stmt.order_by(ReservationChange.sequence).limit(limit + 1), shard_id).all()
+
+        if len(changes) > limit:
+            has_more = True
+            changes = changes[:limit]
+        if not changes:
+            positions.setdefault(shard_id, position)
+            continue
+        positions[shard_id] = changes[-1].sequence
+
+        # Dernier état de chaque réservation touchée ; absente de la table = supprimée
+        touched = list(dict.fromkeys(c.reservation_id for c in changes))
+        current = {
+            r.id: r
+            for r in _exec(session, select(Reservation).where(Reservation.id.in_(touched)), shard_id).all()
+        }
+        for reservation_id in touched:
+            if reservation_id in current:
+                modifiees.append(ReservationPublic.model_validate(current[reservation_id]))
+            else:
+                supprimees.append(reservation_id)
+
+    return ReservationChangesResponse(
+        modifiees=modifiees,
+        supprimees=supprimees,
+        token=encode_token(positions),
+        has_more=has_more,
+    )
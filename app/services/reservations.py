@@ -0,0 +1,192 @@
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional, TypeVar
+
+from sqlalchemy import and_, inspect
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Reservation import (
+    Reservation,
+    ReservationCreate,
+    ContexteValidation,
+    InfosRessource,
+    contexte_validation,
+)
+from app.models.Ressource import Ressource
+from app.models.User import User
+
+T = TypeVar("T")
+
+STATUTS_ACTIFS = [StatutReservation.en_cours, StatutReservation.confirme]
+
+# Verrous en bandes : les réservations d'une même ressource sont sérialisées dans le
+# process, celles de ressources différentes restent parallèles.
+LOCK_STRIPES = int(os.getenv("RESA_BOOKING_LOCK_STRIPES", "64"))
+MAX_RETRIES = int(os.getenv("RESA_BOOKING_MAX_RETRIES", "5"))
+BACKOFF_BASE = float(os.getenv("RESA_BOOKING_BACKOFF", "0.01"))
+
+_stripes = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+_metrics_lock = threading.Lock()
+booking_metrics = {
+    "succes": 0,
+    "conflits": 0,
+    "tentatives_relancees": 0,
+    "abandons": 0,
+}
+
+
+class ConflitReservation(Exception):
+    pass
+
+
+class BaseOccupee(Exception):
+    pass
+
+
+def _incr(key: str):
+    with _metrics_lock:
+        booking_metrics[key] += 1
+
+
+def get_booking_metrics() -> dict:
+    with _metrics_lock:
+        return dict(booking_metrics)
+
+
+def lock_for(ressource_id: int) -> threading.Lock:
+    return _stripes[hash(ressource_id) % LOCK_STRIPES]
+
+
+def _is_busy(error: OperationalError) -> bool:
+    message = str(error.orig).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def preparer_reservation(data: ReservationCreate, ressource: Ressource, createur: User) -> Reservation:
+    # Relations d'abord pour que les validateurs (@validates) voient la ressource et le créateur
+    reservation = Reservation()
+    reservation.ressource = ressource
+    reservation.createur = createur
+    for key, value in data.model_dump().items():
+        setattr(reservation, key, value)
+    reservation.createur_id = createur.id
+    return reservation
+
+
+def precharger_validation(session, reservations: Iterable) -> ContexteValidation:
+    """Une requête pour les ressources (type, capacité), une pour les rôles des créateurs."""
+    reservations = list(reservations)
+    ressource_ids = {r.ressource_id for r in reservations}
+    createur_ids = {r.createur_id for r in reservations}
+
+    ressources = {}
+    if ressource_ids:
+        for ressource_id, type_ressource, capacite in session.exec(
+            select(Ressource.id, Ressource.type_ressource, Ressource.capacite_maximum)
+            .where(Ressource.id.in_(ressource_ids))
+        ):
+            ressources[ressource_id] = InfosRessource(type_ressource, capacite)
+
+    roles = {}
+    if createur_ids:
+        roles = dict(session.exec(select(User.id, User.role).where(User.id.in_(createur_ids))).all())
+
+    return ContexteValidation(ressources=ressources, roles=roles)
+
+
+@contextmanager
+def validation_groupee(contexte: ContexteValidation):
+    # Les @validates de Reservation lisent ce contexte au lieu de charger ressource / createur
+    token = contexte_validation.set(contexte)
+    try:
+        yield contexte
+    finally:
+        contexte_validation.reset(token)
+
+
+def valider_lot(reservations: Iterable, contexte: ContexteValidation) -> list[Optional[str]]:
+    """Mêmes règles que les validateurs de Reservation, sur des objets ayant les mêmes attributs."""
+    erreurs = []
+    for r in reservations:
+        ressource = contexte.ressources.get(r.ressource_id)
+        try:
+            Reservation.regle_debut(r.debut, contexte.roles.get(r.createur_id))
+            Reservation.regle_fin(r.fin)
+            Reservation.regle_duree(r.debut, r.fin, ressource)
+            Reservation.regle_capacite(r.nbr_participants, ressource)
+        except ValueError as e:
+            erreurs.append(str(e))
+        else:
+            erreurs.append(None)
+    return erreurs
+
+
+def chevauchement_existe(session, ressource_id: int, debut, fin) -> bool:
+    return session.exec(
+        select(Reservation.id)
+        .where(
+            and_(
+                Reservation.ressource_id == ressource_id,
+                Reservation.debut < fin,
+                Reservation.fin > debut,
+                Reservation.statut.in_(STATUTS_ACTIFS)
+            )
+        )
+        .limit(1)
+    ).first() is not None
+
+
+def _begin_immediate(session, ressource_id: int):
+    # Prend le verrou d'écriture SQLite dès le début : la vérification de chevauchement
+    # et l'insertion voient le même état de la base, y compris entre workers.
+    conn = session.connection(bind_arguments={
+        "mapper": inspect(Reservation),
+        "clause": select(Reservation).where(Reservation.ressource_id == ressource_id),
+    })
+    if conn.dialect.name == "sqlite":
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+def ecrire_sous_verrou(session, ressource_id: int, operation: Callable[[], T]) -> T:
+    """Exécute `operation` puis commit, sous le verrou de la ressource et dans une transaction
+    BEGIN IMMEDIATE ; relancée avec backoff tant que la base est occupée."""
+    with lock_for(ressource_id):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                _begin_immediate(session, ressource_id)
+                resultat = operation()
+                session.commit()
+                return resultat
+            except OperationalError as e:
+                session.rollback()
+                if not _is_busy(e):
+                    raise
+                if attempt == MAX_RETRIES:
+                    _incr("abandons")
+                    raise BaseOccupee("Base de données occupée, réessayez plus tard") from e
+                _incr("tentatives_relancees")
+                time.sleep(BACKOFF_BASE * (2 ** attempt) * (1 + random.random()))
+            except Exception:
+                session.rollback()
+                raise
+
+
+def reserver(session, reservation: Reservation) -> Reservation:
+    ressource_id = reservation.ressource_id
+
+    def inserer():
+        if chevauchement_existe(session, ressource_id, reservation.debut, reservation.fin):
+            _incr("conflits")
+            raise ConflitReservation("Le créneau chevauche une réservation existante")
+        session.add(reservation)
+
+    ecrire_sous_verrou(session, ressource_id, inserer)
+    session.refresh(reservation)
+    _incr("succes")
+    return reservation
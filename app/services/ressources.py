@@ -1,16 +1,36 @@
+import os
 from typing import Optional, Literal
 from datetime import datetime, timedelta
 
 from sqlmodel import select
-from sqlalchemy import func, and_
-
-from app.models.Ressource import Ressource, RessourceStatistics, DisponibiliteJour
+from sqlalchemy import case, false, func, and_, select as sa_select
+
+from app.database import sharding
+from app.models.Ressource import (
+    Ressource,
+    RessourcePublic,
+    RessourcePartielle,
+    RessourceStatistics,
+    RessourceDetailResponse,
+    DisponibiliteJour,
+)
 from app.models.Reservation import Reservation, ReservationPublicSimple
+from app.models.ReservationArchive import ReservationArchive
 from app.models.ResourceAvailability import ResourceAvailability
 from app.models.Enum.TypeRessource import TypeRessource
 from app.models.Enum.EtatRessource import EtatRessource
 from app.models.Enum.StatutReservation import StatutReservation
 from app.models.Enum.TypeDisponibilite import TypeDisponibilite
+from app.services.archivage import duree_agregats, range_needs_archive
+from app.services.query_cache import QueryCache
+from app.services.reference_data import reference_cache
+
+# Listes de ressources mémorisées par combinaison de filtres (0 = désactivé)
+RESSOURCE_CACHE_SIZE = int(os.getenv("RESA_RESSOURCE_CACHE_SIZE", "256"))
+RESSOURCE_CACHE_MAX_BYTES = int(os.getenv("RESA_RESSOURCE_CACHE_MAX_BYTES", str(8 * 1024 * 1024)))
+
+ressource_list_cache = QueryCache(RESSOURCE_CACHE_SIZE, RESSOURCE_CACHE_MAX_BYTES)
+reference_cache.on_invalidate("ressources", ressource_list_cache.clear)
 
 
 def ressource_list(
@@ -26,6 +46,36 @@ def ressource_list(
     minimum_capacity: int = 0,
     sort_by: Literal["nom", "capacite", "type"] = "nom",
     sort_order: Literal["asc", "desc"] = "asc",
+    fields: Optional[frozenset[str]] = None,
+    site_ids: Optional[frozenset[int]] = None,
+) -> dict:
+    # Filtres normalisés : des requêtes équivalentes partagent la même entrée du cache
+    batiment = batiment or None
+    requested = tuple(sorted({c.strip() for c in (caracteristiques or "").split(",") if c.strip()}))
+    minimum_capacity = max(minimum_capacity, 0)
+    key = (
+        reference_cache.version("ressources") if ressource_list_cache.enabled else 0,
+        offset, limit, type_of_ressource, site_id, batiment, disponible,
+        requested, minimum_capacity, sort_by, sort_order, fields, site_ids,
+    )
+    result = ressource_list_cache.get_or_load(
+        key,
+        lambda: _ressource_list_load(
+            session, offset, limit, type_of_ressource, site_id, batiment, disponible,
+            requested, minimum_capacity, sort_by, sort_order, fields, site_ids,
+        ),
+        _taille_estimee,
+    )
+    return {"items": result["items"], "meta": dict(result["meta"])}
+
+
+def _taille_estimee(result: dict) -> int:
+    return sum(len(item.model_dump_json(exclude_unset=True)) for item in result["items"]) + 128
+
+
+def _ressource_list_load(
+    session, offset, limit, type_of_ressource, site_id, batiment, disponible,
+    requested, minimum_capacity, sort_by, sort_order, fields=None, site_ids=None,
 ) -> dict:
     conditions = []
 
@@ -35,6 +85,10 @@ def ressource_list(
     if site_id is not None:
         conditions.append(Ressource.site_id == site_id)
 
+    # Périmètre de l'appelant (sites gérés) ; None = aucun filtre
+    if site_ids is not None:
+        conditions.append(Ressource.site_id.in_(site_ids))
+
     if batiment:
         conditions.append(Ressource.localisation_batiment.ilike(f"%{batiment}%"))
 
@@ -46,10 +100,8 @@ def ressource_list(
     if minimum_capacity > 0:
         conditions.append(Ressource.capacite_maximum >= minimum_capacity)
 
-    if caracteristiques:
-        requested = [c.strip() for c in caracteristiques.split(",") if c.strip()]
-        for c in requested:
-            conditions.append(Ressource.caracteristiques.contains(c))
+    for c in requested:
+        conditions.append(Ressource.caracteristiques.contains(c))
 
     sort_map = {
         "nom": Ressource.nom,
@@ -62,14 +114,32 @@ def ressource_list(
     total_stmt = select(func.count()).select_from(Ressource)
     if conditions:
         total_stmt = total_stmt.where(*conditions)
-    total = session.exec(total_stmt).one()
 
-    stmt = select(Ressource)
+    if fields:
+        # Colonnes demandées + colonne de tri (nécessaire à la fusion des sites en mode shardé)
+        colonnes = sorted(fields | {sort_map[sort_by].key})
+        stmt = sa_select(*(getattr(Ressource, c) for c in colonnes))
+    else:
+        stmt = select(Ressource)
     if conditions:
         stmt = stmt.where(*conditions)
-    stmt = stmt.order_by(order_col).offset(offset).limit(limit)
+    stmt = stmt.order_by(order_col)
+
+    if sharding.is_sharded_session(session) and site_id is None:
+        shard_ids = session.site_shard_ids()
+        if site_ids is not None:
+            shard_ids = [s for s in shard_ids if sharding.site_for_shard_id(s) in site_ids]
+        total, items = _ressource_list_all_sites(
+            session, total_stmt, stmt, offset, limit, sort_by, sort_order, shard_ids
+        )
+    else:
+        total = session.exec(total_stmt).one()
+        items = session.exec(stmt.offset(offset).limit(limit)).all()
 
-    items = session.exec(stmt).all()
+    if fields:
+        items = [RessourcePartielle(**{c: row._mapping[c] for c in fields}) for row in items]
+    else:
+        items = [RessourcePublic.model_validate(item) for item in items]
 
     return {
         "items": items,
@@ -84,14 +154,30 @@ def ressource_list(
     }
 
 
+SORT_KEYS = {
+    "nom": lambda r: r.nom,
+    "capacite": lambda r: r.capacite_maximum,
+    "type": lambda r: r.type_ressource.name,
+}
+
+
+def _ressource_list_all_sites(session, total_stmt, stmt, offset, limit, sort_by, sort_order, shard_ids):
+    # Mode shardé sans filtre de site : chaque site renvoie ses offset+limit premiers, fusion puis découpe
+    total = sum(result.one() for result in sharding.fan_out(session, total_stmt, shard_ids))
+    candidates = []
+    for result in sharding.fan_out(session, stmt.limit(offset + limit), shard_ids):
+        candidates.extend(result.all())
+    candidates.sort(key=SORT_KEYS[sort_by], reverse=sort_order == "desc")
+    return total, candidates[offset:offset + limit]
+
+
 def get_ressource_statistics(session, ressource_id: int) -> RessourceStatistics:
     now = datetime.now()
 
-    total_reservations = session.exec(
-        select(func.count())
-        .select_from(Reservation)
-        .where(Reservation.ressource_id == ressource_id)
-    ).one()
+    # Les réservations archivées comptent toujours dans les statistiques globales
+    total_actives, minutes_actives = duree_agregats(session, Reservation, ressource_id)
+    total_archivees, minutes_archivees = duree_agregats(session, ReservationArchive, ressource_id)
+    total_reservations = total_actives + total_archivees
 
     reservations_actives = session.exec(
         select(func.count())
@@ -133,14 +219,18 @@ def get_ressource_statistics(session, ressource_id: int) -> RessourceStatistics:
     heures_reservees_30_jours = sum(
         (r.fin - r.debut).total_seconds() / 3600 for r in reservations_30j
     )
+    if range_needs_archive(date_30_jours, now):
+        _, minutes_30j_archivees = duree_agregats(
+            session,
+            ReservationArchive,
+            ressource_id,
+            ReservationArchive.debut >= date_30_jours,
+            ReservationArchive.statut.in_([StatutReservation.confirme, StatutReservation.fini]),
+        )
+        heures_reservees_30_jours += minutes_30j_archivees / 60
 
     if total_reservations > 0:
-        all_reservations = session.exec(
-            select(Reservation)
-            .where(Reservation.ressource_id == ressource_id)
-        ).all()
-        durees = [(r.fin - r.debut).total_seconds() / 60 for r in all_reservations]
-        reservation_moyenne_duree = sum(durees) / len(durees) if durees else 0
+        reservation_moyenne_duree = (minutes_actives + minutes_archivees) / total_reservations
     else:
         reservation_moyenne_duree = 0
 
@@ -275,4 +365,227 @@ def get_disponibilite_7_jours(session, ressource_id: int, ressource: Ressource)
             creneaux_disponibles=creneaux_disponibles
         ))
 
-    return disponibilites
\ No newline at end of file
+    return disponibilites
+
+# --- Détail groupé (POST /ressources/batch-detail) : requêtes sur tout le lot au lieu d'une série par ressource
+
+def _executer_lot(session, statement, ressource_ids: list[int]) -> list:
+    # Mode shardé : uniquement les sites des ressources demandées (les sous-requêtes ne sont pas routées)
+    if not sharding.is_sharded_session(session):
+        return session.exec(statement).all()
+    shard_ids = sorted({sharding.shard_id_for_site(sharding.site_for_id(i)) for i in ressource_ids})
+    rows = []
+    for result in sharding.fan_out(session, statement, shard_ids):
+        rows.extend(result.all())
+    return rows
+
+
+def _minutes(model):
+    return (func.julianday(model.fin) - func.julianday(model.debut)) * 1440
+
+
+def _somme_si(condition, valeur=1):
+    return func.coalesce(func.sum(case((condition, valeur), else_=0)), 0)
+
+
+def get_statistiques_lot(session, ressource_ids: list[int]) -> dict[int, RessourceStatistics]:
+    now = datetime.now()
+    date_30_jours = now - timedelta(days=30)
+    date_7_jours = now + timedelta(days=7)
+    minutes = _minutes(Reservation)
+
+    # Mêmes compteurs que get_ressource_statistics, en une agrégation conditionnelle par ressource
+    actives = {
+        row[0]: row[1:]
+        for row in _executer_lot(session, sa_select(
+            Reservation.ressource_id,
+            func.count(),
+            func.coalesce(func.sum(minutes), 0),
+            _somme_si(and_(
+                Reservation.debut <= now,
+                Reservation.fin >= now,
+                Reservation.statut == StatutReservation.confirme,
+            )),
+            _somme_si(and_(
+                Reservation.debut > now,
+                Reservation.statut.in_([StatutReservation.en_cours, StatutReservation.confirme]),
+            )),
+            _somme_si(and_(
+                Reservation.debut >= date_30_jours,
+                Reservation.statut.in_([StatutReservation.confirme, StatutReservation.fini]),
+            ), minutes),
+            _somme_si(and_(
+                Reservation.debut >= now,
+                Reservation.debut < date_7_jours,
+                Reservation.statut.in_([StatutReservation.en_cours, StatutReservation.confirme]),
+            ), minutes),
+        ).where(Reservation.ressource_id.in_(ressource_ids)).group_by(Reservation.ressource_id), ressource_ids)
+    }
+
+    minutes_archive = _minutes(ReservationArchive)
+    archive_30j = and_(
+        ReservationArchive.debut >= date_30_jours,
+        ReservationArchive.statut.in_([StatutReservation.confirme, StatutReservation.fini]),
+    ) if range_needs_archive(date_30_jours, now) else false()
+    archivees = {
+        row[0]: row[1:]
+        for row in _executer_lot(session, sa_select(
+            ReservationArchive.ressource_id,
+            func.count(),
+            func.coalesce(func.sum(minutes_archive), 0),
+            _somme_si(archive_30j, minutes_archive),
+        ).where(ReservationArchive.ressource_id.in_(ressource_ids)).group_by(ReservationArchive.ressource_id), ressource_ids)
+    }
+
+    statistiques = {}
+    for ressource_id in ressource_ids:
+        total_a, minutes_a, en_cours, a_venir, minutes_30j, minutes_7j = actives.get(ressource_id, (0, 0, 0, 0, 0, 0))
+        total_h, minutes_h, minutes_30j_h = archivees.get(ressource_id, (0, 0, 0))
+        total_reservations = total_a + total_h
+        heures_7j = minutes_7j / 60
+        statistiques[ressource_id] = RessourceStatistics(
+            total_reservations=total_reservations,
+            reservations_actives=en_cours,
+            reservations_a_venir=a_venir,
+            taux_occupation_7_jours=round(heures_7j / (7 * 24) * 100, 2),
+            heures_reservees_30_jours=round((minutes_30j + minutes_30j_h) / 60, 2),
+            reservation_moyenne_duree=round((minutes_a + minutes_h) / total_reservations, 2) if total_reservations else 0,
+        )
+    return statistiques
+
+
+def get_prochaines_reservations_lot(
+    session, ressource_ids: list[int], limit: int = 5
+) -> dict[int, list[ReservationPublicSimple]]:
+    now = datetime.now()
+    # ROW_NUMBER par ressource : les `limit` premières de chaque ressource en une seule requête
+    rang = func.row_number().over(
+        partition_by=Reservation.ressource_id,
+        order_by=(Reservation.debut.asc(), Reservation.id.asc()),
+    ).label("rang")
+    prochaines = (
+        sa_select(
+            Reservation.id, Reservation.ressource_id, Reservation.user_id, Reservation.debut,
+            Reservation.fin, Reservation.statut, Reservation.description, Reservation.nbr_participants,
+            rang,
+        )
+        .where(
+            Reservation.ressource_id.in_(ressource_ids),
+            Reservation.debut >= now,
+            Reservation.statut.in_([StatutReservation.en_cours, StatutReservation.confirme]),
+        )
+        .subquery()
+    )
+    rows = _executer_lot(
+        session,
+        sa_select(prochaines).where(prochaines.c.rang <= limit).order_by(prochaines.c.ressource_id, prochaines.c.rang),
+        ressource_ids,
+    )
+
+    resultat = {ressource_id: [] for ressource_id in ressource_ids}
+    for r in rows:
+        resultat[r.ressource_id].append(ReservationPublicSimple(
+            id=r.id,
+            user_id=r.user_id,
+            debut=r.debut,
+            fin=r.fin,
+            statut=r.statut,
+            description=r.description,
+            nbr_participants=r.nbr_participants
+        ))
+    return resultat
+
+
+def get_disponibilite_7_jours_lot(session, ressources: list[Ressource]) -> dict[int, list[DisponibiliteJour]]:
+    now = datetime.now()
+    jours = []
+    for i in range(7):
+        jour = now + timedelta(days=i)
+        jours.append((
+            jour.strftime("%Y-%m-%d"),
+            jour.replace(hour=0, minute=0, second=0, microsecond=0),
+            jour.replace(hour=23, minute=59, second=59, microsecond=999999),
+        ))
+    debut_plage, fin_plage = jours[0][1], jours[-1][2]
+
+    actives = [r.id for r in ressources if r.etat == EtatRessource.active]
+    indisponibilites = {ressource_id: [] for ressource_id in actives}
+    occupations = {ressource_id: [] for ressource_id in actives}
+    if actives:
+        # Un seul parcours de la plage de 7 jours pour tout le lot, réparti ensuite jour par jour
+        for a in _executer_lot(session, sa_select(
+            ResourceAvailability.ressource_id, ResourceAvailability.debut, ResourceAvailability.fin,
+            ResourceAvailability.type_disponibilite, ResourceAvailability.raison_indisponibilite,
+        ).where(
+            ResourceAvailability.ressource_id.in_(actives),
+            ResourceAvailability.debut <= fin_plage,
+            ResourceAvailability.fin >= debut_plage,
+            ResourceAvailability.type_disponibilite != TypeDisponibilite.disponibilite_normale,
+        ).order_by(ResourceAvailability.id), actives):
+            indisponibilites[a.ressource_id].append(a)
+
+        for r in _executer_lot(session, sa_select(
+            Reservation.ressource_id, Reservation.debut, Reservation.fin,
+        ).where(
+            Reservation.ressource_id.in_(actives),
+            Reservation.debut < fin_plage,
+            Reservation.fin > debut_plage,
+            Reservation.statut.in_([StatutReservation.en_cours, StatutReservation.confirme]),
+        ), actives):
+            occupations[r.ressource_id].append(r)
+
+    resultat = {}
+    for ressource in ressources:
+        disponibilites = []
+        for date_str, debut_jour, fin_jour in jours:
+            if ressource.etat != EtatRessource.active:
+                disponibilites.append(DisponibiliteJour(
+                    date=date_str,
+                    est_disponible=False,
+                    raison_indisponibilite=f"Ressource {ressource.etat.value}",
+                    creneaux_disponibles=0
+                ))
+                continue
+
+            du_jour = [a for a in indisponibilites[ressource.id] if a.debut <= fin_jour and a.fin >= debut_jour]
+            if du_jour:
+                disponibilites.append(DisponibiliteJour(
+                    date=date_str,
+                    est_disponible=False,
+                    raison_indisponibilite=", ".join(
+                        [a.raison_indisponibilite or a.type_disponibilite.value for a in du_jour]
+                    ),
+                    creneaux_disponibles=0
+                ))
+                continue
+
+            heures_occupees = sum(
+                (min(r.fin, fin_jour) - max(r.debut, debut_jour)).total_seconds() / 3600
+                for r in occupations[ressource.id]
+                if r.debut < fin_jour and r.fin > debut_jour
+            )
+            creneaux_disponibles = max(0, 10 - int(heures_occupees))
+            disponibilites.append(DisponibiliteJour(
+                date=date_str,
+                est_disponible=creneaux_disponibles > 0,
+                raison_indisponibilite=None,
+                creneaux_disponibles=creneaux_disponibles
+            ))
+        resultat[ressource.id] = disponibilites
+    return resultat
+
+
+def get_ressources_details(session, ressources: list[Ressource]) -> list[RessourceDetailResponse]:
+    ressource_ids = [r.id for r in ressources]
+    statistiques = get_statistiques_lot(session, ressource_ids)
+    prochaines = get_prochaines_reservations_lot(session, ressource_ids, limit=5)
+    disponibilites = get_disponibilite_7_jours_lot(session, ressources)
+    return [
+        RessourceDetailResponse(
+            ressource=RessourcePublic.model_validate(ressource),
+            statistiques=statistiques[ressource.id],
+            prochaines_reservations=prochaines[ressource.id],
+            disponibilite_7_jours=disponibilites[ressource.id],
+        )
+        for ressource in ressources
+    ]
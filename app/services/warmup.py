@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, select
+
+from app.database import sharding
+from app.database.database import new_session
+from app.database.engines import get_engine
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.models.User import User
+from app.services.liste_attente import profondeur
+from app.services.localisation import index_localisation
+from app.services.reference_data import reference_cache
+from app.services.reservations import chevauchement_existe
+from app.services.ressources import (
+    get_disponibilite_7_jours,
+    get_prochaines_reservations,
+    get_ressource_statistics,
+    get_ressources_details,
+    ressource_list,
+)
+
+logger = logging.getLogger(__name__)
+
+# Préchauffage au démarrage (0 = prêt dès la création du schéma)
+WARMUP_ENABLED = os.getenv("RESA_WARMUP", "1") == "1"
+# Connexions ouvertes d'avance par moteur (pool_size par défaut de SQLAlchemy : 5)
+WARMUP_CONNECTIONS = int(os.getenv("RESA_WARMUP_CONNECTIONS", "5"))
+# Ressources les plus réservées sur 30 jours dont le détail est préchargé
+WARMUP_POPULAR = int(os.getenv("RESA_WARMUP_POPULAR", "20"))
+
+
+class EtatDemarrage:
+    def __init__(self):
+        self.pret = False
+        self.etapes: dict[str, float] = {}
+        self.erreurs: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def reinitialiser(self):
+        with self._lock:
+            self.pret = False
+            self.etapes, self.erreurs = {}, {}
+
+    def terminer(self):
+        with self._lock:
+            self.pret = True
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {"pret": self.pret, "etapes_ms": dict(self.etapes), "erreurs": dict(self.erreurs)}
+
+
+etat_demarrage = EtatDemarrage()
+
+
+def _engines() -> list[Engine]:
+    if not sharding.SHARDING_ENABLED:
+        return [get_engine()]
+    return [get_engine()] + [
+        sharding.get_site_engine(sharding.site_for_shard_id(shard_id))
+        for shard_id in sharding.all_site_shard_ids(get_engine())
+    ]
+
+
+def ouvrir_connexions():
+    # Connexions ouvertes simultanément puis rendues : elles restent dans le pool
+    for db_engine in _engines():
+        connexions = [db_engine.connect() for _ in range(WARMUP_CONNECTIONS)]
+        for conn in connexions:
+            conn.exec_driver_sql("SELECT 1")
+            conn.close()
+
+
+def charger_references():
+    for nom in ("sites", "departments", "gestionnaires"):
+        reference_cache.get(nom)
+    index_localisation.get(0)
+
+
+def _ressources_populaires(session) -> list[int]:
+    stmt = (
+        select(Reservation.ressource_id, func.count().label("nb"))
+        .where(Reservation.debut >= datetime.now() - timedelta(days=30))
+        .group_by(Reservation.ressource_id)
+        .order_by(func.count().desc())
+        .limit(WARMUP_POPULAR)
+    )
+    if sharding.is_sharded_session(session):
+        rows = [row for result in sharding.fan_out(session, stmt) for row in result.all()]
+        rows.sort(key=lambda row: row.nb, reverse=True)
+    else:
+        rows = session.exec(stmt).all()
+    return [row.ressource_id for row in rows[:WARMUP_POPULAR]]
+
+
+def compiler_requetes():
+    # Une exécution de chaque requête chaude remplit le cache de compilation SQLAlchemy
+    # et le cache de requêtes préparées de la connexion SQLite utilisée
+    now = datetime.now()
+    with new_session() as session:
+        stmt = select(Ressource).limit(1)
+        if sharding.is_sharded_session(session):
+            ressources = [r for result in sharding.fan_out(session, stmt) for r in result.all()][:1]
+        else:
+            ressources = session.exec(stmt).all()
+    # Chargement de l'utilisateur fait par AuthMiddleware à chaque requête
+    with Session(get_engine()) as session:
+        session.get(User, session.exec(select(func.min(User.id))).one() or 0)
+    with new_session() as session:
+        ressource_list(session)
+        for ressource in ressources:
+            get_ressource_statistics(session, ressource.id)
+            get_prochaines_reservations(session, ressource.id, limit=5)
+            get_disponibilite_7_jours(session, ressource.id, ressource)
+            chevauchement_existe(session, ressource.id, now, now + timedelta(hours=1))
+            profondeur(session, ressource.id)
+
+
+def precharger_ressources_populaires():
+    with new_session() as session:
+        ids = _ressources_populaires(session)
+        if not ids:
+            return
+        ressources = session.exec(select(Ressource).where(Ressource.id.in_(ids))).all()
+        get_ressources_details(session, list(ressources))
+
+
+ETAPES: list[tuple[str, Callable[[], None]]] = [
+    ("connexions", ouvrir_connexions),
+    ("references", charger_references),
+    ("requetes", compiler_requetes),
+    ("ressources_populaires", precharger_ressources_populaires),
+]
+
+
+def executer_warmup(etapes: Optional[list[tuple[str, Callable[[], None]]]] = None):
+    """Exécute chaque étape ; une étape en échec est signalée mais ne bloque pas la disponibilité."""
+    etat_demarrage.reinitialiser()
+    for nom, etape in (etapes if etapes is not None else ETAPES if WARMUP_ENABLED else []):
+        started = time.perf_counter()
+        try:
+            etape()
+        except Exception as e:
+            logger.exception("Préchauffage : étape %s en échec", nom)
+            etat_demarrage.erreurs[nom] = str(e)
+        etat_demarrage.etapes[nom] = round((time.perf_counter() - started) * 1000, 1)
+    etat_demarrage.terminer()
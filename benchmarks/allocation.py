@@ -0,0 +1,185 @@
+"""Allocation en lot des demandes de réservation : débit et invariants.
+
+Usage : python -m benchmarks.allocation [--demandes 50000] [--ressources 200] [--db-demandes 5000]
+
+1. Alloue `--demandes` demandes synthétiques en mémoire (plannings triés + bisect) et
+   vérifie : aucun chevauchement, priorité respectée, résultat identique à une
+   allocation naïve par comparaison deux à deux sur un échantillon.
+2. Exécute `executer_allocation` sur `--db-demandes` demandes dans une base SQLite
+   temporaire (une transaction) et vérifie l'absence de chevauchement en base.
+"""
+import argparse
+import random
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, time as time_type, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel, Session
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.DemandeReservation import DemandeReservation
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Enum.TypeRole import TypeRole
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.models.User import User
+from app.services.allocation import allouer, cle_priorite, executer_allocation
+
+
+@dataclass
+class Demande:
+    id: int
+    ressource_id: int
+    priorite: TypePriorite
+    date_demande: datetime
+    debut: datetime
+    fin: datetime
+
+
+def generer(nb: int, nb_ressources: int, base: datetime) -> list[Demande]:
+    demandes = []
+    for i in range(nb):
+        debut = base + timedelta(days=random.randrange(5), minutes=15 * random.randrange(40))
+        demandes.append(Demande(
+            id=i + 1,
+            ressource_id=random.randrange(1, nb_ressources + 1),
+            priorite=TypePriorite.prioritaire if random.random() < 0.2 else TypePriorite.standard,
+            date_demande=datetime.now() - timedelta(seconds=random.randrange(3600)),
+            debut=debut,
+            fin=debut + timedelta(minutes=30 * random.randint(1, 4)),
+        ))
+    return demandes
+
+
+def generer_occupations(nb_ressources: int, base: datetime) -> dict[int, list[tuple]]:
+    occupations = {}
+    for ressource_id in range(1, nb_ressources + 1):
+        debut = base + timedelta(days=random.randrange(5), hours=random.randrange(8))
+        occupations[ressource_id] = [(debut, debut + timedelta(hours=2))]
+    return occupations
+
+
+def chevauche(a, b) -> bool:
+    return a[0] < b[1] and b[0] < a[1]
+
+
+def allouer_naif(demandes, occupations) -> set[int]:
+    retenus: dict[int, list[tuple]] = {k: list(v) for k, v in occupations.items()}
+    acceptees = set()
+    for demande in sorted(demandes, key=cle_priorite):
+        creneaux = retenus.setdefault(demande.ressource_id, [])
+        if not any(chevauche((demande.debut, demande.fin), c) for c in creneaux):
+            creneaux.append((demande.debut, demande.fin))
+            acceptees.add(demande.id)
+    return acceptees
+
+
+def verifier(acceptees, rejetees, occupations):
+    par_ressource: dict[int, list[tuple]] = {}
+    for demande in acceptees:
+        par_ressource.setdefault(demande.ressource_id, []).append((demande.debut, demande.fin))
+    for ressource_id, creneaux in par_ressource.items():
+        creneaux = sorted(creneaux + occupations.get(ressource_id, []))
+        for precedent, suivant in zip(creneaux, creneaux[1:]):
+            assert precedent[1] <= suivant[0], f"chevauchement sur la ressource {ressource_id}"
+
+    # Une demande prioritaire n'est rejetée qu'à cause d'une occupation existante ou d'une autre prioritaire
+    bloquants: dict[int, list[tuple]] = {k: list(v) for k, v in occupations.items()}
+    for demande in acceptees:
+        if demande.priorite == TypePriorite.prioritaire:
+            bloquants.setdefault(demande.ressource_id, []).append((demande.debut, demande.fin))
+    for demande in rejetees:
+        if demande.priorite == TypePriorite.prioritaire:
+            assert any(
+                chevauche((demande.debut, demande.fin), c) for c in bloquants.get(demande.ressource_id, [])
+            ), f"demande prioritaire {demande.id} rejetée sans conflit prioritaire"
+
+
+def bench_memoire(nb: int, nb_ressources: int):
+    base = (datetime.now() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+    demandes = generer(nb, nb_ressources, base)
+    occupations = generer_occupations(nb_ressources, base)
+
+    started = time.perf_counter()
+    acceptees, rejetees = allouer(demandes, occupations)
+    elapsed = time.perf_counter() - started
+    print(f"mémoire : {nb} demandes en {elapsed * 1000:.0f}ms ({nb / elapsed:.0f}/s), "
+          f"{len(acceptees)} acceptées, {len(rejetees)} rejetées")
+
+    verifier(acceptees, rejetees, occupations)
+    echantillon = demandes[:2000]
+    attendu = allouer_naif(echantillon, occupations)
+    assert {d.id for d in allouer(echantillon, occupations)[0]} == attendu, "écart avec l'allocation naïve"
+
+
+def bench_base(nb: int, nb_ressources: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'allocation.db'}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        base = (datetime.now() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+        with Session(engine) as session:
+            site = Site(nom="Site bench", adresse="1 rue", horaires_ouverture=time_type(8), horaires_fermeture=time_type(18))
+            session.add(site)
+            session.flush()
+            users = [
+                User(
+                    nom_utilisateur=f"user{i}", email=f"user{i}@resa.fr", nom_prenom="Bench User", hashed_password="x",
+                    role=TypeRole.employe, priorite=priorite, site_principal_id=site.id,
+                )
+                for i, priorite in enumerate((TypePriorite.standard, TypePriorite.prioritaire))
+            ]
+            ressources = [
+                Ressource(
+                    nom=f"Salle {i}", type_ressource=TypeRessource.salle, capacite_maximum=10, description="",
+                    site_id=site.id, localisation_batiment="A", localisation_etage="0", localisation_numero=str(i),
+                    etat=EtatRessource.active,
+                )
+                for i in range(nb_ressources)
+            ]
+            session.add_all(users + ressources)
+            session.flush()
+            for demande in generer(nb, nb_ressources, base):
+                user = users[demande.priorite == TypePriorite.prioritaire]
+                session.add(DemandeReservation(
+                    ressource_id=ressources[demande.ressource_id - 1].id, user_id=user.id, createur_id=user.id,
+                    priorite=demande.priorite, date_demande=demande.date_demande,
+                    debut=demande.debut, fin=demande.fin, description="bench",
+                ))
+            session.commit()
+
+        with Session(engine) as session:
+            started = time.perf_counter()
+            resultat = executer_allocation(session)
+            elapsed = time.perf_counter() - started
+        print(f"base : {nb} demandes en {elapsed:.2f}s ({nb / elapsed:.0f}/s) {resultat}")
+
+        with engine.connect() as conn:
+            overlaps = conn.exec_driver_sql(
+                "SELECT COUNT(*) FROM reservations a JOIN reservations b "
+                "ON a.ressource_id = b.ressource_id AND a.id < b.id "
+                "AND a.debut < b.fin AND a.fin > b.debut"
+            ).scalar()
+        engine.dispose()
+    assert resultat["allouees"] + resultat["rejetees"] == nb
+    assert overlaps == 0, "double réservation détectée"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--demandes", type=int, default=50000)
+    parser.add_argument("--ressources", type=int, default=200)
+    parser.add_argument("--db-demandes", type=int, default=5000)
+    args = parser.parse_args()
+
+    bench_memoire(args.demandes, args.ressources)
+    bench_base(args.db_demandes, args.ressources)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Test de charge du chemin de réservation : aucun chevauchement sous forte concurrence.
+
+Usage : python -m benchmarks.booking_stress [--attempts 500] [--threads 50] [--ressources 3]
+
+Lance `--attempts` réservations concurrentes sur des créneaux qui se chevauchent,
+dans une base SQLite fichier temporaire (plusieurs connexions réelles), puis vérifie
+qu'aucune paire de réservations actives ne se chevauche sur une même ressource.
+"""
+import argparse
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as time_type, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlmodel import SQLModel, Session
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Enum.TypeRole import TypeRole
+from app.models.Reservation import ReservationCreate
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.models.User import User
+from app.services import reservations as booking
+
+
+def seed(engine, nb_ressources: int) -> tuple[list[int], int]:
+    with Session(engine) as session:
+        site = Site(nom="Site stress", adresse="1 rue", horaires_ouverture=time_type(8), horaires_fermeture=time_type(18))
+        session.add(site)
+        session.flush()
+        user = User(
+            nom_utilisateur="stress", email="stress@resa.fr", nom_prenom="Stress Test", hashed_password="x",
+            role=TypeRole.employe, priorite=TypePriorite.standard, site_principal_id=site.id,
+        )
+        ressources = [
+            Ressource(
+                nom=f"Salle {i}", type_ressource=TypeRessource.salle, capacite_maximum=10, description="",
+                site_id=site.id, localisation_batiment="A", localisation_etage="0", localisation_numero=str(i),
+                etat=EtatRessource.active,
+            )
+            for i in range(nb_ressources)
+        ]
+        session.add(user)
+        session.add_all(ressources)
+        session.commit()
+        return [r.id for r in ressources], user.id
+
+
+def attempt(engine, ressource_id: int, user_id: int, debut: datetime) -> str:
+    data = ReservationCreate(
+        ressource_id=ressource_id, user_id=user_id, createur_id=user_id, debut=debut,
+        fin=debut + timedelta(hours=1), statut=StatutReservation.confirme, description="stress",
+    )
+    with Session(engine) as session:
+        reservation = booking.preparer_reservation(data, session.get(Ressource, ressource_id), session.get(User, user_id))
+        try:
+            booking.reserver(session, reservation)
+            return "succes"
+        except booking.ConflitReservation:
+            return "conflit"
+        except booking.BaseOccupee:
+            return "abandon"
+
+
+def count_overlaps(engine) -> int:
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(
+            "SELECT COUNT(*) FROM reservations a JOIN reservations b "
+            "ON a.ressource_id = b.ressource_id AND a.id < b.id "
+            "AND a.debut < b.fin AND a.fin > b.debut "
+            "WHERE a.statut IN ('en_cours', 'confirme') AND b.statut IN ('en_cours', 'confirme')"
+        ).scalar()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=50)
+    parser.add_argument("--ressources", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'stress.db'}", connect_args={"check_same_thread": False})
+        SQLModel.metadata.create_all(engine)
+        ressource_ids, user_id = seed(engine, args.ressources)
+
+        # 20 créneaux de 1h décalés de 15 min sur une journée : beaucoup de chevauchements
+        base = (datetime.now() + timedelta(days=2)).replace(hour=8, minute=0, second=0, microsecond=0)
+        starts = [base + timedelta(minutes=15 * i) for i in range(20)]
+        jobs = [(random.choice(ressource_ids), random.choice(starts)) for _ in range(args.attempts)]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            results = list(pool.map(lambda job: attempt(engine, job[0], user_id, job[1]), jobs))
+        elapsed = time.perf_counter() - started
+
+        overlaps = count_overlaps(engine)
+        engine.dispose()
+
+    print(f"{args.attempts} tentatives en {elapsed:.2f}s ({args.attempts / elapsed:.0f}/s)")
+    print({r: results.count(r) for r in ("succes", "conflit", "abandon")})
+    print("métriques:", booking.get_booking_metrics())
+    print("chevauchements:", overlaps)
+    assert overlaps == 0, "double réservation détectée"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Rapport de capacité (pic d'usage simultané par site et type) : débit et exactitude.
+
+Usage : python -m benchmarks.capacite [--ressources 30] [--jours 365] [--par-jour 6]
+
+Remplit une base SQLite en mémoire avec une année de réservations réparties sur deux
+sites et trois types, puis exécute `rapport_capacite`. Vérifie pic, durées au-dessus de
+80 % / 100 % de l'inventaire et fenêtres de contention contre un calcul minute par minute
+(NumPy), et que le tas des réservations en cours n'a jamais dépassé le pic.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, time as time_type, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.services import capacite
+from app.services.capacite import SEUIL_CONTENTION, rapport_capacite
+
+
+def seed(engine, nb_ressources: int, jours: int, par_jour: int, debut: datetime) -> dict:
+    with Session(engine) as session:
+        sites = [
+            Site(nom=f"Site {i}", adresse="1 rue", horaires_ouverture=time_type(8), horaires_fermeture=time_type(18))
+            for i in range(2)
+        ]
+        session.add_all(sites)
+        session.flush()
+        ressources = [
+            Ressource(
+                nom=f"Ressource {i}", type_ressource=random.choice(list(TypeRessource)), capacite_maximum=10,
+                description="", site_id=random.choice(sites).id, localisation_batiment="A",
+                localisation_etage="0", localisation_numero=str(i), etat=EtatRessource.active,
+            )
+            for i in range(nb_ressources)
+        ]
+        session.add_all(ressources)
+        session.commit()
+        groupes = {r.id: (r.site_id, r.type_ressource) for r in ressources}
+
+    lignes = []
+    for ressource_id in groupes:
+        for jour in range(jours):
+            curseur = debut + timedelta(days=jour, hours=7)
+            for _ in range(par_jour):
+                d = curseur + timedelta(minutes=random.randrange(0, 90))
+                f = d + timedelta(minutes=random.randrange(15, 120))
+                curseur = f
+                lignes.append(dict(
+                    ressource_id=ressource_id, user_id=1, createur_id=1, debut=d, fin=f,
+                    statut=random.choice([StatutReservation.fini, StatutReservation.confirme, StatutReservation.annule]),
+                    description="bench", nbr_participants=1, date_creation=d, date_modification=d,
+                ))
+    with engine.begin() as conn:
+        conn.execute(Reservation.__table__.insert(), lignes)
+    return {"groupes": groupes, "lignes": lignes}
+
+
+def verifier(rapport, donnees: dict, debut: datetime, fin: datetime):
+    minutes = int((fin - debut).total_seconds() // 60)
+    for groupe in rapport.groupes:
+        cle = (groupe.site_id, groupe.type_ressource)
+        variations = np.zeros(minutes + 1, dtype=np.int64)
+        for ligne in donnees["lignes"]:
+            if donnees["groupes"][ligne["ressource_id"]] != cle or ligne["statut"] == StatutReservation.annule:
+                continue
+            d = max(int((ligne["debut"] - debut).total_seconds() // 60), 0)
+            f = min(int((ligne["fin"] - debut).total_seconds() // 60), minutes)
+            if d < f:
+                variations[d] += 1
+                variations[f] -= 1
+        simultane = np.cumsum(variations[:-1])
+        au_dessus = simultane >= groupe.inventaire * SEUIL_CONTENTION
+
+        assert groupe.pic_simultane == simultane.max(), cle
+        assert groupe.heures_au_dessus_80 == round(au_dessus.sum() / 60, 2), cle
+        assert groupe.heures_a_100 == round((simultane >= groupe.inventaire).sum() / 60, 2), cle
+
+        # Fenêtres : plages contiguës au-dessus du seuil, classées par pic puis durée
+        bords = np.flatnonzero(np.diff(np.concatenate(([0], au_dessus.astype(np.int8), [0]))))
+        fenetres = sorted(
+            ((int(simultane[a:b].max()), b - a) for a, b in zip(bords[::2], bords[1::2])),
+            reverse=True,
+        )[:len(groupe.fenetres_contention)]
+        obtenues = [(f.pic, round(f.duree_minutes)) for f in groupe.fenetres_contention]
+        assert obtenues == fenetres, (cle, obtenues, fenetres)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ressources", type=int, default=30)
+    parser.add_argument("--jours", type=int, default=365)
+    parser.add_argument("--par-jour", type=int, default=6)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    debut = (datetime.now() - timedelta(days=args.jours)).replace(hour=0, minute=0, second=0, microsecond=0)
+    fin = debut + timedelta(days=args.jours)
+    donnees = seed(engine, args.ressources, args.jours, args.par_jour, debut)
+    print(f"{len(donnees['lignes'])} réservations, {args.ressources} ressources, {args.jours} jours")
+
+    # Taille maximale du tas des réservations en cours, pour vérifier la mémoire bornée
+    tas_max = {"taille": 0}
+    debut_original = capacite.Balayage.debut
+
+    def debut_mesure(self, d, f):
+        debut_original(self, d, f)
+        tas_max["taille"] = max(tas_max["taille"], len(self.en_cours))
+
+    with Session(engine) as session:
+        started = time.perf_counter()
+        rapport = rapport_capacite(session, debut, fin, top=5)
+        elapsed = time.perf_counter() - started
+        print(f"rapport de capacité ({len(rapport.groupes)} groupes) : {elapsed * 1000:.0f}ms")
+
+        capacite.Balayage.debut = debut_mesure
+        try:
+            rapport = rapport_capacite(session, debut, fin, top=5)
+        finally:
+            capacite.Balayage.debut = debut_original
+
+    for groupe in rapport.groupes:
+        print(f"  site {groupe.site_id} {groupe.type_ressource.value:<10} inventaire {groupe.inventaire:>2} "
+              f"pic {groupe.pic_simultane:>2} ({groupe.taux_pic}%) ≥80% : {groupe.heures_au_dessus_80}h")
+    verifier(rapport, donnees, debut, fin)
+    pic_max = max(g.pic_simultane for g in rapport.groupes)
+    assert tas_max["taille"] <= pic_max, f"tas de {tas_max['taille']} réservations pour un pic de {pic_max}"
+    print(f"identique au calcul minute par minute ; tas maximal {tas_max['taille']} (pic {pic_max})")
+
+
+if __name__ == "__main__":
+    main()
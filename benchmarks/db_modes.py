@@ -0,0 +1,93 @@
+"""Coût CPU pur vs E/S disque : même charge HTTP sur une base fichier temporaire puis en mémoire.
+
+Usage : python -m benchmarks.db_modes [--ressources 50] [--reservations 500] [--lectures 500]
+
+Chaque mode tourne sur une base vide créée par `base_isolee` (jamais `resa.db`).
+L'écart entre `temp` (fichier, fsync à chaque commit) et `memory` (VFS memdb,
+mêmes verrous qu'un fichier) donne la part du disque ; le temps `memory` est le coût applicatif.
+"""
+import argparse
+import os
+import time
+from datetime import datetime, time as heure, timedelta
+
+os.environ.setdefault("RESA_RATE_LIMIT", "0")
+os.environ.setdefault("RESA_WARMUP", "0")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+import main  # noqa: E402
+from app.database.database import base_isolee  # noqa: E402
+from app.models.Site import Site  # noqa: E402
+
+MODES = ("temp", "memory")
+
+
+def charge(engine, nb_ressources: int, nb_reservations: int, nb_lectures: int) -> dict:
+    with Session(engine) as session:
+        session.add(Site(nom="Site bench", adresse="x", horaires_ouverture=heure(0), horaires_fermeture=heure(23, 59)))
+        session.commit()
+
+    mesures = {}
+    with TestClient(main.app) as client:
+        token = client.post("/auth/register", json={
+            "nom_utilisateur": "bench", "email": "bench@example.com", "nom_prenom": "Bench Mark",
+            "password": "pw", "role": "admin", "priorite": "standard", "site_principal_id": 1,
+        }).json()["token"]
+        client.cookies.clear()
+        headers = {"Authorization": f"Bearer {token}"}
+
+        started = time.perf_counter()
+        ids = [
+            client.post("/ressources/", headers=headers, json={
+                "nom": f"Salle {i}", "type_ressource": "salle", "capacite_maximum": 10,
+                "description": "bench", "site_id": 1, "localisation_batiment": "A",
+                "localisation_etage": "1", "localisation_numero": str(i), "etat": "active",
+            }).json()["id"]
+            for i in range(nb_ressources)
+        ]
+        debut = (datetime.now() + timedelta(days=1)).replace(hour=8, minute=0, second=0, microsecond=0)
+        for i in range(nb_reservations):
+            creneau = debut + timedelta(hours=i // nb_ressources)
+            reponse = client.post("/reservations/", headers=headers, json={
+                "ressource_id": ids[i % nb_ressources], "user_id": 1, "createur_id": 1,
+                "debut": creneau.isoformat(), "fin": (creneau + timedelta(minutes=30)).isoformat(),
+                "statut": "confirme", "description": "bench",
+            })
+            assert reponse.status_code in (200, 201), reponse.text
+        mesures["ecritures_s"] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(nb_lectures):
+            client.get(f"/ressources/{ids[i % nb_ressources]}", headers=headers)
+            client.get("/ressources/", headers=headers, params={"offset": i % nb_ressources, "limit": 20})
+        mesures["lectures_s"] = time.perf_counter() - started
+    return mesures
+
+
+def main_bench():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ressources", type=int, default=50)
+    parser.add_argument("--reservations", type=int, default=500)
+    parser.add_argument("--lectures", type=int, default=500)
+    args = parser.parse_args()
+
+    resultats = {}
+    for mode in MODES:
+        with base_isolee(mode) as engine:
+            resultats[mode] = charge(engine, args.ressources, args.reservations, args.lectures)
+
+    nb_ecritures = args.ressources + args.reservations
+    print(f"{'mode':<10}{'écritures':>14}{'par écriture':>16}{'lectures':>12}{'par lecture':>15}")
+    for mode, m in resultats.items():
+        print(
+            f"{mode:<10}{m['ecritures_s']:>13.2f}s{m['ecritures_s'] / nb_ecritures * 1000:>14.2f}ms"
+            f"{m['lectures_s']:>11.2f}s{m['lectures_s'] / (2 * args.lectures) * 1000:>13.2f}ms"
+        )
+    disque = resultats["temp"]["ecritures_s"] - resultats["memory"]["ecritures_s"]
+    print(f"part du disque dans les écritures : {max(disque, 0) / resultats['temp']['ecritures_s'] * 100:.0f} %")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,99 @@
+"""Vérifie que `?expand=` charge les relations en un nombre constant de requêtes SQL.
+
+Usage : python -m benchmarks.expand_queries
+
+Appelle les endpoints sites/départements sur une base SQLite en mémoire pour
+plusieurs tailles de page et échoue si le nombre de requêtes varie avec la taille.
+"""
+from contextlib import contextmanager
+from datetime import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.Department import Department
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Enum.TypeRole import TypeRole
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.models.User import User
+from app.router.departments import get_departments, get_department
+from app.router.sites import get_sites, get_site
+from app.services.audit import journal_audit
+
+
+def seed(session: Session, nb_sites: int):
+    for s in range(nb_sites):
+        site = Site(nom=f"Site {s:03d}", adresse="1 rue", horaires_ouverture=time(8), horaires_fermeture=time(18))
+        session.add(site)
+        session.flush()
+        manager = User(
+            nom_utilisateur=f"manager{s}", email=f"manager{s}@resa.fr", nom_prenom=f"Manager {s}",
+            hashed_password="x", role=TypeRole.manager, priorite=TypePriorite.standard,
+            site_principal_id=site.id,
+        )
+        session.add(manager)
+        session.flush()
+        department = Department(nom=f"Dep {s:03d}", site_id=site.id, manager_id=manager.id)
+        session.add(department)
+        session.flush()
+        manager.department_id = department.id
+        for r in range(3):
+            session.add(Ressource(
+                nom=f"Salle {s}-{r}", type_ressource=TypeRessource.salle, capacite_maximum=8,
+                description="", site_id=site.id, localisation_batiment="A", localisation_etage="0",
+                localisation_numero=str(r), etat=EtatRessource.active,
+            ))
+    session.commit()
+
+
+@contextmanager
+def count_queries(engine, counter: list):
+    def before_cursor_execute(*args):
+        counter.append(1)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def queries_for(call, nb_sites: int) -> int:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, nb_sites)
+    # Traces d'audit du jeu de données écrites maintenant : le thread d'écriture ne doit pas être compté
+    journal_audit.arreter()
+    counter = []
+    with Session(engine) as session, count_queries(engine, counter):
+        call(session)
+    return len(counter)
+
+
+CASES = {
+    "GET /sites/?expand=ressources,departments":
+        lambda s: get_sites(None, s, 0, 100, "ressources,departments"),
+    "GET /sites/1?expand=ressources,departments":
+        lambda s: get_site(1, s, "ressources,departments"),
+    "GET /departments/?expand=users,manager":
+        lambda s: get_departments(None, s, 0, 100, "users,manager"),
+    "GET /departments/1?expand=users,manager":
+        lambda s: get_department(1, s, "users,manager"),
+}
+
+
+def main():
+    for label, call in CASES.items():
+        counts = {n: queries_for(call, n) for n in (1, 10, 50)}
+        print(f"{label:<46} requêtes SQL par taille: {counts}")
+        assert len(set(counts.values())) == 1, f"nombre de requêtes non constant pour {label}"
+    print("OK : nombre de requêtes constant")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Heatmap d'occupation par heure de la semaine : temps de calcul et exactitude.
+
+Usage : python -m benchmarks.heatmap [--ressources 40] [--jours 365] [--par-jour 6]
+
+Remplit une base SQLite en mémoire avec une année de réservations pour un site, puis
+calcule la heatmap du site (résolutions 60 et 15 minutes). Échoue si le calcul dépasse
+une seconde ou si une case diffère d'un calcul naïf minute par minute sur un échantillon
+de réservations.
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from datetime import datetime, time as time_type, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.services.occupation import calculer_heatmap
+
+
+def seed(engine, nb_ressources: int, jours: int, par_jour: int, debut: datetime) -> list[tuple]:
+    with Session(engine) as session:
+        site = Site(nom="Site bench", adresse="1 rue", horaires_ouverture=time_type(8), horaires_fermeture=time_type(18))
+        session.add(site)
+        session.flush()
+        ressources = [
+            Ressource(
+                nom=f"Ressource {i}", type_ressource=TypeRessource.salle, capacite_maximum=10,
+                description="", site_id=site.id, localisation_batiment="A",
+                localisation_etage="0", localisation_numero=str(i), etat=EtatRessource.active,
+            )
+            for i in range(nb_ressources)
+        ]
+        session.add_all(ressources)
+        session.commit()
+        ids = [r.id for r in ressources]
+
+    lignes = []
+    for ressource_id in ids:
+        for jour in range(jours):
+            # Créneaux disjoints dans la journée, entre 7h et 20h, à la minute près
+            curseur = debut + timedelta(days=jour, hours=7)
+            for _ in range(par_jour):
+                d = curseur + timedelta(minutes=random.randrange(0, 45))
+                f = d + timedelta(minutes=random.randrange(15, 100))
+                curseur = f
+                lignes.append(dict(
+                    ressource_id=ressource_id, user_id=1, createur_id=1, debut=d, fin=f,
+                    statut=random.choice([StatutReservation.fini, StatutReservation.confirme, StatutReservation.annule]),
+                    description="bench", nbr_participants=1, date_creation=d, date_modification=d,
+                ))
+    with engine.begin() as conn:
+        conn.execute(Reservation.__table__.insert(), lignes)
+    return lignes
+
+
+def naif(lignes: list[dict], debut: datetime, fin: datetime, resolution: int, nb_ressources: int) -> list[list[float]]:
+    occupees, capacite = Counter(), Counter()
+
+    def case(t: datetime) -> tuple[int, int]:
+        return t.weekday(), (t.hour * 60 + t.minute) // resolution
+
+    t = debut
+    while t < fin:
+        capacite[case(t)] += nb_ressources
+        t += timedelta(minutes=1)
+    for ligne in lignes:
+        if ligne["statut"] == StatutReservation.annule:
+            continue
+        t = max(ligne["debut"], debut)
+        while t < min(ligne["fin"], fin):
+            occupees[case(t)] += 1
+            t += timedelta(minutes=1)
+    return [
+        [round(occupees[(j, c)] * 100 / capacite[(j, c)], 2) if capacite[(j, c)] else 0.0 for c in range(24 * 60 // resolution)]
+        for j in range(7)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ressources", type=int, default=40)
+    parser.add_argument("--jours", type=int, default=365)
+    parser.add_argument("--par-jour", type=int, default=6)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    debut = (datetime.now() - timedelta(days=args.jours)).replace(hour=0, minute=0, second=0, microsecond=0)
+    fin = debut + timedelta(days=args.jours)
+    lignes = seed(engine, args.ressources, args.jours, args.par_jour, debut)
+    print(f"{len(lignes)} réservations, {args.ressources} ressources, {args.jours} jours")
+
+    with Session(engine) as session:
+        for resolution in (60, 15):
+            started = time.perf_counter()
+            heatmap = calculer_heatmap(session, debut, fin, resolution=resolution, site_id=1)
+            elapsed = time.perf_counter() - started
+            print(f"site entier, {resolution} min : {elapsed * 1000:.0f}ms")
+            assert elapsed < 1, f"heatmap en {elapsed:.2f}s"
+
+        # Exactitude : une ressource sur 3 semaines, période décalée (bords de semaine partiels)
+        ressource_id = 1
+        d, f = debut + timedelta(days=10, hours=5, minutes=7), debut + timedelta(days=31, hours=13)
+        echantillon = [l for l in lignes if l["ressource_id"] == ressource_id and l["debut"] < f and l["fin"] > d]
+        for resolution in (60, 15):
+            heatmap = calculer_heatmap(session, d, f, resolution=resolution, ressource_id=ressource_id)
+            attendu = naif(echantillon, d, f, resolution, 1)
+            assert heatmap.taux == attendu, f"heatmap différente du calcul naïf ({resolution} min)"
+        print("identique au calcul naïf minute par minute")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Coût CPU de la sérialisation des réponses : chemin response_model vs mode rapide.
+
+Usage : python -m benchmarks.serialization [--items 200] [--repeat 200]
+
+Compare, sans base de données, la sérialisation d'une page de `--items`
+ressources (objets ORM) et d'un détail de ressource par le chemin standard de
+FastAPI (validation response_model + json.dumps) et par `fast_json`.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+import main  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.helpers.responses import fast_json
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Reservation import ReservationPublicSimple
+from app.models.Ressource import (
+    Ressource,
+    RessourcePublic,
+    RessourceListResponse,
+    RessourceDetailResponse,
+    RessourceStatistics,
+    DisponibiliteJour,
+)
+
+
+def make_ressource(i: int) -> Ressource:
+    return Ressource(
+        id=i,
+        nom=f"Salle {i:04d}",
+        type_ressource=TypeRessource.salle,
+        capacite_maximum=10 + i % 20,
+        description="Salle de réunion équipée d'un vidéoprojecteur",
+        caracteristiques=["projecteur", "tableau blanc", "visio"],
+        site_id=1 + i % 3,
+        localisation_batiment="A",
+        localisation_etage=str(i % 5),
+        localisation_numero=f"{i:03d}",
+        etat=EtatRessource.active,
+        images=[f"https://example.org/img/{i}.jpg"],
+        tarifs_horaires=12.5,
+    )
+
+
+def make_detail() -> RessourceDetailResponse:
+    now = datetime(2026, 1, 5, 9, 0)
+    return RessourceDetailResponse(
+        ressource=RessourcePublic.model_validate(make_ressource(1)),
+        statistiques=RessourceStatistics(
+            total_reservations=150, reservations_actives=2, reservations_a_venir=10,
+            taux_occupation_7_jours=45.5, heures_reservees_30_jours=120.5,
+            reservation_moyenne_duree=90.0,
+        ),
+        prochaines_reservations=[
+            ReservationPublicSimple(
+                id=i, user_id=1, debut=now + timedelta(hours=i), fin=now + timedelta(hours=i + 1),
+                statut=StatutReservation.confirme, description="Point hebdo", nbr_participants=4,
+            )
+            for i in range(5)
+        ],
+        disponibilite_7_jours=[
+            DisponibiliteJour(date=f"2026-01-{5 + i:02d}", est_disponible=True, creneaux_disponibles=8)
+            for i in range(7)
+        ],
+    )
+
+
+def standard_path(field, content) -> bytes:
+    # Même enchaînement que fastapi.routing.serialize_response : validation puis sérialisation
+    value, errors = field.validate(content, {}, loc=("response",))
+    assert not errors
+    return JSONResponse(content=field.serialize(value)).body
+
+
+def bench(label: str, fn, repeat: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    per_call = (time.perf_counter() - start) / repeat * 1000
+    print(f"  {label:<12}{per_call:>9.3f} ms/réponse")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    items = [make_ressource(i) for i in range(args.items)]
+    page = {
+        "items": items,
+        "meta": {"total": args.items, "offset": 0, "limit": args.items, "returned": args.items,
+                 "sort_by": "nom", "sort_order": "asc"},
+    }
+    detail = make_detail()
+    cases = [
+        (f"liste ({args.items} ressources)", RessourceListResponse, page,
+         lambda: fast_json(RessourceListResponse.model_validate(page)).body),
+        ("détail ressource", RessourceDetailResponse, detail, lambda: fast_json(detail).body),
+    ]
+
+    for label, model, content, fast in cases:
+        field = create_model_field(name="response", type_=model, mode="serialization")
+        assert json.loads(standard_path(field, content)) == json.loads(fast())
+        print(label)
+        slow = bench("standard", lambda: standard_path(field, content), args.repeat)
+        quick = bench("rapide", fast, args.repeat)
+        print(f"  gain CPU    {(1 - quick / slow) * 100:>8.1f} %")
+
+
+if __name__ == "__main__":
+    main()
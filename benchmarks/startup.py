@@ -0,0 +1,64 @@
+"""Mesure du démarrage à froid : temps d'import de `main` et délai jusqu'à la première requête.
+
+Usage : python -m benchmarks.startup [--runs 5]
+
+Chaque mesure tourne dans un sous-processus neuf, dans un répertoire temporaire
+(la base `resa.db` y est créée). Le premier run crée le schéma, les suivants
+doivent sauter `create_all` grâce à la version stockée dans `PRAGMA user_version`.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+t1 = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    t2 = time.perf_counter()
+    status = client.get("/docs").status_code
+    t3 = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (t1 - t0) * 1000,
+    "lifespan_ms": (t2 - t1) * 1000,
+    "first_request_ms": (t3 - t2) * 1000,
+    "time_to_first_request_ms": (t3 - t0) * 1000,
+    "status": status,
+}}))
+"""
+
+
+def run_probe(cwd: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE.format(root=str(ROOT))],
+        cwd=cwd, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cold = run_probe(tmp)
+        warm = [run_probe(tmp) for _ in range(args.runs)]
+
+    print(f"{'mesure':<26}{'base neuve':>12}{'schéma à jour (médiane)':>26}")
+    for key in ("import_ms", "lifespan_ms", "first_request_ms", "time_to_first_request_ms"):
+        median = statistics.median(r[key] for r in warm)
+        print(f"{key:<26}{cold[key]:>10.1f}ms{median:>24.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Validation groupée des réservations : mêmes verdicts, nombre de requêtes constant.
+
+Usage : python -m benchmarks.validation_prefetch [--reservations 2000] [--ressources 50]
+
+Modifie `nbr_participants` et `fin` de réservations chargées depuis une base SQLite en
+mémoire. Chemin actuel : les validateurs chargent `ressource` objet par objet.
+Chemin groupé : `precharger_validation` + `validation_groupee`. Échoue si les verdicts
+diffèrent ou si le chemin groupé fait plus de deux requêtes.
+"""
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, time as time_type, timedelta
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, Session, select
+
+from main import app  # noqa: F401  (enregistre tous les modèles SQLModel)
+from app.models.Enum.EtatRessource import EtatRessource
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Enum.TypePriorite import TypePriorite
+from app.models.Enum.TypeRessource import TypeRessource
+from app.models.Enum.TypeRole import TypeRole
+from app.models.Reservation import Reservation
+from app.models.Ressource import Ressource
+from app.models.Site import Site
+from app.models.User import User
+from app.services.reservations import precharger_validation, validation_groupee
+
+
+def seed(engine, nb_reservations: int, nb_ressources: int):
+    with Session(engine) as session:
+        site = Site(nom="Site bench", adresse="1 rue", horaires_ouverture=time_type(8), horaires_fermeture=time_type(18))
+        session.add(site)
+        session.flush()
+        user = User(
+            nom_utilisateur="bench", email="bench@resa.fr", nom_prenom="Bench User", hashed_password="x",
+            role=TypeRole.employe, priorite=TypePriorite.standard, site_principal_id=site.id,
+        )
+        ressources = [
+            Ressource(
+                nom=f"Ressource {i}", type_ressource=random.choice(list(TypeRessource)),
+                capacite_maximum=random.randint(2, 20), description="", site_id=site.id,
+                localisation_batiment="A", localisation_etage="0", localisation_numero=str(i),
+                etat=EtatRessource.active,
+            )
+            for i in range(nb_ressources)
+        ]
+        session.add(user)
+        session.add_all(ressources)
+        session.flush()
+
+        base = (datetime.now() + timedelta(days=2)).replace(hour=8, minute=0, second=0, microsecond=0)
+        for i in range(nb_reservations):
+            debut = base + timedelta(hours=i)
+            session.add(Reservation(
+                ressource_id=random.choice(ressources).id, user_id=user.id, createur_id=user.id,
+                debut=debut, fin=debut + timedelta(hours=1), statut=StatutReservation.confirme,
+                description="bench",
+            ))
+        session.commit()
+
+
+def modifications(nb: int) -> list[tuple[int, int]]:
+    # (participants, durée en heures) : une partie dépasse la capacité ou la durée maximale du type
+    return [(random.randint(1, 25), random.choice((1, 4, 10, 30))) for _ in range(nb)]
+
+
+def appliquer(reservations, changements) -> list:
+    verdicts = []
+    for reservation, (participants, heures) in zip(reservations, changements):
+        try:
+            reservation.nbr_participants = participants
+            reservation.fin = reservation.debut + timedelta(hours=heures)
+            verdicts.append(None)
+        except ValueError as e:
+            verdicts.append(str(e))
+    return verdicts
+
+
+@contextmanager
+def count_queries(engine, counter: list):
+    def before_cursor_execute(*args):
+        counter.append(1)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def run(engine, changements, groupee: bool) -> tuple[list, int, float]:
+    with Session(engine) as session:
+        reservations = session.exec(select(Reservation).order_by(Reservation.id)).all()
+        queries = []
+        started = time.perf_counter()
+        with count_queries(engine, queries):
+            if groupee:
+                with validation_groupee(precharger_validation(session, reservations)):
+                    verdicts = appliquer(reservations, changements)
+            else:
+                verdicts = appliquer(reservations, changements)
+        elapsed = time.perf_counter() - started
+        session.rollback()
+    return verdicts, len(queries), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reservations", type=int, default=2000)
+    parser.add_argument("--ressources", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    seed(engine, args.reservations, args.ressources)
+    changements = modifications(args.reservations)
+
+    verdicts_actuels, requetes_actuelles, duree_actuelle = run(engine, changements, groupee=False)
+    verdicts_groupes, requetes_groupees, duree_groupee = run(engine, changements, groupee=True)
+
+    rejets = sum(v is not None for v in verdicts_groupes)
+    print(f"{args.reservations} réservations, {rejets} rejets")
+    print(f"validateurs actuels : {requetes_actuelles} requêtes, {duree_actuelle * 1000:.0f}ms")
+    print(f"validation groupée : {requetes_groupees} requêtes, {duree_groupee * 1000:.0f}ms")
+    assert verdicts_actuels == verdicts_groupes, "verdicts différents entre les deux chemins"
+    assert requetes_groupees <= 2, f"{requetes_groupees} requêtes pour la validation groupée"
+
+
+if __name__ == "__main__":
+    main()
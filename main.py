@@ -1,19 +1,39 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, APIRouter
 
 from app.database.database import create_db_and_tables
+from app.helpers.auth.auth import shutdown_hash_pool
 from app.router.ressources import ressources_router
 from app.router.sites import site_router
 from app.router.auth import auth_router
 from app.router.departments import department_router
+from app.router.reservations import reservations_router
+from app.router.rapports import rapports_router
+from app.router.users import users_router
+from app.router.health import health_router
+from app.router.audit import audit_router
+from app.router.jobs import jobs_router
 from app.middleware.middleware import AuthMiddleware
+from app.services.audit import journal_audit
+from app.services.jobs import gestionnaire_taches
+from app.services.warmup import executer_warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     create_db_and_tables()
+    journal_audit.demarrer()
+    gestionnaire_taches.reprendre_interrompues()
+    # Préchauffage en arrière-plan : /health/live répond pendant ce temps, /health/ready à la fin
+    warmup = asyncio.create_task(asyncio.to_thread(executer_warmup))
     yield
+    await warmup
+    gestionnaire_taches.arreter()
+    shutdown_hash_pool()
+    # Traces d'audit encore en file écrites avant l'arrêt
+    journal_audit.arreter()
 
 app = FastAPI(lifespan=lifespan)
 
@@ -25,4 +45,10 @@ internal_router.include_router(auth_router)
 internal_router.include_router(site_router)
 internal_router.include_router(ressources_router)
 internal_router.include_router(department_router)
+internal_router.include_router(reservations_router)
+internal_router.include_router(rapports_router)
+internal_router.include_router(users_router)
+internal_router.include_router(health_router)
+internal_router.include_router(audit_router)
+internal_router.include_router(jobs_router)
 app.include_router(router=internal_router)
\ No newline at end of file
@@ -0,0 +1,61 @@
+import os
+
+# Avant l'import de l'application : réglages lus au chargement des modules
+os.environ.setdefault("RESA_RATE_LIMIT", "0")
+os.environ.setdefault("RESA_WARMUP", "0")
+
+from datetime import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.database import base_isolee, new_session
+from app.models.Site import Site
+from main import app
+
+
+@pytest.fixture
+def client():
+    # Base temporaire vide par test
+    with base_isolee(), TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def site_id(client) -> int:
+    with new_session() as session:
+        site = Site(nom="Site A", adresse="1 rue", horaires_ouverture=time(8), horaires_fermeture=time(18))
+        session.add(site)
+        session.commit()
+        return site.id
+
+
+def inscrire(client, nom: str, site_id: int, role: str = "employe") -> dict:
+    response = client.post("/auth/register", json={
+        "nom_utilisateur": nom,
+        "email": f"{nom}@resa.fr",
+        "nom_prenom": f"Test {nom}",
+        "password": "motdepasse",
+        "role": role,
+        "priorite": "standard",
+        "site_principal_id": site_id,
+    })
+    assert response.status_code == 200, response.text
+    client.cookies.clear()
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+@pytest.fixture
+def admin(client, site_id) -> dict:
+    return inscrire(client, "admin", site_id, role="admin")
+
+
+@pytest.fixture
+def ressource_id(client, admin, site_id) -> int:
+    response = client.post("/ressources/", headers=admin, json={
+        "nom": "Salle 1", "type_ressource": "salle", "capacite_maximum": 10, "description": "Salle de test",
+        "site_id": site_id, "localisation_batiment": "B", "localisation_etage": "1",
+        "localisation_numero": "101", "etat": "active",
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
@@ -0,0 +1,65 @@
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from app.database.database import new_session
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Reservation import Reservation
+from tests.conftest import inscrire
+
+
+def test_reservations_concurrentes_sans_chevauchement(client, admin, site_id):
+    ressource_ids = []
+    for i in range(3):
+        response = client.post("/ressources/", headers=admin, json={
+            "nom": f"Salle {i}", "type_ressource": "salle", "capacite_maximum": 10, "description": "Salle de test",
+            "site_id": site_id, "localisation_batiment": "B", "localisation_etage": "1",
+            "localisation_numero": str(100 + i), "etat": "active",
+        })
+        assert response.status_code in (200, 201), response.text
+        ressource_ids.append(response.json()["id"])
+    employe = inscrire(client, "employe", site_id)
+    user_id = client.get("/auth/me", headers=employe).json()["id"]
+
+    # Mêmes créneaux que benchmarks.booking_stress : 1h décalées de 15 min, beaucoup de chevauchements
+    base = (datetime.now() + timedelta(days=2)).replace(hour=8, minute=0, second=0, microsecond=0)
+    debuts = [base + timedelta(minutes=15 * i) for i in range(20)]
+    codes = Counter()
+    lock = threading.Lock()
+
+    def reserver(graine: int):
+        tirage = random.Random(graine)
+        for _ in range(10):
+            debut = tirage.choice(debuts)
+            response = client.post("/reservations/", headers=employe, json={
+                "ressource_id": tirage.choice(ressource_ids), "user_id": user_id, "createur_id": user_id,
+                "statut": "confirme", "debut": debut.isoformat(),
+                "fin": (debut + timedelta(hours=1)).isoformat(), "description": "concurrence",
+            })
+            with lock:
+                codes[response.status_code] += 1
+
+    threads = [threading.Thread(target=reserver, args=(t,)) for t in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # 201 réservée, 409 créneau pris, 503 base occupée : jamais d'erreur serveur
+    assert sum(codes.values()) == 80 and set(codes) <= {201, 409, 503}, codes
+    assert codes[201] > 0 and codes[409] > 0, codes
+
+    actifs = (StatutReservation.en_cours, StatutReservation.confirme)
+    with new_session() as session:
+        reservations = [r for r in session.exec(select(Reservation)).all() if r.statut in actifs]
+    assert len(reservations) == codes[201]
+    chevauchements = [
+        (a.id, b.id)
+        for a in reservations
+        for b in reservations
+        if a.id < b.id and a.ressource_id == b.ressource_id and a.debut < b.fin and b.debut < a.fin
+    ]
+    assert chevauchements == []
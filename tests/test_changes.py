@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from app.services import archivage
+from app.services.archivage import archiver_reservations
+from tests.conftest import inscrire
+
+
+def _reserver(client, headers, ressource_id, heure):
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+    debut = (datetime.now() + timedelta(days=3)).replace(hour=heure, minute=0, second=0, microsecond=0)
+    response = client.post("/reservations/", headers=headers, json={
+        "ressource_id": ressource_id, "user_id": user_id, "createur_id": user_id, "statut": "confirme",
+        "debut": debut.isoformat(), "fin": (debut + timedelta(hours=1)).isoformat(), "description": "Réunion",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_changements_filtres_par_utilisateur(client, admin, site_id, ressource_id):
+    alice, bob = inscrire(client, "alice", site_id), inscrire(client, "bob", site_id)
+    resa_alice = _reserver(client, alice, ressource_id, 9)
+    resa_bob = _reserver(client, bob, ressource_id, 11)
+
+    initiale = client.get("/reservations/changes", headers=alice).json()
+    assert [r["id"] for r in initiale["modifiees"]] == [resa_alice]
+
+    assert client.post(f"/reservations/{resa_bob}/annuler", headers=bob).status_code == 200
+    assert client.delete(f"/reservations/{resa_bob}", headers=admin).status_code == 200
+    suite = client.get("/reservations/changes", headers=alice, params={"since": initiale["token"]}).json()
+    assert suite["modifiees"] == [] and suite["supprimees"] == []
+
+    tout = client.get("/reservations/changes", headers=admin, params={"since": initiale["token"]}).json()
+    assert tout["supprimees"] == [resa_bob]
+
+
+def test_synchronisation_initiale_paginee(client, admin, ressource_id):
+    ids = [_reserver(client, admin, ressource_id, heure) for heure in (8, 10, 12)]
+    vus, token, has_more = [], None, True
+    while has_more:
+        page = client.get("/reservations/changes", headers=admin, params={"since": token, "limit": 2}).json()
+        vus += [r["id"] for r in page["modifiees"]]
+        token, has_more = page["token"], page["has_more"]
+    assert vus == ids
+    nouvelle = _reserver(client, admin, ressource_id, 14)
+    suite = client.get("/reservations/changes", headers=admin, params={"since": token}).json()
+    assert [r["id"] for r in suite["modifiees"]] == [nouvelle]
+
+
+def test_token_expire_apres_purge(client, admin, ressource_id, monkeypatch):
+    token = client.get("/reservations/changes", headers=admin).json()["token"]
+    _reserver(client, admin, ressource_id, 8)
+    _reserver(client, admin, ressource_id, 10)
+    # Rétention négative : tous les changements sont trop anciens
+    monkeypatch.setattr(archivage, "CHANGES_RETENTION_DAYS", -1)
+
+    assert archiver_reservations()["changements_purges"] == 1
+    response = client.get("/reservations/changes", headers=admin, params={"since": token})
+    assert response.status_code == 410
+    assert client.get("/reservations/changes", headers=admin).status_code == 200
@@ -0,0 +1,49 @@
+import threading
+
+from sqlalchemy import text
+
+from app.database.engines import EngineFactory
+
+
+def test_memoire_partagee_entre_threads():
+    factory = EngineFactory("memory")
+    try:
+        engine = factory.principal()
+        with engine.begin() as conn:
+            conn.execute(text("CREATE TABLE compteur (thread INTEGER, n INTEGER)"))
+        erreurs = []
+
+        def ecrire(numero: int):
+            try:
+                for n in range(25):
+                    with engine.begin() as conn:
+                        conn.execute(text("INSERT INTO compteur VALUES (:t, :n)"), {"t": numero, "n": n})
+                        conn.execute(text("SELECT count(*) FROM compteur")).scalar_one()
+            except Exception as e:
+                erreurs.append(e)
+
+        threads = [threading.Thread(target=ecrire, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert erreurs == []
+
+        # Pool vidé : la connexion d'ancrage garde la base
+        engine.dispose()
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM compteur")).scalar_one() == 8 * 25
+    finally:
+        factory.dispose()
+
+
+def test_fabriques_memoire_isolees():
+    premiere, seconde = EngineFactory("memory"), EngineFactory("memory")
+    try:
+        with premiere.principal().begin() as conn:
+            conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        with seconde.principal().connect() as conn:
+            assert conn.execute(text("SELECT count(*) FROM sqlite_master WHERE name = 't'")).scalar_one() == 0
+    finally:
+        premiere.dispose()
+        seconde.dispose()
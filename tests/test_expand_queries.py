@@ -0,0 +1,9 @@
+import pytest
+
+from benchmarks.expand_queries import CASES, queries_for
+
+
+@pytest.mark.parametrize("label", list(CASES))
+def test_expand_nombre_de_requetes_constant(label):
+    counts = {n: queries_for(CASES[label], n) for n in (1, 10, 50)}
+    assert len(set(counts.values())) == 1, counts
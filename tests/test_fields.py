@@ -0,0 +1,32 @@
+from app.models.Ressource import RessourcePublic
+
+
+def test_sans_fields_reponse_complete(client, admin, ressource_id):
+    liste = client.get("/ressources/", headers=admin)
+    assert liste.status_code == 200, liste.text
+    assert set(liste.json()["items"][0]) == set(RessourcePublic.model_fields)
+
+    detail = client.get(f"/ressources/{ressource_id}", headers=admin)
+    assert detail.status_code == 200, detail.text
+    assert set(detail.json()["ressource"]) == set(RessourcePublic.model_fields)
+
+
+def test_fields_reponse_partielle(client, admin, ressource_id):
+    liste = client.get("/ressources/?fields=nom", headers=admin)
+    assert liste.status_code == 200, liste.text
+    assert liste.json()["items"] == [{"id": ressource_id, "nom": "Salle 1"}]
+
+    detail = client.get(f"/ressources/{ressource_id}?fields=nom,capacite_maximum", headers=admin)
+    assert detail.status_code == 200, detail.text
+    assert detail.json()["ressource"] == {"id": ressource_id, "nom": "Salle 1", "capacite_maximum": 10}
+    assert {"statistiques", "prochaines_reservations", "disponibilite_7_jours"} <= set(detail.json())
+
+    assert client.get("/ressources/?fields=inconnu", headers=admin).status_code == 400
+
+
+def test_openapi_decrit_la_reponse_partielle(client):
+    paths = client.get("/openapi.json").json()["paths"]
+    for path, modele in (("/ressources/", "RessourcePartielleListResponse"),
+                         ("/ressources/{ressource_id}", "RessourcePartielleDetailResponse")):
+        schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        assert {"$ref": f"#/components/schemas/{modele}"} in schema["anyOf"]
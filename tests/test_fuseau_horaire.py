@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+
+import pytest
+
+from app.database.database import new_session
+from app.helpers.dates import heure_locale
+from app.services.archivage import range_needs_archive
+from app.services.export_reservations import exporter_reservations
+
+
+def test_heure_locale_convertit_les_dates_avec_fuseau():
+    utc = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+    locale = heure_locale(utc)
+    assert locale.tzinfo is None
+    assert locale == utc.astimezone().replace(tzinfo=None)
+    naive = datetime(2026, 1, 15, 12, 0)
+    assert heure_locale(naive) is naive
+    assert heure_locale(None) is None
+
+
+def test_range_needs_archive_accepte_une_date_avec_fuseau():
+    assert range_needs_archive(datetime.now(timezone.utc) - timedelta(days=1000))
+    assert not range_needs_archive(datetime.now(timezone.utc))
+
+
+@pytest.mark.parametrize("chemin", ["/reservations/historique", "/rapports/heatmap", "/rapports/capacite"])
+def test_periode_en_utc(client, admin, ressource_id, chemin):
+    maintenant = datetime.now(timezone.utc)
+    params = {
+        "debut": (maintenant - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "fin": (maintenant + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "ressource_id": ressource_id,
+    }
+    if chemin == "/rapports/capacite":
+        del params["ressource_id"]
+    response = client.get(chemin, headers=admin, params=params)
+    assert response.status_code == 200, response.text
+
+
+def test_export_avec_fuseau(client, ressource_id):
+    fichier = StringIO()
+    with new_session() as session:
+        lignes = exporter_reservations(session, fichier, debut=datetime.now(timezone.utc) - timedelta(days=1))
+    assert lignes == 0
+    assert fichier.getvalue().startswith("id,ressource_id")
+
+
+def test_alternatives_fuseau_sur_une_seule_borne(client, admin, ressource_id):
+    debut = (datetime.now(timezone.utc) + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    response = client.get(f"/ressources/{ressource_id}/alternatives", headers=admin, params={
+        "debut": debut.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "fin": heure_locale(debut + timedelta(hours=1)).isoformat(),
+    })
+    assert response.status_code == 200, response.text
+
+
+def test_audit_fuseau_sur_une_seule_borne(client, admin, ressource_id):
+    maintenant = datetime.now(timezone.utc)
+    params = {
+        "debut": (maintenant - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "fin": heure_locale(maintenant + timedelta(days=1)).isoformat(),
+        "entite": "ressources",
+    }
+    response = client.get("/audit/", headers=admin, params=params)
+    assert response.status_code == 200, response.text
@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+from app.database.database import new_session
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.ReservationArchive import ReservationArchive
+from tests.conftest import inscrire
+
+
+def reserver(client, headers, ressource_id: int, jours: int) -> int:
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+    debut = (datetime.now() + timedelta(days=jours)).replace(hour=9, minute=0, second=0, microsecond=0)
+    response = client.post("/reservations/", headers=headers, json={
+        "ressource_id": ressource_id, "user_id": user_id, "createur_id": user_id, "statut": "confirme",
+        "debut": debut.isoformat(), "fin": (debut + timedelta(hours=1)).isoformat(), "description": "réunion",
+    })
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_historique_limite_aux_reservations_visibles(client, admin, site_id, ressource_id):
+    alice = inscrire(client, "alice", site_id)
+    bob = inscrire(client, "bob", site_id)
+    resa_alice = reserver(client, alice, ressource_id, 2)
+    resa_bob = reserver(client, bob, ressource_id, 3)
+    bob_id = client.get("/auth/me", headers=bob).json()["id"]
+
+    # Réservation archivée de bob : même plage d'ids que la ressource (mode shardé)
+    ancienne = datetime.now() - timedelta(days=1000)
+    with new_session() as session:
+        session.add(ReservationArchive(
+            id=ressource_id + 1000, ressource_id=ressource_id, user_id=bob_id, createur_id=bob_id,
+            debut=ancienne, fin=ancienne + timedelta(hours=1), statut=StatutReservation.fini,
+            description="archivée", date_creation=ancienne, date_modification=ancienne,
+        ))
+        session.commit()
+
+    params = {"ressource_id": ressource_id, "debut": (ancienne - timedelta(days=1)).isoformat()}
+
+    def historique(headers) -> set[int]:
+        response = client.get("/reservations/historique", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        return {r["id"] for r in response.json()}
+
+    assert historique(alice) == {resa_alice}
+    assert historique(bob) == {resa_bob, ressource_id + 1000}
+    assert historique(admin) == {resa_alice, resa_bob, ressource_id + 1000}
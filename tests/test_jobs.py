@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, time as heure, timedelta
+
+from app.database.database import new_session
+from app.models.Enum.StatutTache import StatutTache
+from app.models.Job import Job
+from app.models.Site import Site
+from app.services.audit import journal_audit
+from app.services.jobs import _debut_processus, gestionnaire_taches, identite_processus
+from tests.conftest import inscrire
+
+
+def _attendre(client, headers, job_id: int) -> dict:
+    for _ in range(100):
+        job = client.get(f"/jobs/{job_id}", headers=headers).json()
+        if job["statut"] in (StatutTache.termine.value, StatutTache.echec.value):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Tâche {job_id} non terminée")
+
+
+def test_allocation_auditee_au_nom_du_demandeur(client, admin, ressource_id):
+    admin_id = client.get("/auth/me", headers=admin).json()["id"]
+    debut = (datetime.now() + timedelta(days=3)).replace(hour=9, minute=0, second=0, microsecond=0)
+    response = client.post("/reservations/demandes", headers=admin, json={
+        "ressource_id": ressource_id, "user_id": admin_id, "description": "Réunion",
+        "debut": debut.isoformat(), "fin": (debut + timedelta(hours=1)).isoformat(),
+    })
+    assert response.status_code == 202, response.text
+
+    job = client.post("/jobs/allocation", headers=admin, json={}).json()
+    assert _attendre(client, admin, job["id"])["resume"]["allouees"] == 1
+
+    journal_audit.arreter()
+    traces = client.get("/audit/", headers=admin, params={"entite": "reservations"}).json()
+    assert [(t["operation"], t["acteur_id"]) for t in traces] == [("create", admin_id)]
+
+
+def test_export_limite_au_perimetre_du_manager(client, admin, site_id, ressource_id):
+    with new_session() as session:
+        autre = Site(nom="Site B", adresse="2 rue", horaires_ouverture=heure(8), horaires_fermeture=heure(18))
+        session.add(autre)
+        session.commit()
+        autre_site = autre.id
+    response = client.post("/ressources/", headers=admin, json={
+        "nom": "Salle B", "type_ressource": "salle", "capacite_maximum": 10, "description": "Salle de test",
+        "site_id": autre_site, "localisation_batiment": "B", "localisation_etage": "1",
+        "localisation_numero": "201", "etat": "active",
+    })
+    assert response.status_code in (200, 201), response.text
+    ressource_b = response.json()["id"]
+    manager = inscrire(client, "manager", site_id, role="manager")
+
+    def exporter(headers, **parametres) -> int:
+        return client.post("/jobs/export_reservations", headers=headers, json=parametres).status_code
+
+    assert exporter(manager) == 403
+    assert exporter(manager, site_id=autre_site) == 403
+    assert exporter(manager, ressource_id=ressource_b) == 403
+    assert exporter(manager, site_id=site_id, ressource_id=ressource_b) == 403
+    assert exporter(manager, site_id=site_id) == 202
+    assert exporter(manager, ressource_id=ressource_id) == 202
+    assert exporter(admin) == 202
+
+
+def _pid_termine() -> int:
+    processus = subprocess.Popen([sys.executable, "-c", "pass"])
+    processus.wait()
+    return processus.pid
+
+
+def test_reprise_limitee_aux_processus_arretes(client):
+    proprietaires = {
+        "courant": identite_processus(),
+        "autre_worker": f"{os.getppid()}:{_debut_processus(os.getppid()) or ''}:abc",
+        "arrete": f"{_pid_termine()}:def",
+        # Exécution précédente qui avait le même pid (redémarrage en conteneur)
+        "meme_pid": f"{os.getpid()}:ancienrun",
+        "ancien": None,
+    }
+    if os.path.isdir("/proc"):
+        # pid vivant mais repris par un autre processus que celui qui a enregistré la tâche
+        proprietaires["pid_reutilise"] = f"{os.getppid()}:1:ghi"
+    with new_session() as session:
+        jobs = {nom: Job(kind="heatmap", statut=StatutTache.en_cours, proprietaire=p) for nom, p in proprietaires.items()}
+        session.add_all(jobs.values())
+        session.commit()
+        ids = {nom: job.id for nom, job in jobs.items()}
+
+    gestionnaire_taches.reprendre_interrompues()
+
+    with new_session() as session:
+        statuts = {nom: session.get(Job, job_id).statut for nom, job_id in ids.items()}
+    attendus = {
+        "courant": StatutTache.en_cours,
+        "autre_worker": StatutTache.en_cours,
+        "arrete": StatutTache.echec,
+        "meme_pid": StatutTache.echec,
+        "ancien": StatutTache.echec,
+        "pid_reutilise": StatutTache.echec,
+    }
+    assert statuts == {nom: attendus[nom] for nom in statuts}
@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from app.database.database import new_session
+from app.models.Enum.StatutReservation import StatutReservation
+from app.models.Reservation import Reservation
+from app.services.liste_attente import liberer_reservation
+from tests.conftest import inscrire
+
+
+def test_annulation_concurrente_promeut_une_seule_fois(client, site_id, ressource_id):
+    alice = inscrire(client, "alice", site_id)
+    bob = inscrire(client, "bob", site_id)
+    alice_id = client.get("/auth/me", headers=alice).json()["id"]
+    bob_id = client.get("/auth/me", headers=bob).json()["id"]
+    debut = (datetime.now() + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    creneau = {"debut": debut.isoformat(), "fin": (debut + timedelta(hours=1)).isoformat(), "description": "réunion"}
+
+    response = client.post("/reservations/", headers=alice, json={
+        "ressource_id": ressource_id, "user_id": alice_id, "createur_id": alice_id, "statut": "confirme", **creneau,
+    })
+    assert response.status_code == 201, response.text
+    reservation_id = response.json()["id"]
+    response = client.post("/reservations/liste-attente", headers=bob, json={
+        "ressource_id": ressource_id, "user_id": bob_id, **creneau,
+    })
+    assert response.status_code == 201, response.text
+
+    with new_session() as session:
+        # Chargée avant l'annulation concurrente : statut encore "confirme" dans cette session
+        perimee = session.get(Reservation, reservation_id)
+        assert client.post(f"/reservations/{reservation_id}/annuler", headers=alice).status_code == 200
+        with pytest.raises(ValueError):
+            liberer_reservation(session, perimee)
+
+    with new_session() as session:
+        promues = session.exec(select(Reservation).where(
+            Reservation.user_id == bob_id, Reservation.statut == StatutReservation.confirme,
+        )).all()
+    assert len(promues) == 1
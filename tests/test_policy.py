@@ -0,0 +1,88 @@
+from datetime import time
+
+from sqlmodel import select
+
+from app.database.database import new_session
+from app.models.Site import Site
+from app.models.User import User
+from tests.conftest import inscrire
+
+
+def creer_site(nom: str) -> int:
+    with new_session() as session:
+        site = Site(nom=nom, adresse="2 rue", horaires_ouverture=time(8), horaires_fermeture=time(18))
+        session.add(site)
+        session.commit()
+        return site.id
+
+
+def creer_ressource(client, admin, nom: str, site_id: int) -> int:
+    response = client.post("/ressources/", headers=admin, json={
+        "nom": nom, "type_ressource": "salle", "capacite_maximum": 10, "description": "Salle de test",
+        "site_id": site_id, "localisation_batiment": "B", "localisation_etage": "1",
+        "localisation_numero": "101", "etat": "active",
+    })
+    assert response.status_code in (200, 201), response.text
+    return response.json()["id"]
+
+
+def ids(response) -> set[int]:
+    assert response.status_code == 200, response.text
+    body = response.json()
+    return {item["id"] for item in (body["items"] if isinstance(body, dict) else body)}
+
+
+def test_geres_restreint_les_listes_au_perimetre(client, admin, site_id):
+    autre_site = creer_site("Site B")
+    ressource_a = creer_ressource(client, admin, "Salle A", site_id)
+    ressource_b = creer_ressource(client, admin, "Salle B", autre_site)
+    manager = inscrire(client, "manager", site_id, role="manager")
+    employe = inscrire(client, "employe", site_id)
+    manager_id = client.get("/auth/me", headers=manager).json()["id"]
+
+    assert ids(client.get("/sites/?geres=true", headers=manager)) == {site_id}
+    assert ids(client.get("/ressources/?geres=true", headers=manager)) == {ressource_a}
+    assert ids(client.get("/departments/?geres=true", headers=manager)) == set()
+    assert ids(client.get("/sites/?geres=true", headers=employe)) == set()
+    assert ids(client.get("/ressources/?geres=true", headers=employe)) == set()
+    assert ids(client.get("/sites/?geres=true", headers=admin)) == {site_id, autre_site}
+    assert ids(client.get("/ressources/?geres=true", headers=admin)) == {ressource_a, ressource_b}
+
+    # Un département confié au manager élargit sa portée dès la requête suivante
+    response = client.post("/departments/", headers=admin, json={
+        "nom": "Logistique", "site_id": autre_site, "manager_id": manager_id,
+    })
+    assert response.status_code == 200, response.text
+    department_id = response.json()["id"]
+
+    assert ids(client.get("/departments/?geres=true", headers=manager)) == {department_id}
+    assert ids(client.get("/departments/?geres=true&expand=manager", headers=manager)) == {department_id}
+    assert ids(client.get("/sites/?geres=true", headers=manager)) == {site_id, autre_site}
+    assert ids(client.get("/sites/?geres=true&expand=ressources", headers=manager)) == {site_id, autre_site}
+    assert ids(client.get("/ressources/?geres=true", headers=manager)) == {ressource_a, ressource_b}
+
+
+def test_portee_departement_permet_de_modifier_le_departement(client, admin, site_id):
+    autre_site = creer_site("Site B")
+    titulaire = inscrire(client, "titulaire", autre_site, role="manager")
+    titulaire_id = client.get("/auth/me", headers=titulaire).json()["id"]
+    response = client.post("/departments/", headers=admin, json={
+        "nom": "Logistique", "site_id": autre_site, "manager_id": titulaire_id,
+    })
+    assert response.status_code == 200, response.text
+    department_id = response.json()["id"]
+
+    adjoint = inscrire(client, "adjoint", site_id, role="manager")
+    assert client.put(f"/departments/{department_id}", headers=adjoint, json={"nom": "Achats"}).status_code == 403
+
+    with new_session() as session:
+        user = session.exec(select(User).where(User.nom_utilisateur == "adjoint")).one()
+        user.autorisations = [f"manager:department:{department_id}"]
+        session.add(user)
+        session.commit()
+
+    response = client.put(f"/departments/{department_id}", headers=adjoint, json={"nom": "Achats"})
+    assert response.status_code == 200, response.text
+    assert response.json()["nom"] == "Achats"
+    # Le site du département reste hors de sa portée
+    assert client.put(f"/sites/{autre_site}", headers=adjoint, json={"nom": "Site C"}).status_code == 403